@@ -160,18 +160,47 @@ def benchmark_smart_selection():
         "Translate this to Spanish",
     ]
 
-    results = {}
+    # The first call builds the tool index; time it separately from queries
+    start = time.perf_counter()
+    agent.get_relevant_tools(prompts[0], max_tools=30)
+    first_call_ms = (time.perf_counter() - start) * 1000
+
+    queries = {}
+    latencies = []
     for prompt in prompts:
         start = time.perf_counter()
         tools = agent.get_relevant_tools(prompt, max_tools=30)
         elapsed = (time.perf_counter() - start) * 1000
+        latencies.append(elapsed)
 
-        results[prompt[:30]] = {
+        queries[prompt[:30]] = {
             "tools_selected": len(tools),
             "selection_ms": round(elapsed, 3),
             "tools": [t.name for t in tools[:5]],
         }
 
+    latencies.sort()
+    return {
+        "index": {
+            **agent.tool_index.stats(),
+            "first_call_ms": round(first_call_ms, 3),
+        },
+        "latency": {
+            "p50_ms": round(latencies[len(latencies) // 2], 3),
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+            "max_ms": round(latencies[-1], 3),
+        },
+        "queries": queries,
+    }
+
+
+def benchmark_startup():
+    """Benchmark cold CLI startup against the regression budget."""
+    from r_cli.startup import check_budget, profile_startup
+
+    report = profile_startup()
+    results = report.to_dict(limit=10)
+    results["violations"] = check_budget(report)
     return results
 
 
@@ -201,8 +230,20 @@ def main():
     print("\n4. Smart Tool Selection")
     print("-" * 40)
     selection = benchmark_smart_selection()
-    for prompt, data in selection.items():
+    index = selection["index"]
+    print(f"  {index['backend']} index | {index['tools']} tools | built in {index['build_ms']:.1f}ms")
+    for prompt, data in selection["queries"].items():
         print(f"  '{prompt}' -> {data['tools_selected']} tools in {data['selection_ms']:.2f}ms")
+    latency = selection["latency"]
+    print(f"  p50 {latency['p50_ms']:.2f}ms | p95 {latency['p95_ms']:.2f}ms")
+
+    print("\n5. Cold Startup")
+    print("-" * 40)
+    startup = benchmark_startup()
+    for name, elapsed in startup["timings_ms"].items():
+        print(f"  {name:25} | {elapsed:.1f}ms")
+    for violation in startup["violations"]:
+        print(f"  OVER BUDGET: {violation}")
 
     print("\n" + "=" * 60)
     print("Benchmarks complete!")
@@ -213,6 +254,7 @@ def main():
         "tool_execution": execution,
         "token_usage": tokens,
         "smart_selection": selection,
+        "startup": startup,
     }
 
     output_path = Path(__file__).parent / "results.json"
@@ -220,6 +262,9 @@ def main():
         json.dump(all_results, f, indent=2)
     print(f"Results saved to {output_path}")
 
+    if startup["violations"]:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
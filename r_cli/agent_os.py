@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 import sqlite3
+import threading
 import uuid
 from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
@@ -13,6 +14,8 @@ from typing import TYPE_CHECKING, Any
 import yaml
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from r_cli.core.config import Config
     from r_cli.core.permissions import ApprovalCallback
 
@@ -21,6 +24,8 @@ TASK_STATES = {"queued", "paused", "running", "completed", "failed", "cancelled"
 TERMINAL_TASK_STATES = {"completed", "failed", "cancelled"}
 TASK_PRIORITIES = ("low", "normal", "high", "critical")
 REDACTED = "[redacted]"
+# Per-connection prepared statement cache; hot paths reuse a small set of SQL strings
+STATEMENT_CACHE_SIZE = 256
 
 
 class AgentOSError(RuntimeError):
@@ -41,6 +46,7 @@ class AgentManifest:
     allowed_hosts: list[str] | None = None
     filesystem_roots: list[str] | None = None
     unsafe_capabilities: bool = False
+    max_concurrency: int | None = None
 
     def to_dict(self) -> dict[str, Any]:
         return asdict(self)
@@ -54,15 +60,55 @@ class AgentOS:
         home = Path(config.home_dir).expanduser()
         home.mkdir(parents=True, exist_ok=True)
         self.path = home / "agent-os.db"
+        self._local = threading.local()
+        self._connections: dict[int, sqlite3.Connection] = {}
+        self._connections_lock = threading.Lock()
         self._initialize()
 
     def _connect(self) -> sqlite3.Connection:
-        connection = sqlite3.connect(self.path, timeout=30)
+        """Return the calling thread's connection, opening it on first use.
+
+        Each thread keeps one connection for the lifetime of the runtime, so
+        PRAGMAs run once and sqlite3's prepared statement cache stays warm.
+        Use it as a context manager to wrap a transaction; leaving the block
+        commits or rolls back but does not close the connection.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            return connection
+
+        # check_same_thread is off only so close() can release other threads' connections
+        connection = sqlite3.connect(
+            self.path,
+            timeout=30,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
         connection.row_factory = sqlite3.Row
         connection.execute("PRAGMA foreign_keys = ON")
         connection.execute("PRAGMA busy_timeout = 30000")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        self._local.connection = connection
+        with self._connections_lock:
+            # Release connections left behind by threads that have exited
+            alive = {thread.ident for thread in threading.enumerate()}
+            for ident in [ident for ident in self._connections if ident not in alive]:
+                self._connections.pop(ident).close()
+            previous = self._connections.pop(threading.get_ident(), None)
+            if previous is not None:
+                previous.close()
+            self._connections[threading.get_ident()] = connection
         return connection
 
+    def close(self) -> None:
+        """Close every pooled connection; the runtime reopens them on demand."""
+        with self._connections_lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+            self._local = threading.local()
+        for connection in connections:
+            connection.close()
+
     def _initialize(self) -> None:
         with self._connect() as connection:
             connection.execute("PRAGMA journal_mode = WAL")
@@ -95,7 +141,6 @@ class AgentOS:
                     task_id TEXT,
                     payload TEXT NOT NULL
                 );
-                CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
                 CREATE INDEX IF NOT EXISTS idx_events_task ON events(task_id);
                 """
             )
@@ -106,6 +151,16 @@ class AgentOS:
                 connection.execute(
                     "ALTER TABLE tasks ADD COLUMN priority TEXT NOT NULL DEFAULT 'normal'"
                 )
+            # Scheduler order straight from the index: status lookups walk it
+            # backwards instead of sorting every matching row by priority rank
+            connection.executescript(
+                f"""
+                DROP INDEX IF EXISTS idx_tasks_status;
+                CREATE INDEX IF NOT EXISTS idx_tasks_schedule
+                    ON tasks(status, ({_task_priority_case_sql()}), created_at);
+                CREATE INDEX IF NOT EXISTS idx_tasks_agent ON tasks(agent_name, status);
+                """
+            )
 
     def install(self, manifest: AgentManifest, replace: bool = False) -> None:
         """Install an agent identity from a validated manifest."""
@@ -205,19 +260,22 @@ class AgentOS:
         priority: str = "normal",
     ) -> dict[str, Any]:
         """Create a queued task without starting execution."""
-        self.get_agent(name)
         if not task_input.strip():
             raise AgentOSError("Task input must be non-empty")
         priority = _normalize_task_priority(priority)
         task_id = uuid.uuid4().hex[:12]
         with self._connect() as connection:
-            connection.execute(
-                """
-                INSERT INTO tasks(id, agent_name, input, status, priority, created_at)
-                VALUES (?, ?, ?, 'queued', ?, ?)
-                """,
-                (task_id, name, task_input, priority, _now()),
-            )
+            try:
+                row = connection.execute(
+                    """
+                    INSERT INTO tasks(id, agent_name, input, status, priority, created_at)
+                    VALUES (?, ?, ?, 'queued', ?, ?)
+                    RETURNING *
+                    """,
+                    (task_id, name, task_input, priority, _now()),
+                ).fetchone()
+            except sqlite3.IntegrityError as exc:
+                raise AgentOSError(f"Unknown agent: {name}") from exc
             self._emit(
                 connection,
                 "task.queued",
@@ -225,7 +283,8 @@ class AgentOS:
                 task_id,
                 {"input_length": len(task_input), "priority": priority},
             )
-        return self.get_task(task_id)
+        self._notify_workers()
+        return _task_dict(row)
 
     def run_task(
         self,
@@ -234,13 +293,80 @@ class AgentOS:
         auto_approve: bool = False,
     ) -> dict[str, Any]:
         """Run one existing queued task synchronously."""
-        task = self.get_task(task_id)
-        if task["status"] != "queued":
+        claimed = self._claim("id = ?", [task_id])
+        if claimed is None:
+            # get_task raises for unknown ids
+            self.get_task(task_id)
             raise AgentOSError(f"Task {task_id} is not queued")
-        manifest = self.get_agent(task["agent_name"])
-        if not self._set_task_state(task_id, "running"):
-            raise AgentOSError(f"Task {task_id} could not enter the running state")
+        return self.run_claimed_task(claimed, approval_callback, auto_approve)
+
+    def run_next_task(
+        self,
+        agent_name: str | None = None,
+        approval_callback: ApprovalCallback | None = None,
+        auto_approve: bool = False,
+    ) -> dict[str, Any] | None:
+        """Run the next queued task according to scheduler order."""
+        task = self.claim_next_task(agent_name=agent_name)
+        if task is None:
+            return None
+        return self.run_claimed_task(task, approval_callback, auto_approve)
+
+    def claim_next_task(
+        self,
+        agent_name: str | None = None,
+        exclude_agents: Iterable[str] = (),
+    ) -> dict[str, Any] | None:
+        """Atomically move the next queued task to running and return it.
+
+        Concurrent workers (threads or processes) never claim the same task:
+        selection and the state change happen in one UPDATE ... RETURNING.
+        """
+        clauses = ["status = 'queued'"]
+        values: list[Any] = []
+        if agent_name:
+            clauses.append("agent_name = ?")
+            values.append(agent_name)
+        excluded = sorted(set(exclude_agents))
+        if excluded:
+            clauses.append(f"agent_name NOT IN ({','.join('?' * len(excluded))})")
+            values.extend(excluded)
+        return self._claim(
+            f"""
+            id = (
+                SELECT id FROM tasks WHERE {" AND ".join(clauses)}
+                ORDER BY {_task_priority_case_sql()} DESC, created_at DESC
+                LIMIT 1
+            )
+            """,
+            values,
+        )
+
+    def _claim(self, selector: str, values: list[Any]) -> dict[str, Any] | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                f"""
+                UPDATE tasks SET status = 'running', started_at = ?
+                WHERE {selector} AND status = 'queued'
+                RETURNING *
+                """,
+                [_now(), *values],
+            ).fetchone()
+            if row is None:
+                return None
+            self._emit(connection, "task.running", row["agent_name"], row["id"], {})
+        return _task_dict(row)
+
+    def run_claimed_task(
+        self,
+        task: dict[str, Any],
+        approval_callback: ApprovalCallback | None = None,
+        auto_approve: bool = False,
+    ) -> dict[str, Any]:
+        """Execute a task already claimed by claim_next_task and record its outcome."""
+        task_id = task["id"]
         try:
+            manifest = self.get_agent(task["agent_name"])
             if manifest.kind == "workflow":
                 result = self._run_workflow_agent(
                     manifest,
@@ -256,53 +382,47 @@ class AgentOS:
                     auto_approve,
                 )
         except Exception as exc:
-            self._set_task_state(task_id, "failed", error=str(exc))
-            return self.get_task(task_id)
+            return self._finish_task(task_id, "failed", error=str(exc))
 
-        self._set_task_state(task_id, "completed", result=result)
-        return self.get_task(task_id)
+        return self._finish_task(task_id, "completed", result=result)
 
-    def run_next_task(
+    def _finish_task(
         self,
-        agent_name: str | None = None,
-        approval_callback: ApprovalCallback | None = None,
-        auto_approve: bool = False,
-    ) -> dict[str, Any] | None:
-        """Run the next queued task according to scheduler order."""
-        while True:
-            queued = self.list_tasks(limit=1, status="queued", agent_name=agent_name)
-            if not queued:
-                return None
-            task_id = queued[0]["id"]
-            try:
-                return self.run_task(
-                    task_id,
-                    approval_callback=approval_callback,
-                    auto_approve=auto_approve,
-                )
-            except AgentOSError as exc:
-                if str(exc) == f"Task {task_id} is not queued":
-                    continue
-                raise
+        task_id: str,
+        status: str,
+        result: Any = None,
+        error: str | None = None,
+    ) -> dict[str, Any]:
+        # A task cancelled while running keeps its cancelled state
+        finished = self._transition(task_id, status, result=result, error=error)
+        return finished if finished is not None else self.get_task(task_id)
+
+    def fail_task(self, task_id: str, error: str) -> dict[str, Any]:
+        """Mark a running task as failed, e.g. when its worker crashed."""
+        return self._finish_task(task_id, "failed", error=error)
+
+    def _notify_workers(self) -> None:
+        from r_cli.agent_os_worker import notify_workers
+
+        notify_workers(self.path)
 
     def cancel_task(self, task_id: str, reason: str = "cancelled by user") -> dict[str, Any]:
         """Mark a queued or running task as cancelled."""
         reason = reason.strip() or "cancelled by user"
         now = _now()
         with self._connect() as connection:
-            row = connection.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
-            if row is None:
-                raise AgentOSError(f"Unknown task: {task_id}")
+            row = self._lock_task(connection, task_id)
             if row["status"] in TERMINAL_TASK_STATES:
                 raise AgentOSError(f"Task {task_id} is already {row['status']}")
-            connection.execute(
+            updated = connection.execute(
                 """
                 UPDATE tasks
                 SET status = 'cancelled', error = ?, finished_at = ?
                 WHERE id = ?
+                RETURNING *
                 """,
                 (reason, now, task_id),
-            )
+            ).fetchone()
             self._emit(
                 connection,
                 "task.cancelled",
@@ -310,29 +430,28 @@ class AgentOS:
                 task_id,
                 {"reason": reason, "previous_status": row["status"]},
             )
-        return self.get_task(task_id)
+        return _task_dict(updated)
 
     def pause_task(self, task_id: str, reason: str = "paused by user") -> dict[str, Any]:
         """Pause a queued task before a worker starts it."""
         reason = reason.strip() or "paused by user"
         with self._connect() as connection:
-            row = connection.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
-            if row is None:
-                raise AgentOSError(f"Unknown task: {task_id}")
+            row = self._lock_task(connection, task_id)
             if row["status"] in TERMINAL_TASK_STATES:
                 raise AgentOSError(f"Task {task_id} is already {row['status']}")
             if row["status"] == "paused":
                 raise AgentOSError(f"Task {task_id} is already paused")
             if row["status"] == "running":
                 raise AgentOSError(f"Task {task_id} is already running; cancel it instead")
-            connection.execute(
+            updated = connection.execute(
                 """
                 UPDATE tasks
                 SET status = 'paused', error = ?, finished_at = NULL
                 WHERE id = ?
+                RETURNING *
                 """,
                 (reason, task_id),
-            )
+            ).fetchone()
             self._emit(
                 connection,
                 "task.paused",
@@ -340,24 +459,23 @@ class AgentOS:
                 task_id,
                 {"reason": reason, "previous_status": row["status"]},
             )
-        return self.get_task(task_id)
+        return _task_dict(updated)
 
     def resume_task(self, task_id: str) -> dict[str, Any]:
         """Return a paused task to the queued state."""
         with self._connect() as connection:
-            row = connection.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
-            if row is None:
-                raise AgentOSError(f"Unknown task: {task_id}")
+            row = self._lock_task(connection, task_id)
             if row["status"] != "paused":
                 raise AgentOSError(f"Task {task_id} is not paused")
-            connection.execute(
+            updated = connection.execute(
                 """
                 UPDATE tasks
                 SET status = 'queued', error = NULL, finished_at = NULL
                 WHERE id = ?
+                RETURNING *
                 """,
                 (task_id,),
-            )
+            ).fetchone()
             self._emit(
                 connection,
                 "task.resumed",
@@ -365,25 +483,24 @@ class AgentOS:
                 task_id,
                 {"previous_status": row["status"]},
             )
-        return self.get_task(task_id)
+        self._notify_workers()
+        return _task_dict(updated)
 
     def set_task_priority(self, task_id: str, priority: str) -> dict[str, Any]:
         """Update task priority for scheduling."""
         priority = _normalize_task_priority(priority)
         with self._connect() as connection:
-            row = connection.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
-            if row is None:
-                raise AgentOSError(f"Unknown task: {task_id}")
+            row = self._lock_task(connection, task_id)
             if row["status"] not in {"queued", "paused"}:
                 raise AgentOSError(
                     f"Task {task_id} priority can only be changed while queued or paused"
                 )
             if row["priority"] == priority:
-                return self.get_task(task_id)
-            connection.execute(
-                "UPDATE tasks SET priority = ? WHERE id = ?",
+                return _task_dict(row)
+            updated = connection.execute(
+                "UPDATE tasks SET priority = ? WHERE id = ? RETURNING *",
                 (priority, task_id),
-            )
+            ).fetchone()
             self._emit(
                 connection,
                 "task.reprioritized",
@@ -391,7 +508,16 @@ class AgentOS:
                 task_id,
                 {"priority": priority, "previous_priority": row["priority"]},
             )
-        return self.get_task(task_id)
+        return _task_dict(updated)
+
+    def _lock_task(self, connection: sqlite3.Connection, task_id: str) -> sqlite3.Row:
+        # Take the write lock before reading so the checks and the update that
+        # follows see the same row, even with other workers on the database
+        connection.execute("BEGIN IMMEDIATE")
+        row = connection.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if row is None:
+            raise AgentOSError(f"Unknown task: {task_id}")
+        return row
 
     def _run_assistant(
         self,
@@ -451,30 +577,42 @@ class AgentOS:
         result: Any = None,
         error: str | None = None,
     ) -> bool:
+        return self._transition(task_id, status, result=result, error=error) is not None
+
+    def _transition(
+        self,
+        task_id: str,
+        status: str,
+        result: Any = None,
+        error: str | None = None,
+    ) -> dict[str, Any] | None:
+        """Apply one state change and its event in a single transaction.
+
+        The allowed source states are part of the UPDATE, so the change is a
+        single statement whose RETURNING row doubles as the new task record.
+        Returns None when the task is not in a state that allows the change.
+        """
         if status not in TASK_STATES:
             raise AgentOSError(f"Invalid task state: {status}")
         now = _now()
         with self._connect() as connection:
-            current = connection.execute(
-                "SELECT agent_name, status FROM tasks WHERE id = ?", (task_id,)
-            ).fetchone()
-            if current is None:
-                raise AgentOSError(f"Unknown task: {task_id}")
-            if current["status"] in TERMINAL_TASK_STATES and current["status"] != status:
-                return False
-            if status == "running" and current["status"] != "queued":
-                return False
             if status == "running":
-                connection.execute(
-                    "UPDATE tasks SET status = ?, started_at = ? WHERE id = ?",
-                    (status, now, task_id),
-                )
+                row = connection.execute(
+                    """
+                    UPDATE tasks SET status = 'running', started_at = ?
+                    WHERE id = ? AND status = 'queued'
+                    RETURNING *
+                    """,
+                    (now, task_id),
+                ).fetchone()
             else:
-                connection.execute(
+                row = connection.execute(
                     """
                     UPDATE tasks
                     SET status = ?, result = ?, error = ?, finished_at = ?
                     WHERE id = ?
+                      AND (status NOT IN ('completed', 'failed', 'cancelled') OR status = ?)
+                    RETURNING *
                     """,
                     (
                         status,
@@ -482,16 +620,24 @@ class AgentOS:
                         error,
                         now,
                         task_id,
+                        status,
                     ),
-                )
+                ).fetchone()
+            if row is None:
+                if (
+                    connection.execute("SELECT 1 FROM tasks WHERE id = ?", (task_id,)).fetchone()
+                    is None
+                ):
+                    raise AgentOSError(f"Unknown task: {task_id}")
+                return None
             self._emit(
                 connection,
                 f"task.{status}",
-                current["agent_name"],
+                row["agent_name"],
                 task_id,
                 {"error": error} if error else {},
             )
-        return True
+        return _task_dict(row)
 
     def get_task(self, task_id: str) -> dict[str, Any]:
         with self._connect() as connection:
@@ -602,6 +748,12 @@ class AgentOS:
             "events": events,
         }
 
+    def latest_event_id(self) -> int:
+        """Id of the newest event; every state change emits one, so it versions the runtime."""
+        with self._connect() as connection:
+            row = connection.execute("SELECT MAX(id) FROM events").fetchone()
+        return row[0] or 0
+
     @staticmethod
     def _emit(
         connection: sqlite3.Connection,
@@ -642,6 +794,7 @@ def load_agent_manifest(path: str | Path) -> AgentManifest:
         "allowed_hosts",
         "filesystem_roots",
         "unsafe_capabilities",
+        "max_concurrency",
     }
     unknown = set(raw) - allowed
     if unknown:
@@ -681,6 +834,13 @@ def load_agent_manifest(path: str | Path) -> AgentManifest:
         raise AgentOSError("Agent network_access must be true or false")
     if not isinstance(unsafe_capabilities, bool):
         raise AgentOSError("Agent unsafe_capabilities must be true or false")
+    max_concurrency = raw.get("max_concurrency")
+    if max_concurrency is not None and (
+        isinstance(max_concurrency, bool)
+        or not isinstance(max_concurrency, int)
+        or max_concurrency < 1
+    ):
+        raise AgentOSError("Agent max_concurrency must be a positive integer")
 
     allowed_hosts = raw.get("allowed_hosts", [])
     if not isinstance(allowed_hosts, list) or not all(
@@ -714,6 +874,7 @@ def load_agent_manifest(path: str | Path) -> AgentManifest:
         allowed_hosts=allowed_hosts,
         filesystem_roots=resolved_roots,
         unsafe_capabilities=unsafe_capabilities,
+        max_concurrency=max_concurrency,
     )
 
 
@@ -739,13 +900,25 @@ def validate_agent_capabilities(manifest: AgentManifest) -> None:
     ):
         raise AgentOSError("Agent filesystem_roots must be a list of paths")
 
-    from r_cli.skills import get_all_skills
+    from r_cli.skills.registry import get_skill_specs
 
-    available = {skill.name for skill in get_all_skills()}
     skills = set(manifest.skills or [])
-    unknown = sorted(skills - available)
+    available = set()
+    unavailable = []
+    for spec in get_skill_specs():
+        if spec.name not in skills:
+            continue
+        if spec.missing_requirements():
+            unavailable.append(spec.name)
+        else:
+            available.add(spec.name)
+    unknown = sorted(skills - available - set(unavailable))
     if unknown:
         raise AgentOSError(f"Unknown agent skills: {', '.join(unknown)}")
+    if unavailable:
+        raise AgentOSError(
+            "Agent skills with missing dependencies: " + ", ".join(sorted(unavailable))
+        )
     from r_cli.security import UNCONFINED_SKILLS
 
     broad = sorted(skills & UNCONFINED_SKILLS)
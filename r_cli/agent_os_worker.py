@@ -0,0 +1,250 @@
+"""Concurrent, event-driven worker pool for Agent OS tasks."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import select
+import socket
+import tempfile
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from r_cli.agent_os import AgentOS
+    from r_cli.core.permissions import ApprovalCallback
+
+_HAS_UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+
+
+def _wakeup_directory(database: Path) -> Path:
+    # Unix socket paths are limited to ~100 bytes, so keep them out of home_dir
+    digest = hashlib.sha256(str(Path(database).resolve()).encode()).hexdigest()[:16]
+    return Path(tempfile.gettempdir()) / f"r-agent-os-{digest}"
+
+
+def notify_workers(database: Path) -> None:
+    """Wake every worker waiting on this Agent OS database (best effort)."""
+    if not _HAS_UNIX_SOCKETS:
+        return
+    directory = _wakeup_directory(database)
+    try:
+        endpoints = list(directory.glob("*.sock"))
+    except OSError:
+        return
+    if not endpoints:
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+        sender.setblocking(False)
+        for endpoint in endpoints:
+            try:
+                sender.sendto(b"1", str(endpoint))
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Worker exited without cleaning up
+                with contextlib.suppress(OSError):
+                    endpoint.unlink()
+            except OSError:
+                # Receiver buffer full: it already has a pending wakeup
+                pass
+
+
+class TaskWakeup:
+    """Blocks a worker until a task is submitted, a task finishes, or a timeout.
+
+    Other processes reach the worker through a unix datagram socket registered
+    next to the database; threads in this process use wake(). Where unix
+    sockets are unavailable the wait degrades to a plain timeout (polling).
+    """
+
+    def __init__(self, database: Path):
+        self._local_reader, self._local_writer = socket.socketpair()
+        self._local_reader.setblocking(False)
+        self._endpoint: Path | None = None
+        self._socket: socket.socket | None = None
+        if _HAS_UNIX_SOCKETS:
+            directory = _wakeup_directory(database)
+            endpoint = directory / f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock"
+            try:
+                directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+                self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                self._socket.bind(str(endpoint))
+                self._socket.setblocking(False)
+                self._endpoint = endpoint
+            except OSError:
+                if self._socket is not None:
+                    self._socket.close()
+                self._socket = None
+
+    def wake(self) -> None:
+        with contextlib.suppress(OSError):
+            self._local_writer.send(b"1")
+
+    def wait(self, timeout: float) -> None:
+        readers = [self._local_reader]
+        if self._socket is not None:
+            readers.append(self._socket)
+        ready, _, _ = select.select(readers, [], [], timeout)
+        for reader in ready:
+            with contextlib.suppress(OSError):
+                while reader.recv(64):
+                    pass
+
+    def close(self) -> None:
+        self._local_reader.close()
+        self._local_writer.close()
+        if self._socket is not None:
+            self._socket.close()
+        if self._endpoint is not None:
+            with contextlib.suppress(OSError):
+                self._endpoint.unlink()
+
+    def __enter__(self) -> TaskWakeup:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class AgentOSWorkerPool:
+    """Run queued Agent OS tasks concurrently in scheduler order.
+
+    Up to ``concurrency`` tasks run at once on worker threads (agent tasks are
+    dominated by LLM and tool I/O). Each agent may further cap its own running
+    tasks with ``max_concurrency`` in its manifest, so one slow agent cannot
+    occupy every slot while others wait.
+    """
+
+    def __init__(
+        self,
+        runtime: AgentOS,
+        *,
+        concurrency: int = 1,
+        agent_name: str | None = None,
+        approval_callback: ApprovalCallback | None = None,
+        auto_approve: bool = False,
+        poll_interval: float = 2.0,
+        max_tasks: int | None = None,
+        stop_when_idle: bool = False,
+        on_task: Callable[[dict[str, Any]], None] | None = None,
+        on_idle: Callable[[], None] | None = None,
+    ):
+        """
+        Args:
+            runtime: Agent OS instance whose queue is processed
+            concurrency: Maximum tasks running at once
+            agent_name: Only claim tasks for this agent
+            poll_interval: Longest wait between queue checks when no wakeup arrives
+            max_tasks: Stop claiming after this many tasks
+            stop_when_idle: Return once the queue is empty and nothing is running
+            on_task: Called on the pool thread with each finished task
+            on_idle: Called once each time the pool becomes idle
+        """
+        self.runtime = runtime
+        self.concurrency = max(1, concurrency)
+        self.agent_name = agent_name
+        self.approval_callback = approval_callback
+        self.auto_approve = auto_approve
+        self.poll_interval = poll_interval
+        self.max_tasks = max_tasks
+        self.stop_when_idle = stop_when_idle
+        self.on_task = on_task
+        self.on_idle = on_idle
+        self.interrupted = False
+        self._agent_limits: dict[str, int | None] = {}
+
+    def run(self) -> list[dict[str, Any]]:
+        """Process tasks until stopped; returns finished tasks in claim order."""
+        claimed: list[str] = []
+        finished: dict[str, dict[str, Any]] = {}
+        running: dict[Future, dict[str, Any]] = {}
+        idle_announced = False
+
+        with (
+            TaskWakeup(self.runtime.path) as wakeup,
+            ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="r-os") as pool,
+        ):
+            try:
+                while True:
+                    self._reap(running, finished, block=False)
+
+                    queue_empty = False
+                    while len(running) < self.concurrency and not self._limit_reached(claimed):
+                        task = self.runtime.claim_next_task(
+                            agent_name=self.agent_name,
+                            exclude_agents=self._saturated_agents(running),
+                        )
+                        if task is None:
+                            queue_empty = True
+                            break
+                        claimed.append(task["id"])
+                        # Re-read the agent's limit in case its manifest was replaced
+                        self._agent_limits.pop(task["agent_name"], None)
+                        future = pool.submit(
+                            self.runtime.run_claimed_task,
+                            task,
+                            self.approval_callback,
+                            self.auto_approve,
+                        )
+                        future.add_done_callback(lambda _future: wakeup.wake())
+                        running[future] = task
+                        idle_announced = False
+
+                    if not running:
+                        if self._limit_reached(claimed) or (queue_empty and self.stop_when_idle):
+                            break
+                        if queue_empty and not idle_announced and self.on_idle:
+                            self.on_idle()
+                            idle_announced = True
+
+                    wakeup.wait(self.poll_interval)
+            except KeyboardInterrupt:
+                # Claimed tasks cannot be interrupted mid-run; let them finish and record them
+                self.interrupted = True
+                self._reap(running, finished, block=True)
+
+        return [finished[task_id] for task_id in claimed if task_id in finished]
+
+    def _reap(
+        self,
+        running: dict[Future, dict[str, Any]],
+        finished: dict[str, dict[str, Any]],
+        block: bool,
+    ) -> None:
+        for future in list(running):
+            if not block and not future.done():
+                continue
+            task = running.pop(future)
+            try:
+                result = future.result()
+            except Exception as exc:
+                result = self.runtime.fail_task(task["id"], str(exc))
+            finished[task["id"]] = result
+            if self.on_task:
+                self.on_task(result)
+
+    def _limit_reached(self, claimed: list[str]) -> bool:
+        return self.max_tasks is not None and len(claimed) >= self.max_tasks
+
+    def _saturated_agents(self, running: dict[Future, dict[str, Any]]) -> set[str]:
+        counts: dict[str, int] = {}
+        for task in running.values():
+            counts[task["agent_name"]] = counts.get(task["agent_name"], 0) + 1
+        saturated = set()
+        for agent, count in counts.items():
+            limit = self._agent_limit(agent)
+            if limit is not None and count >= limit:
+                saturated.add(agent)
+        return saturated
+
+    def _agent_limit(self, agent_name: str) -> int | None:
+        if agent_name not in self._agent_limits:
+            try:
+                self._agent_limits[agent_name] = self.runtime.get_agent(agent_name).max_concurrency
+            except Exception:
+                self._agent_limits[agent_name] = None
+        return self._agent_limits[agent_name]
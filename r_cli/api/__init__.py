@@ -22,9 +22,12 @@ from r_cli.api.permissions import (
     check_skill_permission,
 )
 from r_cli.api.rate_limit import (
+    MemoryRateLimitBackend,
+    RateLimitBackend,
     RateLimitConfig,
     RateLimiter,
     RateLimitMiddleware,
+    SQLiteRateLimitBackend,
     get_rate_limiter,
 )
 from r_cli.api.server import create_app, run_server
@@ -35,10 +38,13 @@ __all__ = [
     "AuditLogger",
     "AuthResult",
     "AuthStorage",
+    "MemoryRateLimitBackend",
     "PermissionChecker",
+    "RateLimitBackend",
     "RateLimitConfig",
     "RateLimitMiddleware",
     "RateLimiter",
+    "SQLiteRateLimitBackend",
     "Scope",
     "Token",
     "audit_log",
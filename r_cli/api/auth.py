@@ -11,8 +11,11 @@ from __future__ import annotations
 
 import hashlib
 import json
+import logging
 import os
 import secrets
+import sqlite3
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
@@ -23,6 +26,8 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
 # Security configuration
 SECRET_KEY = os.getenv("R_SECRET_KEY", secrets.token_urlsafe(32))
 ALGORITHM = "HS256"
@@ -84,74 +89,187 @@ class User(BaseModel):
 
 
 # ============================================================================
-# Storage (File-based for simplicity)
+# Storage (SQLite)
 # ============================================================================
 
+# Seconds that last_used updates are buffered before being written together
+LAST_USED_FLUSH_INTERVAL = 5.0
+
 
 class AuthStorage:
-    """Simple file-based storage for auth data."""
+    """
+    SQLite-backed storage for users and API keys.
+
+    ``auth.sqlite3`` runs in WAL mode with unique indexes on key hash and
+    username, so several uvicorn workers can share it. Active API keys are
+    cached in memory by hash: a lookup is a dict hit plus ``PRAGMA
+    data_version``, which changes whenever another process commits, so keys
+    created, revoked or deleted elsewhere are seen on the next request.
+    ``last_used`` updates are coalesced per key and written in one
+    transaction at most every ``last_used_flush_interval`` seconds.
+    """
 
-    def __init__(self, storage_dir: Optional[str] = None):
+    def __init__(
+        self,
+        storage_dir: Optional[str] = None,
+        last_used_flush_interval: float = LAST_USED_FLUSH_INTERVAL,
+    ):
         self.storage_dir = Path(storage_dir or os.path.expanduser("~/.r-cli/auth"))
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.storage_dir / "auth.sqlite3"
         self.users_file = self.storage_dir / "users.json"
         self.api_keys_file = self.storage_dir / "api_keys.json"
+        self.last_used_flush_interval = last_used_flush_interval
+
+        self._lock = threading.RLock()
+        # key_hash -> active APIKey; cleared whenever the database changes
+        self._key_cache: dict[str, APIKey] = {}
+        self._data_version: Optional[int] = None
+        # key_id -> last_used waiting for the next flush
+        self._pending_last_used: dict[str, datetime] = {}
+        self._flush_timer: Optional[threading.Timer] = None
+
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
         self._init_storage()
 
     def _init_storage(self):
-        """Initialize storage files if they don't exist."""
-        if not self.users_file.exists():
-            self._save_users({})
-        if not self.api_keys_file.exists():
-            self._save_api_keys({})
-
-    def _load_users(self) -> dict[str, dict]:
-        """Load users from file."""
-        try:
-            with open(self.users_file) as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {}
-
-    def _save_users(self, users: dict[str, dict]):
-        """Save users to file."""
-        with open(self.users_file, "w") as f:
-            json.dump(users, f, indent=2, default=str)
-
-    def _load_api_keys(self) -> dict[str, dict]:
-        """Load API keys from file."""
-        try:
-            with open(self.api_keys_file) as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {}
+        """Create tables and import JSON files written by earlier versions."""
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id TEXT PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    password_hash TEXT NOT NULL,
+                    scopes TEXT NOT NULL,
+                    is_active INTEGER NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username ON users(username);
+                CREATE TABLE IF NOT EXISTS api_keys (
+                    key_id TEXT PRIMARY KEY,
+                    key_hash TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    scopes TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    last_used TEXT,
+                    expires_at TEXT,
+                    is_active INTEGER NOT NULL
+                );
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_api_keys_hash ON api_keys(key_hash);
+                """
+            )
+        self._migrate_legacy_json()
+
+    def _migrate_legacy_json(self):
+        """Import users.json / api_keys.json and rename them to *.migrated."""
+        for path, insert in (
+            (self.users_file, self._insert_user),
+            (self.api_keys_file, self._insert_api_key),
+        ):
+            if not path.is_file():
+                continue
+            try:
+                with open(path) as f:
+                    records = json.load(f)
+                with self._lock, self._conn:
+                    for record in records.values():
+                        insert(record, replace=True)
+                path.rename(path.with_name(path.name + ".migrated"))
+                logger.info(f"Migrated {len(records)} auth records from {path}")
+            except (OSError, ValueError, TypeError, sqlite3.Error) as e:
+                logger.warning(f"Failed to migrate auth file {path}: {e}")
+
+    # ==================== ROWS ====================
+
+    def _insert_user(self, user: dict, replace: bool = False):
+        user = User(**user).model_dump()
+        self._conn.execute(
+            f"INSERT {'OR REPLACE ' if replace else ''}INTO users "
+            "(user_id, username, password_hash, scopes, is_active, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                user["user_id"],
+                user["username"],
+                user["password_hash"],
+                json.dumps(user["scopes"]),
+                int(user["is_active"]),
+                _isoformat(user["created_at"]),
+            ),
+        )
 
-    def _save_api_keys(self, keys: dict[str, dict]):
-        """Save API keys to file."""
-        with open(self.api_keys_file, "w") as f:
-            json.dump(keys, f, indent=2, default=str)
+    def _insert_api_key(self, key: dict, replace: bool = False):
+        key = APIKey(**key).model_dump()
+        self._conn.execute(
+            f"INSERT {'OR REPLACE ' if replace else ''}INTO api_keys "
+            "(key_id, key_hash, name, scopes, created_at, last_used, expires_at, is_active) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                key["key_id"],
+                key["key_hash"],
+                key["name"],
+                json.dumps(key["scopes"]),
+                _isoformat(key["created_at"]),
+                _isoformat(key["last_used"]),
+                _isoformat(key["expires_at"]),
+                int(key["is_active"]),
+            ),
+        )
+
+    @staticmethod
+    def _user_from_row(row: sqlite3.Row) -> User:
+        return User(
+            user_id=row["user_id"],
+            username=row["username"],
+            password_hash=row["password_hash"],
+            scopes=json.loads(row["scopes"]),
+            is_active=bool(row["is_active"]),
+            created_at=row["created_at"],
+        )
+
+    def _api_key_from_row(self, row: sqlite3.Row) -> APIKey:
+        return APIKey(
+            key_id=row["key_id"],
+            key_hash=row["key_hash"],
+            name=row["name"],
+            scopes=json.loads(row["scopes"]),
+            created_at=row["created_at"],
+            last_used=self._pending_last_used.get(row["key_id"], row["last_used"]),
+            expires_at=row["expires_at"],
+            is_active=bool(row["is_active"]),
+        )
+
+    def _invalidate_keys(self):
+        self._key_cache.clear()
+
+    def _sync_key_cache(self):
+        """Drop cached keys if another connection committed since the last check."""
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._key_cache.clear()
+            self._data_version = version
+
+    # ==================== USERS ====================
 
     def get_user(self, username: str) -> Optional[User]:
         """Get user by username."""
-        users = self._load_users()
-        if username in users:
-            return User(**users[username])
-        return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM users WHERE username = ?", (username,)
+            ).fetchone()
+        return self._user_from_row(row) if row else None
 
     def get_user_by_id(self, user_id: str) -> Optional[User]:
         """Get user by ID."""
-        users = self._load_users()
-        for user_data in users.values():
-            if user_data.get("user_id") == user_id:
-                return User(**user_data)
-        return None
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        return self._user_from_row(row) if row else None
 
     def create_user(self, username: str, password: str, scopes: list[str] | None = None) -> User:
         """Create a new user."""
-        users = self._load_users()
-        if username in users:
-            raise ValueError(f"User {username} already exists")
-
         user = User(
             user_id=secrets.token_urlsafe(16),
             username=username,
@@ -159,33 +277,45 @@ class AuthStorage:
             scopes=scopes or ["read"],
             created_at=datetime.now(),
         )
-        users[username] = user.model_dump()
-        self._save_users(users)
+        try:
+            with self._lock, self._conn:
+                self._insert_user(user.model_dump())
+        except sqlite3.IntegrityError:
+            raise ValueError(f"User {username} already exists")
         return user
 
     def delete_user(self, username: str) -> bool:
         """Delete a user."""
-        users = self._load_users()
-        if username in users:
-            del users[username]
-            self._save_users(users)
-            return True
-        return False
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM users WHERE username = ?", (username,))
+        return cursor.rowcount > 0
+
+    # ==================== API KEYS ====================
 
     def get_api_key(self, key_id: str) -> Optional[APIKey]:
         """Get API key by ID."""
-        keys = self._load_api_keys()
-        if key_id in keys:
-            return APIKey(**keys[key_id])
-        return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM api_keys WHERE key_id = ?", (key_id,)
+            ).fetchone()
+            return self._api_key_from_row(row) if row else None
 
     def get_api_key_by_hash(self, key_hash: str) -> Optional[APIKey]:
-        """Get API key by hash."""
-        keys = self._load_api_keys()
-        for key_data in keys.values():
-            if key_data.get("key_hash") == key_hash:
-                return APIKey(**key_data)
-        return None
+        """Get API key by hash (active keys are served from memory)."""
+        with self._lock:
+            self._sync_key_cache()
+            cached = self._key_cache.get(key_hash)
+            if cached is not None:
+                return cached
+            row = self._conn.execute(
+                "SELECT * FROM api_keys WHERE key_hash = ?", (key_hash,)
+            ).fetchone()
+            if row is None:
+                return None
+            api_key = self._api_key_from_row(row)
+            if api_key.is_active:
+                self._key_cache[key_hash] = api_key
+            return api_key
 
     def create_api_key(
         self,
@@ -194,8 +324,6 @@ class AuthStorage:
         expires_in_days: Optional[int] = None,
     ) -> tuple[str, APIKey]:
         """Create a new API key. Returns (raw_key, APIKey)."""
-        keys = self._load_api_keys()
-
         # Generate raw key
         raw_key = secrets.token_urlsafe(API_KEY_LENGTH)
         key_hash = hashlib.sha256(raw_key.encode()).hexdigest()
@@ -214,54 +342,110 @@ class AuthStorage:
             expires_at=expires_at,
         )
 
-        keys[key_id] = api_key.model_dump()
-        self._save_api_keys(keys)
+        with self._lock, self._conn:
+            self._insert_api_key(api_key.model_dump())
+            self._invalidate_keys()
 
         return raw_key, api_key
 
     def update_api_key_last_used(self, key_id: str):
-        """Update last_used timestamp for an API key."""
-        keys = self._load_api_keys()
-        if key_id in keys:
-            keys[key_id]["last_used"] = datetime.now().isoformat()
-            self._save_api_keys(keys)
+        """Record that an API key was used; written with the next batch."""
+        now = datetime.now()
+        with self._lock:
+            self._pending_last_used[key_id] = now
+            for cached in self._key_cache.values():
+                if cached.key_id == key_id:
+                    cached.last_used = now
+                    break
+            if self.last_used_flush_interval <= 0:
+                self._flush_last_used()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.last_used_flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _flush_last_used(self):
+        if not self._pending_last_used:
+            return
+        pending = self._pending_last_used
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE api_keys SET last_used = ? WHERE key_id = ?",
+                [(used.isoformat(), key_id) for key_id, used in pending.items()],
+            )
+        self._pending_last_used = {}
+
+    def flush(self):
+        """Write buffered last_used updates now."""
+        with self._lock:
+            self._flush_timer = None
+            try:
+                self._flush_last_used()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to flush API key usage: {e}")
 
     def revoke_api_key(self, key_id: str) -> bool:
         """Revoke an API key."""
-        keys = self._load_api_keys()
-        if key_id in keys:
-            keys[key_id]["is_active"] = False
-            self._save_api_keys(keys)
-            return True
-        return False
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE api_keys SET is_active = 0 WHERE key_id = ?", (key_id,)
+            )
+            self._invalidate_keys()
+        return cursor.rowcount > 0
 
     def delete_api_key(self, key_id: str) -> bool:
         """Delete an API key."""
-        keys = self._load_api_keys()
-        if key_id in keys:
-            del keys[key_id]
-            self._save_api_keys(keys)
-            return True
-        return False
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM api_keys WHERE key_id = ?", (key_id,))
+            self._pending_last_used.pop(key_id, None)
+            self._invalidate_keys()
+        return cursor.rowcount > 0
 
     def list_api_keys(self) -> list[APIKey]:
         """List all API keys (without revealing hashes)."""
-        keys = self._load_api_keys()
-        return [APIKey(**k) for k in keys.values()]
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM api_keys ORDER BY created_at").fetchall()
+            return [self._api_key_from_row(row) for row in rows]
+
+    def close(self):
+        """Flush pending updates and close the database."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+            self.flush()
+            self._conn.close()
+
+
+def _isoformat(value: Optional[datetime | str]) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()
 
 
 # Global storage instance
 _storage: Optional[AuthStorage] = None
+_storage_lock = threading.Lock()
 
 
 def get_storage() -> AuthStorage:
     """Get or create auth storage."""
     global _storage
     if _storage is None:
-        _storage = AuthStorage()
+        with _storage_lock:
+            if _storage is None:
+                _storage = AuthStorage()
     return _storage
 
 
+def close_storage() -> None:
+    """Flush and close the global auth storage, if it was opened."""
+    global _storage
+    with _storage_lock:
+        if _storage is not None:
+            _storage.close()
+            _storage = None
+
+
 # ============================================================================
 # JWT Token Functions
 # ============================================================================
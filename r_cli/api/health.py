@@ -0,0 +1,138 @@
+"""
+Background LLM health monitor for R CLI API.
+
+Status endpoints used to probe the LLM server inline, blocking the event
+loop for a full round-trip (or the whole timeout when the server was down).
+The monitor probes from a worker thread on an interval instead and keeps the
+last known state, so /v1/status and /health answer from memory. While the
+server is failing, probes back off exponentially with jitter so a restarting
+model server is not hammered by every API worker at once.
+
+``refresh()`` runs an immediate probe with a short timeout for callers that
+ask for ``/v1/status?fresh=true``; concurrent refreshes share one probe.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+DEFAULT_INTERVAL_SECONDS = 15.0
+DEFAULT_TIMEOUT_SECONDS = 3.0
+DEFAULT_FRESH_TIMEOUT_SECONDS = 2.0
+DEFAULT_MAX_BACKOFF_SECONDS = 120.0
+# Each delay is scaled by a random factor in [1 - JITTER, 1 + JITTER]
+JITTER = 0.2
+
+
+@dataclass
+class HealthSnapshot:
+    """Last known state of the LLM backend."""
+
+    connected: Optional[bool] = None  # None until the first probe finishes
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+    checked_at: Optional[datetime] = None
+    consecutive_failures: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation."""
+        data = asdict(self)
+        data["checked_at"] = self.checked_at.isoformat() if self.checked_at else None
+        return data
+
+
+class LLMHealthMonitor:
+    """Probes the LLM backend periodically and caches the result."""
+
+    def __init__(
+        self,
+        probe: Callable[[float], Any],
+        interval_seconds: float = DEFAULT_INTERVAL_SECONDS,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        fresh_timeout_seconds: float = DEFAULT_FRESH_TIMEOUT_SECONDS,
+        max_backoff_seconds: float = DEFAULT_MAX_BACKOFF_SECONDS,
+    ):
+        """
+        Args:
+            probe: Blocking callable taking a timeout in seconds; raises when unhealthy
+            interval_seconds: Delay between probes while healthy
+            timeout_seconds: Timeout of background probes
+            fresh_timeout_seconds: Timeout of on-demand probes
+            max_backoff_seconds: Longest delay between probes while failing
+        """
+        self.probe = probe
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.fresh_timeout_seconds = fresh_timeout_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+        self._snapshot = HealthSnapshot()
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Future] = None
+
+    def snapshot(self) -> HealthSnapshot:
+        """Return the last known state without probing."""
+        return self._snapshot
+
+    def next_delay(self) -> float:
+        """Seconds until the next background probe."""
+        failures = self._snapshot.consecutive_failures
+        delay = self.interval_seconds
+        if failures:
+            delay = min(self.interval_seconds * (2 ** min(failures, 16)), self.max_backoff_seconds)
+        return delay * random.uniform(1 - JITTER, 1 + JITTER)
+
+    async def _probe(self, timeout: float) -> HealthSnapshot:
+        start = time.perf_counter()
+        try:
+            # The probe's own timeout should fire first; wait_for is the backstop
+            await asyncio.wait_for(asyncio.to_thread(self.probe, timeout), timeout + 1.0)
+        except Exception as exc:
+            error = str(exc) or type(exc).__name__
+            snapshot = HealthSnapshot(
+                connected=False,
+                latency_ms=None,
+                error=error,
+                checked_at=datetime.now(),
+                consecutive_failures=self._snapshot.consecutive_failures + 1,
+            )
+        else:
+            snapshot = HealthSnapshot(
+                connected=True,
+                latency_ms=round((time.perf_counter() - start) * 1000, 2),
+                checked_at=datetime.now(),
+            )
+        self._snapshot = snapshot
+        return snapshot
+
+    async def refresh(self) -> HealthSnapshot:
+        """Probe now with the short timeout; concurrent callers share one probe."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._probe(self.fresh_timeout_seconds))
+        return await asyncio.shield(self._inflight)
+
+    async def _run(self) -> None:
+        while True:
+            await self._probe(self.timeout_seconds)
+            await asyncio.sleep(self.next_delay())
+
+    def start(self) -> None:
+        """Start background probing on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop background probing."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
@@ -29,6 +29,8 @@ class LLMStatus(BaseModel):
     model: Optional[str] = None
     base_url: Optional[str] = None
     error: Optional[str] = None
+    latency_ms: Optional[float] = None
+    checked_at: Optional[datetime] = None
 
 
 class StatusResponse(BaseModel):
@@ -135,6 +137,11 @@ class ChatRequest(BaseModel):
     temperature: Optional[float] = Field(None, ge=0, le=2)
     max_tokens: Optional[int] = Field(None, gt=0)
     tools_enabled: bool = Field(True, description="Allow skill/tool usage")
+    session_id: Optional[str] = Field(
+        None,
+        max_length=128,
+        description="Conversation id; requests with the same id share history and memory",
+    )
 
 
 class ChatChoice(BaseModel):
@@ -162,6 +169,7 @@ class ChatResponse(BaseModel):
     model: str
     choices: list[ChatChoice]
     usage: Optional[ChatUsage] = None
+    session_id: Optional[str] = None
 
 
 class ChatStreamDelta(BaseModel):
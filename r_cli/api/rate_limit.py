@@ -2,12 +2,33 @@
 Rate limiting middleware for R CLI API.
 
 Provides token bucket rate limiting with configurable limits per client.
+Every request draws from a per-minute bucket (or the heavy bucket for chat
+and tool calls) and from a per-hour bucket; it is allowed only when all of
+them have enough tokens.
+
+Bucket state lives in a backend:
+
+- ``memory`` (default): per-process LRU maps with a bounded number of
+  clients, swept periodically so idle clients do not accumulate.
+- ``sqlite``: one WAL database shared by every worker on the host, updated
+  in a single ``BEGIN IMMEDIATE`` transaction per request, so limits hold
+  across ``r serve --workers N`` processes.
+
+Select it with ``R_API_RATE_LIMIT_BACKEND``; ``run_server`` uses ``sqlite``
+when started with more than one worker.
 """
 
 from __future__ import annotations
 
+import asyncio
+import os
+import sqlite3
+import threading
 import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Optional
 
 from fastapi import HTTPException, Request, status
@@ -54,6 +75,42 @@ class TokenBucket:
         return needed / self.refill_rate
 
 
+# Bucket kinds
+MINUTE = "minute"
+HOUR = "hour"
+HEAVY = "heavy"
+
+# Backend defaults
+DEFAULT_MAX_CLIENTS = 10_000
+# A bucket idle this long has refilled completely, so dropping it is lossless
+DEFAULT_MAX_IDLE_SECONDS = 3600
+DEFAULT_SWEEP_INTERVAL_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class BucketLimit:
+    """Capacity and refill rate of one bucket kind."""
+
+    kind: str
+    capacity: int
+    refill_rate: float  # Tokens per second
+
+
+def _take(
+    buckets: dict[str, TokenBucket], cost: int
+) -> tuple[bool, Optional[float], dict[str, float]]:
+    """Consume cost from every bucket, or from none if any is short."""
+    for bucket in buckets.values():
+        bucket._refill()
+    short = [bucket for bucket in buckets.values() if bucket.tokens < cost]
+    if short:
+        retry_after = max(bucket.get_retry_after(cost) for bucket in short)
+        return False, retry_after, {kind: bucket.tokens for kind, bucket in buckets.items()}
+    for bucket in buckets.values():
+        bucket.tokens -= cost
+    return True, None, {kind: bucket.tokens for kind, bucket in buckets.items()}
+
+
 @dataclass
 class RateLimitConfig:
     """Configuration for rate limiting."""
@@ -83,6 +140,23 @@ class RateLimitConfig:
         """Calculate bucket capacity with burst."""
         return int(self.requests_per_minute * self.burst_multiplier)
 
+    def limits(self, heavy: bool = False) -> tuple[BucketLimit, ...]:
+        """Buckets a request draws from: per-minute (or heavy), then per-hour."""
+        if heavy:
+            first = BucketLimit(
+                HEAVY,
+                capacity=int(self.heavy_requests_per_minute * 1.5),
+                refill_rate=self.heavy_requests_per_minute / 60.0,
+            )
+        else:
+            first = BucketLimit(
+                MINUTE, capacity=self.bucket_capacity, refill_rate=self.tokens_per_second
+            )
+        hourly = BucketLimit(
+            HOUR, capacity=self.requests_per_hour, refill_rate=self.requests_per_hour / 3600.0
+        )
+        return first, hourly
+
 
 # Default configurations for different tiers
 RATE_LIMIT_TIERS: dict[str, RateLimitConfig] = {
@@ -109,41 +183,302 @@ RATE_LIMIT_TIERS: dict[str, RateLimitConfig] = {
 }
 
 
+class RateLimitBackend(ABC):
+    """Storage for token buckets, keyed by client and bucket kind."""
+
+    # Whether calls do I/O and should be run off the event loop
+    blocking = False
+
+    @abstractmethod
+    def acquire(
+        self, client_id: str, limits: tuple[BucketLimit, ...], cost: int = 1
+    ) -> tuple[bool, Optional[float], dict[str, float]]:
+        """
+        Atomically consume cost from every bucket in limits.
+
+        Returns:
+            (allowed, retry_after, tokens) - tokens left per bucket kind;
+            nothing is consumed when not allowed
+        """
+
+    @abstractmethod
+    def peek(self, client_id: str, limits: tuple[BucketLimit, ...]) -> dict[str, TokenBucket]:
+        """Return the refilled buckets by kind without consuming tokens."""
+
+    @abstractmethod
+    def reset(self, client_id: str) -> None:
+        """Drop every bucket of a client."""
+
+    @abstractmethod
+    def sweep(self, max_idle_seconds: float = DEFAULT_MAX_IDLE_SECONDS) -> int:
+        """Drop buckets idle for longer than max_idle_seconds; returns the count."""
+
+    def close(self) -> None:  # noqa: B027 - optional hook, in-memory backends hold nothing
+        """Release resources held by the backend."""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process buckets in bounded LRU maps, one map per bucket kind.
+
+    When a map exceeds max_clients the least recently used client is
+    dropped (it starts again with a full bucket). Idle buckets in every map
+    are swept at most every sweep_interval_seconds as requests come in.
+    """
+
+    def __init__(
+        self,
+        max_clients: int = DEFAULT_MAX_CLIENTS,
+        max_idle_seconds: float = DEFAULT_MAX_IDLE_SECONDS,
+        sweep_interval_seconds: float = DEFAULT_SWEEP_INTERVAL_SECONDS,
+    ):
+        self.max_clients = max_clients
+        self.max_idle_seconds = max_idle_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.buckets: dict[str, OrderedDict[str, TokenBucket]] = {
+            kind: OrderedDict() for kind in (MINUTE, HOUR, HEAVY)
+        }
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+
+    def _bucket(self, client_id: str, limit: BucketLimit) -> TokenBucket:
+        buckets = self.buckets.setdefault(limit.kind, OrderedDict())
+        bucket = buckets.get(client_id)
+        if bucket is None:
+            bucket = TokenBucket(capacity=limit.capacity, refill_rate=limit.refill_rate)
+            buckets[client_id] = bucket
+            if len(buckets) > self.max_clients:
+                buckets.popitem(last=False)
+        else:
+            buckets.move_to_end(client_id)
+        return bucket
+
+    def acquire(
+        self, client_id: str, limits: tuple[BucketLimit, ...], cost: int = 1
+    ) -> tuple[bool, Optional[float], dict[str, float]]:
+        with self._lock:
+            if time.time() - self._last_sweep >= self.sweep_interval_seconds:
+                self._sweep(self.max_idle_seconds)
+            return _take({limit.kind: self._bucket(client_id, limit) for limit in limits}, cost)
+
+    def peek(self, client_id: str, limits: tuple[BucketLimit, ...]) -> dict[str, TokenBucket]:
+        with self._lock:
+            buckets = {limit.kind: self._bucket(client_id, limit) for limit in limits}
+            for bucket in buckets.values():
+                bucket._refill()
+            return buckets
+
+    def reset(self, client_id: str) -> None:
+        with self._lock:
+            for buckets in self.buckets.values():
+                buckets.pop(client_id, None)
+
+    def sweep(self, max_idle_seconds: float = DEFAULT_MAX_IDLE_SECONDS) -> int:
+        with self._lock:
+            return self._sweep(max_idle_seconds)
+
+    def _sweep(self, max_idle_seconds: float) -> int:
+        now = time.time()
+        self._last_sweep = now
+        removed = 0
+        for buckets in self.buckets.values():
+            idle = [
+                client_id
+                for client_id, bucket in buckets.items()
+                if now - bucket.last_refill > max_idle_seconds
+            ]
+            for client_id in idle:
+                del buckets[client_id]
+            removed += len(idle)
+        return removed
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Buckets shared by every process on the host through one SQLite file.
+
+    Each acquire reads, refills and writes a client's buckets inside
+    ``BEGIN IMMEDIATE``, which serializes concurrent workers, so a limit is
+    enforced once per host instead of once per worker. Denied requests
+    write nothing. Bucket timestamps use wall-clock time, since monotonic
+    clocks are not comparable across processes.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_idle_seconds: float = DEFAULT_MAX_IDLE_SECONDS,
+        sweep_interval_seconds: float = DEFAULT_SWEEP_INTERVAL_SECONDS,
+    ):
+        self.path = Path(path or os.path.expanduser("~/.r-cli/api/rate_limits.sqlite3"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_idle_seconds = max_idle_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_sweep = time.time()
+        with self._lock:
+            self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the connection on first use (and again after close)."""
+        if self._conn is None:
+            # Autocommit mode; transactions are opened explicitly
+            conn = sqlite3.connect(
+                str(self.path), timeout=30, check_same_thread=False, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buckets (
+                    client_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    tokens REAL NOT NULL,
+                    last_refill REAL NOT NULL,
+                    PRIMARY KEY (client_id, kind)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_buckets_last_refill ON buckets(last_refill)"
+            )
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _load(
+        conn: sqlite3.Connection, client_id: str, limits: tuple[BucketLimit, ...]
+    ) -> dict[str, TokenBucket]:
+        rows = {
+            kind: (tokens, last_refill)
+            for kind, tokens, last_refill in conn.execute(
+                "SELECT kind, tokens, last_refill FROM buckets WHERE client_id = ?",
+                (client_id,),
+            )
+        }
+        buckets = {}
+        for limit in limits:
+            bucket = TokenBucket(capacity=limit.capacity, refill_rate=limit.refill_rate)
+            if limit.kind in rows:
+                tokens, last_refill = rows[limit.kind]
+                bucket.tokens = min(float(limit.capacity), tokens)
+                bucket.last_refill = last_refill
+            buckets[limit.kind] = bucket
+        return buckets
+
+    def acquire(
+        self, client_id: str, limits: tuple[BucketLimit, ...], cost: int = 1
+    ) -> tuple[bool, Optional[float], dict[str, float]]:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                buckets = self._load(conn, client_id, limits)
+                allowed, retry_after, tokens = _take(buckets, cost)
+                if allowed:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO buckets(client_id, kind, tokens, last_refill) "
+                        "VALUES (?, ?, ?, ?)",
+                        [
+                            (client_id, kind, bucket.tokens, bucket.last_refill)
+                            for kind, bucket in buckets.items()
+                        ],
+                    )
+                if time.time() - self._last_sweep >= self.sweep_interval_seconds:
+                    self._sweep(conn, self.max_idle_seconds)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return allowed, retry_after, tokens
+
+    def peek(self, client_id: str, limits: tuple[BucketLimit, ...]) -> dict[str, TokenBucket]:
+        with self._lock:
+            buckets = self._load(self._connect(), client_id, limits)
+        for bucket in buckets.values():
+            bucket._refill()
+        return buckets
+
+    def reset(self, client_id: str) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM buckets WHERE client_id = ?", (client_id,))
+
+    def sweep(self, max_idle_seconds: float = DEFAULT_MAX_IDLE_SECONDS) -> int:
+        with self._lock:
+            return self._sweep(self._connect(), max_idle_seconds)
+
+    def _sweep(self, conn: sqlite3.Connection, max_idle_seconds: float) -> int:
+        now = time.time()
+        self._last_sweep = now
+        cursor = conn.execute(
+            "DELETE FROM buckets WHERE last_refill < ?", (now - max_idle_seconds,)
+        )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
 class RateLimiter:
     """Rate limiter with per-client buckets."""
 
-    def __init__(self, default_config: Optional[RateLimitConfig] = None):
+    def __init__(
+        self,
+        default_config: Optional[RateLimitConfig] = None,
+        backend: Optional[RateLimitBackend] = None,
+    ):
         self.default_config = default_config or RATE_LIMIT_TIERS["standard"]
-        self.buckets: dict[str, TokenBucket] = {}
-        self.heavy_buckets: dict[str, TokenBucket] = {}
+        self.backend = backend or MemoryRateLimitBackend()
         self.client_configs: dict[str, RateLimitConfig] = {}
 
+    def _memory_buckets(self, kind: str) -> OrderedDict[str, TokenBucket]:
+        if not isinstance(self.backend, MemoryRateLimitBackend):
+            raise AttributeError(
+                f"{type(self.backend).__name__} does not keep {kind} buckets in process; "
+                "use get_remaining() to inspect a client"
+            )
+        return self.backend.buckets[kind]
+
+    @property
+    def buckets(self) -> OrderedDict[str, TokenBucket]:
+        """Per-minute buckets of the in-process backend."""
+        return self._memory_buckets(MINUTE)
+
+    @property
+    def hourly_buckets(self) -> OrderedDict[str, TokenBucket]:
+        """Per-hour buckets of the in-process backend."""
+        return self._memory_buckets(HOUR)
+
+    @property
+    def heavy_buckets(self) -> OrderedDict[str, TokenBucket]:
+        """Heavy operation buckets of the in-process backend."""
+        return self._memory_buckets(HEAVY)
+
+    def get_config(self, client_id: str) -> RateLimitConfig:
+        """Return the config applied to a client."""
+        return self.client_configs.get(client_id, self.default_config)
+
     def get_bucket(self, client_id: str) -> TokenBucket:
         """Get or create a bucket for a client."""
-        if client_id not in self.buckets:
-            config = self.client_configs.get(client_id, self.default_config)
-            self.buckets[client_id] = TokenBucket(
-                capacity=config.bucket_capacity,
-                refill_rate=config.tokens_per_second,
-            )
-        return self.buckets[client_id]
+        limit = self.get_config(client_id).limits()[0]
+        return self.backend.peek(client_id, (limit,))[MINUTE]
 
     def get_heavy_bucket(self, client_id: str) -> TokenBucket:
         """Get or create a heavy operation bucket for a client."""
-        if client_id not in self.heavy_buckets:
-            config = self.client_configs.get(client_id, self.default_config)
-            self.heavy_buckets[client_id] = TokenBucket(
-                capacity=int(config.heavy_requests_per_minute * 1.5),
-                refill_rate=config.heavy_requests_per_minute / 60.0,
-            )
-        return self.heavy_buckets[client_id]
+        limit = self.get_config(client_id).limits(heavy=True)[0]
+        return self.backend.peek(client_id, (limit,))[HEAVY]
 
     def set_client_config(self, client_id: str, config: RateLimitConfig):
         """Set custom config for a client."""
         self.client_configs[client_id] = config
         # Reset buckets to apply new config
-        self.buckets.pop(client_id, None)
-        self.heavy_buckets.pop(client_id, None)
+        self.backend.reset(client_id)
 
     def set_client_tier(self, client_id: str, tier: str):
         """Set client to a predefined tier."""
@@ -162,43 +497,73 @@ class RateLimiter:
         Returns:
             (allowed, retry_after) - retry_after is seconds until next allowed request
         """
-        bucket = self.get_heavy_bucket(client_id) if heavy else self.get_bucket(client_id)
+        allowed, retry_after, _ = self.acquire(client_id, cost=cost, heavy=heavy)
+        return allowed, retry_after
 
-        if bucket.consume(cost):
-            return True, None
-        else:
-            retry_after = bucket.get_retry_after(cost)
-            return False, retry_after
+    def acquire(
+        self, client_id: str, cost: int = 1, heavy: bool = False
+    ) -> tuple[bool, Optional[float], dict]:
+        """
+        Check a request like check_rate_limit and report what is left.
+
+        Returns:
+            (allowed, retry_after, remaining) - remaining describes the
+            per-minute (or heavy) bucket the request drew from and the hourly one
+        """
+        config = self.get_config(client_id)
+        first, hourly = config.limits(heavy=heavy)
+        allowed, retry_after, tokens = self.backend.acquire(client_id, (first, hourly), cost)
+        remaining = {
+            "remaining": int(tokens[first.kind]),
+            "limit": config.heavy_requests_per_minute if heavy else config.requests_per_minute,
+            "reset_seconds": (first.capacity - tokens[first.kind]) / first.refill_rate,
+            "hourly_remaining": int(tokens[HOUR]),
+            "hourly_limit": config.requests_per_hour,
+        }
+        return allowed, retry_after, remaining
+
+    async def acquire_async(
+        self, client_id: str, cost: int = 1, heavy: bool = False
+    ) -> tuple[bool, Optional[float], dict]:
+        """acquire() for async callers; blocking backends run in a worker thread."""
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.acquire, client_id, cost, heavy)
+        return self.acquire(client_id, cost, heavy)
 
     def get_remaining(self, client_id: str) -> dict:
         """Get remaining rate limit info for a client."""
-        bucket = self.get_bucket(client_id)
-        heavy_bucket = self.get_heavy_bucket(client_id)
-        config = self.client_configs.get(client_id, self.default_config)
-
-        bucket._refill()
-        heavy_bucket._refill()
+        config = self.get_config(client_id)
+        minute, hourly = config.limits()
+        buckets = self.backend.peek(client_id, (minute, hourly, config.limits(heavy=True)[0]))
+        bucket = buckets[MINUTE]
 
         return {
             "remaining": int(bucket.tokens),
             "limit": config.requests_per_minute,
             "reset_seconds": (config.bucket_capacity - bucket.tokens) / config.tokens_per_second,
-            "heavy_remaining": int(heavy_bucket.tokens),
+            "hourly_remaining": int(buckets[HOUR].tokens),
+            "hourly_limit": config.requests_per_hour,
+            "heavy_remaining": int(buckets[HEAVY].tokens),
             "heavy_limit": config.heavy_requests_per_minute,
         }
 
-    def cleanup_old_buckets(self, max_age_seconds: int = 3600):
-        """Remove buckets that haven't been used recently."""
-        now = time.time()
-        to_remove = []
+    def cleanup_old_buckets(self, max_age_seconds: int = DEFAULT_MAX_IDLE_SECONDS) -> int:
+        """Remove buckets of every kind that haven't been used recently."""
+        return self.backend.sweep(max_age_seconds)
+
+    def close(self) -> None:
+        """Release the backend's resources."""
+        self.backend.close()
 
-        for client_id, bucket in self.buckets.items():
-            if now - bucket.last_refill > max_age_seconds:
-                to_remove.append(client_id)
 
-        for client_id in to_remove:
-            self.buckets.pop(client_id, None)
-            self.heavy_buckets.pop(client_id, None)
+def create_backend(name: Optional[str] = None) -> RateLimitBackend:
+    """Create the backend named by name or R_API_RATE_LIMIT_BACKEND."""
+    name = (name or os.getenv("R_API_RATE_LIMIT_BACKEND", "memory")).lower()
+    if name == "memory":
+        return MemoryRateLimitBackend()
+    if name == "sqlite":
+        return SQLiteRateLimitBackend(os.getenv("R_API_RATE_LIMIT_DB"))
+    raise ValueError(f"Unknown rate limit backend: {name} (expected 'memory' or 'sqlite')")
 
 
 # Global rate limiter instance
@@ -209,10 +574,16 @@ def get_rate_limiter() -> RateLimiter:
     """Get or create the global rate limiter."""
     global _rate_limiter
     if _rate_limiter is None:
-        _rate_limiter = RateLimiter()
+        _rate_limiter = RateLimiter(backend=create_backend())
     return _rate_limiter
 
 
+def close_rate_limiter() -> None:
+    """Release the global rate limiter's backend; it reopens on next use."""
+    if _rate_limiter is not None:
+        _rate_limiter.close()
+
+
 # Paths that are considered heavy operations
 HEAVY_PATHS = {
     "/v1/chat",
@@ -275,7 +646,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         client_id = self._get_client_id(request)
         cost, is_heavy = self._get_cost(request)
 
-        allowed, retry_after = self.rate_limiter.check_rate_limit(
+        allowed, retry_after, remaining = await self.rate_limiter.acquire_async(
             client_id, cost=cost, heavy=is_heavy
         )
 
@@ -293,7 +664,6 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         # Add rate limit headers to response
         response = await call_next(request)
 
-        remaining = self.rate_limiter.get_remaining(client_id)
         response.headers["X-RateLimit-Limit"] = str(remaining["limit"])
         response.headers["X-RateLimit-Remaining"] = str(remaining["remaining"])
         response.headers["X-RateLimit-Reset"] = str(int(remaining["reset_seconds"]))
@@ -329,7 +699,9 @@ def rate_limit_dependency(
             client_host = request.client.host if request.client else "unknown"
             client_id = f"ip:{client_host}"
 
-        allowed, retry_after = rate_limiter.check_rate_limit(client_id, cost=cost, heavy=heavy)
+        allowed, retry_after, _ = await rate_limiter.acquire_async(
+            client_id, cost=cost, heavy=heavy
+        )
 
         if not allowed:
             raise HTTPException(
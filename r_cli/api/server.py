@@ -13,13 +13,14 @@ import asyncio
 import os
 import time
 import uuid
-from contextlib import asynccontextmanager
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import replace
 from datetime import datetime
 from typing import AsyncGenerator, Optional
 
 from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
@@ -36,12 +37,19 @@ from r_cli.api.auth import (
     AuthResult,
     Token,
     authenticate_user,
+    close_storage,
     create_access_token,
     get_current_auth,
     get_storage,
     require_auth,
     require_scopes,
 )
+from r_cli.api.health import (
+    DEFAULT_INTERVAL_SECONDS,
+    DEFAULT_TIMEOUT_SECONDS,
+    HealthSnapshot,
+    LLMHealthMonitor,
+)
 from r_cli.api.models import (
     AgentOSStatus,
     AgentTaskSummary,
@@ -50,9 +58,6 @@ from r_cli.api.models import (
     ChatMessage,
     ChatRequest,
     ChatResponse,
-    ChatStreamChoice,
-    ChatStreamDelta,
-    ChatStreamResponse,
     ChatUsage,
     ControlCenterResponse,
     HealthStatus,
@@ -73,18 +78,53 @@ from r_cli.api.permissions import (
     Scope,
     check_skill_permission,
 )
-from r_cli.api.rate_limit import RateLimitMiddleware
+from r_cli.api.rate_limit import RateLimitMiddleware, close_rate_limiter
+from r_cli.api.sessions import (
+    DEFAULT_IDLE_TTL_SECONDS,
+    DEFAULT_MAX_SESSIONS,
+    AgentSessionPool,
+)
+from r_cli.api.snapshots import SnapshotCache, etag_matches
+from r_cli.api.streaming import (
+    DEFAULT_COALESCE_SECONDS,
+    DEFAULT_MAX_BUFFERED,
+    DONE_FRAME,
+    ChatStreamFrames,
+    TokenStream,
+)
 from r_cli.core.agent import Agent
 from r_cli.core.config import Config
 from r_cli.core.permissions import PermissionDeniedError, PermissionManager
 
 # Global state
 _agent: Optional[Agent] = None
+_sessions: Optional[AgentSessionPool] = None
+_health: Optional[LLMHealthMonitor] = None
+_runtime: Optional[AgentOS] = None
+_control_center: Optional[SnapshotCache] = None
 _start_time: float = 0
 _config: Optional[Config] = None
 
 # Auth mode: "none", "optional", "required"
 AUTH_MODE = os.getenv("R_AUTH_MODE", "optional")
+
+# Conversation pool limits
+MAX_SESSIONS = int(os.getenv("R_API_MAX_SESSIONS", str(DEFAULT_MAX_SESSIONS)))
+SESSION_TTL_SECONDS = float(os.getenv("R_API_SESSION_TTL", str(DEFAULT_IDLE_TTL_SECONDS)))
+
+# LLM health probing
+HEALTH_INTERVAL_SECONDS = float(os.getenv("R_API_HEALTH_INTERVAL", str(DEFAULT_INTERVAL_SECONDS)))
+HEALTH_TIMEOUT_SECONDS = float(os.getenv("R_API_HEALTH_TIMEOUT", str(DEFAULT_TIMEOUT_SECONDS)))
+
+# Control Center snapshot: seconds served before the runtime event id is re-read
+CONTROL_CENTER_TTL_SECONDS = float(os.getenv("R_API_CONTROL_CENTER_TTL", "2"))
+
+# Chat streaming: tokens buffered per stream before the model is paused, and
+# milliseconds to wait for more tokens before sending a frame (0 disables)
+STREAM_MAX_BUFFERED = int(os.getenv("R_API_STREAM_BUFFER", str(DEFAULT_MAX_BUFFERED)))
+STREAM_COALESCE_SECONDS = (
+    float(os.getenv("R_API_STREAM_COALESCE_MS", str(DEFAULT_COALESCE_SECONDS * 1000))) / 1000
+)
 CAPABILITY_DOMAINS = {
     "Knowledge & Docs": {
         "icon": "📚",
@@ -194,16 +234,81 @@ def get_agent() -> Agent:
     return _agent
 
 
-def _build_status_response() -> StatusResponse:
-    """Build the shared runtime status response."""
+def get_session_pool() -> AgentSessionPool:
+    """Get the per-conversation agent pool."""
+    if _sessions is None:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+    return _sessions
+
+
+def _resolve_session_id(
+    requested: Optional[str], req: Request, auth: AuthResult
+) -> tuple[str, str]:
+    """
+    Return (pool_key, session_id) for a request.
+
+    The id comes from the body, then the X-Session-ID header, then the
+    authenticated user. Pool keys are scoped to the caller so one user
+    cannot attach to another user's conversation.
+    """
+    owner = auth.user_id if auth.authenticated and auth.user_id else "anonymous"
+    session_id = requested or req.headers.get("X-Session-ID")
+    if not session_id:
+        session_id = "default"
+    return f"{owner}:{session_id}", session_id
+
+
+def _run_in_session(pool_key: str, user_message: str) -> str:
+    """Run one agent turn inside its pooled session (called from a worker thread)."""
+    with get_session_pool().session(pool_key) as agent:
+        return agent.run(user_message)
+
+
+def get_health_monitor() -> LLMHealthMonitor:
+    """Get the background LLM health monitor."""
+    if _health is None:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+    return _health
+
+
+def get_runtime() -> AgentOS:
+    """Get the shared agent runtime handle."""
+    if _runtime is None:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+    return _runtime
+
+
+def get_control_center_cache() -> SnapshotCache:
+    """Get the Control Center snapshot cache."""
+    if _control_center is None:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+    return _control_center
+
+
+async def _llm_health(fresh: bool = False) -> HealthSnapshot:
+    """Last known LLM state, or a new short-timeout probe when fresh is set."""
+    monitor = get_health_monitor()
+    if fresh:
+        return await monitor.refresh()
+    return monitor.snapshot()
+
+
+def _build_status_response(health: HealthSnapshot) -> StatusResponse:
+    """Build the shared runtime status response from a health snapshot."""
     agent = get_agent()
     uptime = time.time() - _start_time
-    llm_connected = agent.check_connection()
+    llm_connected = bool(health.connected)
+    error = health.error
+    if health.connected is None:
+        error = "LLM health has not been checked yet"
     llm_status = LLMStatus(
         connected=llm_connected,
         backend=_config.llm.provider if _config else None,
         model=_config.llm.model if _config else None,
         base_url=_config.llm.base_url if _config else None,
+        error=error,
+        latency_ms=health.latency_ms,
+        checked_at=health.checked_at,
     )
     health_status = HealthStatus.HEALTHY if llm_connected else HealthStatus.DEGRADED
     return StatusResponse(
@@ -224,10 +329,101 @@ def _resolve_capability_domain(skill_name: str) -> str:
     return "Utilities"
 
 
+def _build_control_center(
+    agent: Agent,
+    runtime: AgentOS,
+    health: HealthSnapshot,
+    checker: Optional[PermissionChecker],
+) -> ControlCenterResponse:
+    """Aggregate the Control Center overview (skills, runtime, memory, security)."""
+    # Probe timing changes on every health check; keep it out of the cached snapshot
+    status_response = _build_status_response(replace(health, latency_ms=None, checked_at=None))
+
+    visible_skills = []
+    for name, skill in agent.skills.items():
+        if checker and not checker.can_use_skill(name):
+            continue
+        visible_skills.append((name, skill))
+
+    runtime_status = runtime.status()
+    installed_agents = runtime.list_agents()
+
+    domains: dict[str, dict[str, object]] = {}
+    for domain_name, metadata in CAPABILITY_DOMAINS.items():
+        domains[domain_name] = {
+            "name": domain_name,
+            "icon": metadata["icon"],
+            "skills": 0,
+            "tools": 0,
+            "highlights": [],
+        }
+
+    for skill_name, skill in visible_skills:
+        domain_name = _resolve_capability_domain(skill_name)
+        if domain_name not in domains:
+            domains[domain_name] = {
+                "name": domain_name,
+                "icon": "🛠️",
+                "skills": 0,
+                "tools": 0,
+                "highlights": [],
+            }
+        domain = domains[domain_name]
+        domain["skills"] = int(domain["skills"]) + 1
+        domain["tools"] = int(domain["tools"]) + len(skill.get_tools())
+        highlights = list(domain["highlights"])
+        if len(highlights) < 4:
+            highlights.append(skill_name)
+            domain["highlights"] = highlights
+
+    capability_domains = [
+        CapabilityDomainSummary(**domain)
+        for domain in domains.values()
+        if int(domain["skills"]) > 0
+    ]
+    capability_domains.sort(key=lambda item: item.skills, reverse=True)
+
+    return ControlCenterResponse(
+        status=status_response,
+        agent_os=AgentOSStatus(
+            database=runtime_status["database"],
+            agents=runtime_status["agents"],
+            events=runtime_status["events"],
+            tasks=AgentTaskSummary(**runtime_status["tasks"]),
+        ),
+        installed_agents=[
+            InstalledAgentSummary(
+                name=item["name"],
+                description=item["description"],
+                kind=item["kind"],
+                task_count=item["task_count"],
+                completed=item["completed"],
+                skills=len(item.get("skills") or []),
+                network_access=bool(item.get("network_access", False)),
+            )
+            for item in installed_agents[:8]
+        ],
+        capability_domains=capability_domains,
+        memory=MemoryOverview(
+            provider=_config.memory.provider if _config else "local",
+            continuous=(_config.memory.provider == "gbrain") if _config else False,
+        ),
+        security=SecurityOverview(
+            mode=_config.security.mode if _config else "ask",
+            local_only=_config.security.local_only if _config else True,
+            network_access=_config.security.network_access if _config else False,
+            audit_enabled=_config.security.audit_enabled if _config else True,
+            filesystem_roots_enforced=(
+                _config.security.enforce_filesystem_roots if _config else False
+            ),
+        ),
+    )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
-    global _agent, _start_time, _config
+    global _agent, _sessions, _health, _runtime, _control_center, _start_time, _config
 
     # Startup
     _start_time = time.time()
@@ -236,6 +432,19 @@ async def lifespan(app: FastAPI):
     # Create agent with all skills
     _agent = Agent(_config)
     _agent.load_skills()
+    _sessions = AgentSessionPool(
+        _agent,
+        max_sessions=MAX_SESSIONS,
+        idle_ttl_seconds=SESSION_TTL_SECONDS,
+    )
+    _health = LLMHealthMonitor(
+        _agent.llm.ping,
+        interval_seconds=HEALTH_INTERVAL_SECONDS,
+        timeout_seconds=HEALTH_TIMEOUT_SECONDS,
+    )
+    _health.start()
+    _runtime = AgentOS(_config)
+    _control_center = SnapshotCache(ttl_seconds=CONTROL_CENTER_TTL_SECONDS)
 
     # Log server start
     audit_log(
@@ -249,6 +458,14 @@ async def lifespan(app: FastAPI):
     audit_log(AuditAction.SERVER_STOPPED)
 
     # Shutdown
+    await _health.stop()
+    _health = None
+    _control_center = None
+    _runtime.close()
+    _runtime = None
+    close_storage()
+    close_rate_limiter()
+    _sessions = None
     _agent = None
 
 
@@ -361,101 +578,54 @@ def register_routes(app: FastAPI) -> None:
 
     @app.get("/health", tags=["Health"])
     async def health():
-        """Simple health check."""
-        return {"status": "ok"}
+        """Simple health check; includes the last known LLM state once started."""
+        if _health is None:
+            return {"status": "ok"}
+        snapshot = await _llm_health()
+        return {"status": "ok", "llm": snapshot.to_dict()}
 
     @app.get("/v1/status", response_model=StatusResponse, tags=["Status"])
-    async def get_status(auth: AuthResult = Depends(get_current_auth)):
-        """Get detailed server status."""
-        return _build_status_response()
+    async def get_status(fresh: bool = False, auth: AuthResult = Depends(get_current_auth)):
+        """Get detailed server status (?fresh=true probes the LLM now)."""
+        return _build_status_response(await _llm_health(fresh))
 
     @app.get("/v1/control-center", response_model=ControlCenterResponse, tags=["Status"])
-    async def get_control_center(auth: AuthResult = Depends(get_current_auth)):
-        """Get a product-level overview for the web Control Center."""
+    async def get_control_center(
+        request: Request,
+        response: Response,
+        auth: AuthResult = Depends(get_current_auth),
+    ):
+        """
+        Get a product-level overview for the web Control Center.
+
+        The overview is served from a snapshot that is rebuilt only when the
+        agent runtime records a new event or the LLM health changes, so its
+        uptime and timestamp fields reflect when it was built, and LLM probe
+        latency and time are left out (see /v1/status). Send the returned
+        ETag in If-None-Match to get 304 while nothing changed.
+        """
         agent = get_agent()
-        status_response = _build_status_response()
+        runtime = get_runtime()
+        health = await _llm_health()
         checker = PermissionChecker(auth.scopes) if auth.authenticated else None
-
-        visible_skills = []
-        for name, skill in agent.skills.items():
-            if checker and not checker.can_use_skill(name):
-                continue
-            visible_skills.append((name, skill))
-
-        runtime = AgentOS(_config or Config.load())
-        runtime_status = runtime.status()
-        installed_agents = runtime.list_agents()
-
-        domains: dict[str, dict[str, object]] = {}
-        for domain_name, metadata in CAPABILITY_DOMAINS.items():
-            domains[domain_name] = {
-                "name": domain_name,
-                "icon": metadata["icon"],
-                "skills": 0,
-                "tools": 0,
-                "highlights": [],
-            }
-
-        for skill_name, skill in visible_skills:
-            domain_name = _resolve_capability_domain(skill_name)
-            if domain_name not in domains:
-                domains[domain_name] = {
-                    "name": domain_name,
-                    "icon": "🛠️",
-                    "skills": 0,
-                    "tools": 0,
-                    "highlights": [],
-                }
-            domain = domains[domain_name]
-            domain["skills"] = int(domain["skills"]) + 1
-            domain["tools"] = int(domain["tools"]) + len(skill.get_tools())
-            highlights = list(domain["highlights"])
-            if len(highlights) < 4:
-                highlights.append(skill_name)
-                domain["highlights"] = highlights
-
-        capability_domains = [
-            CapabilityDomainSummary(**domain)
-            for domain in domains.values()
-            if int(domain["skills"]) > 0
-        ]
-        capability_domains.sort(key=lambda item: item.skills, reverse=True)
-
-        return ControlCenterResponse(
-            status=status_response,
-            agent_os=AgentOSStatus(
-                database=runtime_status["database"],
-                agents=runtime_status["agents"],
-                events=runtime_status["events"],
-                tasks=AgentTaskSummary(**runtime_status["tasks"]),
-            ),
-            installed_agents=[
-                InstalledAgentSummary(
-                    name=item["name"],
-                    description=item["description"],
-                    kind=item["kind"],
-                    task_count=item["task_count"],
-                    completed=item["completed"],
-                    skills=len(item.get("skills") or []),
-                    network_access=bool(item.get("network_access", False)),
-                )
-                for item in installed_agents[:8]
-            ],
-            capability_domains=capability_domains,
-            memory=MemoryOverview(
-                provider=_config.memory.provider if _config else "local",
-                continuous=(_config.memory.provider == "gbrain") if _config else False,
-            ),
-            security=SecurityOverview(
-                mode=_config.security.mode if _config else "ask",
-                local_only=_config.security.local_only if _config else True,
-                network_access=_config.security.network_access if _config else False,
-                audit_enabled=_config.security.audit_enabled if _config else True,
-                filesystem_roots_enforced=(
-                    _config.security.enforce_filesystem_roots if _config else False
-                ),
-            ),
+        key = (
+            tuple(sorted(auth.scopes)) if checker else None,
+            health.connected,
+            health.error,
+            len(agent.skills),
         )
+        # Reading the event id and rebuilding both query SQLite
+        snapshot = await asyncio.to_thread(
+            get_control_center_cache().get,
+            key,
+            runtime.latest_event_id,
+            lambda: _build_control_center(agent, runtime, health, checker),
+        )
+        headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("If-None-Match"), snapshot.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return snapshot.payload
 
     # ========================================================================
     # Authentication
@@ -652,7 +822,8 @@ def register_routes(app: FastAPI) -> None:
                     detail="Missing chat permission",
                 )
 
-        agent = get_agent()
+        get_agent()
+        pool_key, session_id = _resolve_session_id(request.session_id, req, auth)
         start_time = time.time()
 
         # Build conversation
@@ -686,13 +857,14 @@ def register_routes(app: FastAPI) -> None:
         if request.stream:
             return StreamingResponse(
                 stream_chat_response(
-                    agent, user_message, response_id, created, model, auth, start_time
+                    req, pool_key, user_message, response_id, created, model, auth, start_time
                 ),
                 media_type="text/event-stream",
+                headers={"X-Session-ID": session_id},
             )
         else:
             # Non-streaming response
-            response_text = await asyncio.to_thread(agent.run, user_message)
+            response_text = await asyncio.to_thread(_run_in_session, pool_key, user_message)
             duration_ms = (time.time() - start_time) * 1000
 
             audit_log(
@@ -719,10 +891,12 @@ def register_routes(app: FastAPI) -> None:
                     completion_tokens=len(response_text.split()),
                     total_tokens=len(user_message.split()) + len(response_text.split()),
                 ),
+                session_id=session_id,
             )
 
     async def stream_chat_response(
-        agent: Agent,
+        req: Request,
+        pool_key: str,
         user_message: str,
         response_id: str,
         created: int,
@@ -731,76 +905,29 @@ def register_routes(app: FastAPI) -> None:
         start_time: float,
     ) -> AsyncGenerator[str, None]:
         """Generate streaming chat response."""
+        frames = ChatStreamFrames(response_id, created, model)
         # Send role first
-        initial_chunk = ChatStreamResponse(
-            id=response_id,
-            created=created,
-            model=model,
-            choices=[
-                ChatStreamChoice(
-                    index=0,
-                    delta=ChatStreamDelta(role="assistant"),
-                )
-            ],
-        )
-        yield f"data: {initial_chunk.model_dump_json()}\n\n"
-
-        # Run sync generator in thread
-        loop = asyncio.get_event_loop()
-        queue: asyncio.Queue = asyncio.Queue()
-
-        async def producer():
-            def run():
-                try:
-                    for chunk in agent.run_stream(user_message):
-                        asyncio.run_coroutine_threadsafe(queue.put(chunk), loop)
-                    asyncio.run_coroutine_threadsafe(queue.put(None), loop)
-                except Exception as e:
-                    asyncio.run_coroutine_threadsafe(queue.put(e), loop)
-
-            await asyncio.to_thread(run)
-
-        # Start producer
-        producer_task = asyncio.create_task(producer())
-
-        # Consume chunks
-        total_content = ""
-        while True:
-            item = await queue.get()
-            if item is None:
-                break
-            if isinstance(item, Exception):
-                raise item
+        yield frames.role()
 
-            total_content += item
-            chunk_response = ChatStreamResponse(
-                id=response_id,
-                created=created,
-                model=model,
-                choices=[
-                    ChatStreamChoice(
-                        index=0,
-                        delta=ChatStreamDelta(content=item),
-                    )
-                ],
-            )
-            yield f"data: {chunk_response.model_dump_json()}\n\n"
-
-        # Send finish
-        final_chunk = ChatStreamResponse(
-            id=response_id,
-            created=created,
-            model=model,
-            choices=[
-                ChatStreamChoice(
-                    index=0,
-                    delta=ChatStreamDelta(),
-                    finish_reason="stop",
-                )
-            ],
+        def generate():
+            with get_session_pool().session(pool_key) as agent:
+                yield from agent.run_stream(user_message)
+
+        stream = TokenStream(
+            generate,
+            max_buffered=STREAM_MAX_BUFFERED,
+            coalesce_seconds=STREAM_COALESCE_SECONDS,
+            is_disconnected=req.is_disconnected,
         )
-        yield f"data: {final_chunk.model_dump_json()}\n\n"
-        yield "data: [DONE]\n\n"
+        response_length = 0
+        async with aclosing(stream.chunks()) as chunks:
+            async for text in chunks:
+                response_length += len(text)
+                yield frames.content(text)
+
+        if not stream.disconnected:
+            yield frames.finish()
+            yield DONE_FRAME
 
         # Log completion
         duration_ms = (time.time() - start_time) * 1000
@@ -809,11 +936,14 @@ def register_routes(app: FastAPI) -> None:
             user_id=auth.user_id if auth.authenticated else None,
             username=auth.username if auth.authenticated else None,
             duration_ms=duration_ms,
-            details={"response_length": len(total_content), "stream": True},
+            details={
+                "response_length": response_length,
+                "stream": True,
+                "frames": stream.frames_sent,
+                "disconnected": stream.disconnected,
+            },
         )
 
-        await producer_task
-
     # ========================================================================
     # Voice (Realtime Voice Chat)
     # ========================================================================
@@ -926,6 +1056,7 @@ def register_routes(app: FastAPI) -> None:
     async def voice_chat(
         request: Request,
         voice: str = "F3",
+        session_id: Optional[str] = None,
         auth: AuthResult = Depends(get_current_auth),
     ):
         """
@@ -969,8 +1100,9 @@ def register_routes(app: FastAPI) -> None:
                 raise HTTPException(status_code=400, detail="Could not transcribe audio")
 
             # 2. Get LLM response
-            agent = get_agent()
-            response_text = await asyncio.to_thread(agent.run, user_text)
+            get_agent()
+            pool_key, _ = _resolve_session_id(session_id, request, auth)
+            response_text = await asyncio.to_thread(_run_in_session, pool_key, user_text)
 
             # 3. Generate TTS response
             tts, style = skill._get_tts(voice)
@@ -1300,6 +1432,10 @@ def run_server(
     """Run the API server."""
     import uvicorn
 
+    if workers > 1:
+        # Per-process buckets would multiply every limit by the worker count
+        os.environ.setdefault("R_API_RATE_LIMIT_BACKEND", "sqlite")
+
     uvicorn.run(
         "r_cli.api.server:create_app",
         factory=True,
@@ -0,0 +1,150 @@
+"""
+Per-session agent pool for R CLI API.
+
+Each conversation gets its own lightweight Agent (LLM history and memory
+namespace) that shares the skill/tool registry of one base agent, so
+concurrent clients neither race on a single history nor reload skills.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from r_cli.core.agent import Agent
+
+DEFAULT_MAX_SESSIONS = 64
+DEFAULT_IDLE_TTL_SECONDS = 1800.0
+
+
+@dataclass
+class AgentSession:
+    """One pooled conversation."""
+
+    session_id: str
+    agent: Agent
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    # Requests holding or waiting for this session; guarded by the pool lock
+    pins: int = 0
+
+    @property
+    def busy(self) -> bool:
+        return self.pins > 0 or self.lock.locked()
+
+
+def session_namespace(session_id: str) -> str:
+    """Map a client-supplied session id to a safe memory namespace."""
+    digest = hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:16]
+    return f"api-{digest}"
+
+
+class AgentSessionPool:
+    """Session-keyed pool of agents with LRU eviction and idle TTL."""
+
+    def __init__(
+        self,
+        base_agent: Agent,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        idle_ttl_seconds: float = DEFAULT_IDLE_TTL_SECONDS,
+    ):
+        self.base_agent = base_agent
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._sessions: OrderedDict[str, AgentSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def acquire(self, session_id: str, pin: bool = False) -> AgentSession:
+        """
+        Get or create the session, marking it most recently used.
+
+        With pin set the session is counted as in use before the pool lock is
+        released, so eviction cannot drop it; undo with release().
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = time.time()
+                self._sessions.move_to_end(session_id)
+                if pin:
+                    session.pins += 1
+                return session
+
+        # Build outside the pool lock: loading the memory namespace touches disk
+        agent = self.base_agent.spawn_session(memory_namespace=session_namespace(session_id))
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = AgentSession(session_id=session_id, agent=agent)
+                self._sessions[session_id] = session
+            session.last_used = time.time()
+            self._sessions.move_to_end(session_id)
+            if pin:
+                session.pins += 1
+            self._evict_locked()
+            return session
+
+    def release(self, session: AgentSession) -> None:
+        """Drop a pin taken by acquire(pin=True)."""
+        with self._lock:
+            session.pins -= 1
+            session.last_used = time.time()
+
+    @contextmanager
+    def session(self, session_id: str) -> Iterator[Agent]:
+        """Hold a session exclusively; requests within one session are serialized."""
+        pooled = self.acquire(session_id, pin=True)
+        try:
+            with pooled.lock:
+                yield pooled.agent
+        finally:
+            self.release(pooled)
+
+    def close(self, session_id: str) -> bool:
+        """Drop a session from the pool."""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def evict_idle(self) -> int:
+        """Drop sessions idle for longer than the TTL."""
+        with self._lock:
+            return self._evict_locked()
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "busy": sum(1 for item in self._sessions.values() if item.busy),
+                "max_sessions": self.max_sessions,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+            }
+
+    def _evict_locked(self) -> int:
+        now = time.time()
+        evicted = 0
+        for session_id, item in list(self._sessions.items()):
+            over_capacity = len(self._sessions) > self.max_sessions
+            expired = now - item.last_used > self.idle_ttl_seconds
+            if not (over_capacity or expired):
+                # Entries are kept in LRU order, so later ones are fresher
+                break
+            if item.busy:
+                continue
+            del self._sessions[session_id]
+            evicted += 1
+        return evicted
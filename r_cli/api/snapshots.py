@@ -0,0 +1,128 @@
+"""
+Snapshot cache for aggregated API payloads.
+
+Dashboard endpoints such as /v1/control-center aggregate several runtime
+queries per request, although the underlying state only changes when the
+agent runtime records an event. A snapshot is rebuilt only when its version
+token (the latest AgentOS event id) moves; for ``ttl_seconds`` after a
+successful validation the token is not even re-read, so a burst of polls
+costs no database work at all.
+
+Each snapshot carries a weak ETag derived from its key and version, which lets
+clients revalidate with ``If-None-Match`` and receive 304 Not Modified.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+
+DEFAULT_TTL_SECONDS = 2.0
+DEFAULT_MAX_ENTRIES = 32
+
+
+@dataclass
+class Snapshot:
+    """A cached payload and the version it was built from."""
+
+    payload: Any
+    version: Any
+    etag: str
+    validated_at: float
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from the repr of the given parts."""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == wanted for candidate in if_none_match.split(",")
+    )
+
+
+class SnapshotCache:
+    """Keeps the latest snapshot per key, validated against a version token."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            ttl_seconds: How long a validated snapshot is served without
+                re-reading its version (0 re-reads on every call)
+            max_entries: Keys kept before the least recently used is dropped
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: OrderedDict[Hashable, Snapshot] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.rebuilds = 0
+
+    def get(
+        self,
+        key: Hashable,
+        version: Callable[[], Any],
+        build: Callable[[], Any],
+    ) -> Snapshot:
+        """
+        Return the snapshot for key, rebuilding it when its version changed.
+
+        Args:
+            key: Everything besides the version that the payload depends on
+            version: Cheap callable returning the current version token
+            build: Callable producing the payload for the current version
+        """
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.validated_at < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        current = version()
+        if entry is not None and entry.version == current:
+            with self._lock:
+                entry.validated_at = now
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return entry
+
+        snapshot = Snapshot(
+            payload=build(),
+            version=current,
+            etag=make_etag(key, current),
+            validated_at=now,
+        )
+        with self._lock:
+            self._entries[key] = snapshot
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.rebuilds += 1
+        return snapshot
+
+    def clear(self) -> None:
+        """Drop every snapshot."""
+        with self._lock:
+            self._entries.clear()
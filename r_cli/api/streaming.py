@@ -0,0 +1,199 @@
+"""
+Server-sent event streaming for R CLI API chat.
+
+The agent generates tokens from a synchronous iterator in a worker thread.
+``TokenStream`` bridges it to the event loop through a bounded queue: when
+the client reads slower than the model writes, the worker blocks instead of
+buffering the whole response in memory. Tokens already queued are merged
+into one frame (optionally waiting a few milliseconds for more), and when
+the client disconnects the worker stops and closes the generator, which
+ends the LLM request.
+
+``ChatStreamFrames`` renders chunks from a JSON template prepared once per
+response, so a token costs one ``json.dumps`` of its text rather than
+building and serializing a pydantic model.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import json
+import threading
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Awaitable, Iterator
+
+DEFAULT_MAX_BUFFERED = 64
+DEFAULT_COALESCE_SECONDS = 0.0
+DEFAULT_MAX_FRAME_CHARS = 1024
+# How often a stream checks whether its client is still connected
+DEFAULT_POLL_SECONDS = 1.0
+# How often a blocked worker checks whether the stream was cancelled
+PUT_POLL_SECONDS = 0.25
+
+DONE_FRAME = "data: [DONE]\n\n"
+
+_END = object()
+
+
+def _frame_end(finish_reason: str) -> str:
+    """Close a chunk's delta and choice; finish_reason is already JSON."""
+    return '},"finish_reason":' + finish_reason + "}]}\n\n"
+
+
+class ChatStreamFrames:
+    """SSE frames of one streamed chat completion, byte-compatible with ChatStreamResponse."""
+
+    def __init__(self, response_id: str, created: int, model: str):
+        self._head = (
+            f'data: {{"id":{json.dumps(response_id)},"object":"chat.completion.chunk",'
+            f'"created":{int(created)},"model":{json.dumps(model)},"choices":[{{"index":0,"delta":'
+        )
+        self._content_prefix = self._head + '{"role":null,"content":'
+        self._content_suffix = _frame_end("null")
+
+    def role(self, role: str = "assistant") -> str:
+        """Opening frame announcing the assistant role."""
+        return self._head + '{"role":' + json.dumps(role) + ',"content":null' + self._content_suffix
+
+    def content(self, text: str) -> str:
+        """Frame carrying a piece of the response text."""
+        return self._content_prefix + json.dumps(text, ensure_ascii=False) + self._content_suffix
+
+    def finish(self, reason: str = "stop") -> str:
+        """Closing frame with the finish reason."""
+        return self._head + '{"role":null,"content":null' + _frame_end(json.dumps(reason))
+
+
+class TokenStream:
+    """Streams text from a blocking iterator with backpressure and coalescing."""
+
+    def __init__(
+        self,
+        produce: Callable[[], Iterator[str]],
+        *,
+        max_buffered: int = DEFAULT_MAX_BUFFERED,
+        coalesce_seconds: float = DEFAULT_COALESCE_SECONDS,
+        max_frame_chars: int = DEFAULT_MAX_FRAME_CHARS,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        poll_seconds: float = DEFAULT_POLL_SECONDS,
+    ):
+        """
+        Args:
+            produce: Returns the token iterator; called and consumed in a worker thread
+            max_buffered: Tokens queued before the worker blocks
+            coalesce_seconds: Extra wait for more tokens before sending a frame (0 sends
+                whatever is queued immediately)
+            max_frame_chars: Stop merging tokens into a frame past this size
+            is_disconnected: Async check for a gone client, e.g. Request.is_disconnected
+            poll_seconds: How often to run is_disconnected, while waiting or sending
+        """
+        self.produce = produce
+        self.max_buffered = max_buffered
+        self.coalesce_seconds = coalesce_seconds
+        self.max_frame_chars = max_frame_chars
+        self.is_disconnected = is_disconnected
+        self.poll_seconds = poll_seconds
+
+        self.disconnected = False
+        self.tokens_received = 0
+        self.frames_sent = 0
+        self._cancel = threading.Event()
+        self._producer: Optional[asyncio.Future] = None
+
+    def _run(self, queue: asyncio.Queue, loop: asyncio.AbstractEventLoop) -> None:
+        """Worker thread: feed the queue, blocking while it is full."""
+
+        def put(item) -> bool:
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    future.result(PUT_POLL_SECONDS)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if self._cancel.is_set():
+                        future.cancel()
+                        return False
+
+        tokens = None
+        try:
+            tokens = self.produce()
+            for token in tokens:
+                if self._cancel.is_set() or not put(token):
+                    return
+            put(_END)
+        except Exception as exc:
+            if not self._cancel.is_set():
+                put(exc)
+        finally:
+            # Closing a generator unwinds it here, ending the LLM request early
+            close = getattr(tokens, "close", None)
+            if close is not None:
+                close()
+
+    async def _next(self, queue: asyncio.Queue):
+        """Wait for the next item, polling the client while the model is silent."""
+        if self.is_disconnected is None:
+            return await queue.get()
+        getter = asyncio.ensure_future(queue.get())
+        try:
+            while True:
+                done, _ = await asyncio.wait({getter}, timeout=self.poll_seconds)
+                if done:
+                    return getter.result()
+                if await self.is_disconnected():
+                    self.disconnected = True
+                    return _END
+        finally:
+            if not getter.done():
+                getter.cancel()
+
+    async def chunks(self) -> AsyncGenerator[str, None]:
+        """
+        Yield text chunks until the iterator ends or the client disconnects.
+
+        Close the generator (``contextlib.aclosing``) so the worker is stopped
+        as soon as the consumer goes away.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_buffered)
+        self._producer = asyncio.ensure_future(asyncio.to_thread(self._run, queue, loop))
+        pending = None
+        last_check = loop.time()
+        try:
+            while True:
+                item = pending if pending is not None else await self._next(queue)
+                pending = None
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+
+                parts = [item]
+                size = len(item)
+                if self.coalesce_seconds > 0 and queue.empty():
+                    await asyncio.sleep(self.coalesce_seconds)
+                while size < self.max_frame_chars and not queue.empty():
+                    following = queue.get_nowait()
+                    if following is _END or isinstance(following, Exception):
+                        pending = following
+                        break
+                    parts.append(following)
+                    size += len(following)
+
+                self.tokens_received += len(parts)
+                self.frames_sent += 1
+                yield "".join(parts)
+
+                now = loop.time()
+                if self.is_disconnected is not None and now - last_check >= self.poll_seconds:
+                    last_check = now
+                    if await self.is_disconnected():
+                        self.disconnected = True
+                        break
+        finally:
+            self._cancel.set()
+        if not self.disconnected:
+            await self._producer
@@ -20,6 +20,7 @@ from r_cli.core.config import Config
 from r_cli.core.llm import LLMClient, Tool
 from r_cli.core.memory import Memory
 from r_cli.core.permissions import ApprovalCallback, PermissionManager
+from r_cli.core.tool_index import ToolIndex
 
 console = Console()
 
@@ -92,6 +93,13 @@ class Agent:
         self.skills: dict[str, Skill] = {}
         self.tools: list[Tool] = []
         self.external_tools: list[Tool] = []
+        self.tool_skills: dict[str, str] = {}
+        # Bumped whenever self.tools changes, so the tool index knows to rebuild
+        self.tools_generation = 0
+        self.tool_index = ToolIndex(
+            mode=self.config.skills.tool_retrieval,
+            embedding_model=self.config.skills.tool_embedding_model,
+        )
 
         # State
         self.is_running = False
@@ -110,18 +118,47 @@ class Agent:
 
         self.llm.set_system_prompt(full_prompt)
 
+    def spawn_session(self, memory_namespace: str | None = None) -> "Agent":
+        """
+        Create a lightweight agent that shares this agent's skills and tools.
+
+        The new agent has its own LLM history and memory namespace, so several
+        conversations can run side by side without reloading skills. The shared
+        skill/tool registry must be treated as read-only.
+        """
+        session = Agent(
+            self.config,
+            approval_callback=self.approval_callback,
+            auto_approve=self.auto_approve,
+            source=self.permissions.source,
+            memory_namespace=memory_namespace,
+        )
+        session.skills = self.skills
+        session.tools = self.tools
+        session.external_tools = self.external_tools
+        session.tool_skills = self.tool_skills
+        session.tools_generation = self.tools_generation
+        session.tool_index = self.tool_index
+        return session
+
     def register_skill(self, skill: "Skill", verbose: bool = False) -> None:
         """Register a skill and its tools."""
         self.skills[skill.name] = skill
 
         # Add skill's tools
         for tool in skill.get_tools():
+            self.tool_skills[tool.name] = skill.name
+            async_handler = tool.async_handler
+            if async_handler is not None:
+                async_handler = self.permissions.wrap_async(skill.name, tool.name, async_handler)
             self.tools.append(
                 replace(
                     tool,
                     handler=self.permissions.wrap(skill.name, tool.name, tool.handler),
+                    async_handler=async_handler,
                 )
             )
+        self.tools_generation += 1
 
         if verbose:
             console.print(f"[dim]Skill registered: {skill.name}[/dim]")
@@ -133,7 +170,7 @@ class Agent:
             verbose: Show skill loading messages
             auto_detect: Auto-detect skill mode based on context size
         """
-        from r_cli.skills import get_all_skills
+        from r_cli.skills.registry import LazySkill, get_skill_specs
 
         # Auto-detect mode based on context if enabled and mode is "auto"
         if auto_detect and self.config.skills.mode == "auto":
@@ -146,35 +183,27 @@ class Agent:
         loaded = 0
         skipped = 0
 
-        for skill_class in get_all_skills():
-            try:
-                skill = skill_class(self.config)
-
-                # Check if skill is enabled in config
-                if not self.config.skills.is_skill_enabled(skill.name):
-                    skipped += 1
-                    continue
+        # Skills come from the generated manifest; a skill module is imported
+        # only when one of its tools is first called
+        for spec in get_skill_specs():
+            if spec.name in self.skills:
+                continue
+            # Check if skill is enabled in config
+            if not self.config.skills.is_skill_enabled(spec.name):
+                skipped += 1
+                continue
 
-                self.register_skill(skill, verbose=verbose)
-                loaded += 1
-            except ImportError as e:
+            missing = spec.missing_requirements()
+            if missing:
                 if verbose:
                     console.print(
-                        f"[yellow]Missing dependency for {skill_class.__name__}: {e}[/yellow]"
-                    )
-            except TypeError as e:
-                if verbose:
-                    console.print(
-                        f"[yellow]Configuration error in {skill_class.__name__}: {e}[/yellow]"
-                    )
-            except OSError as e:
-                if verbose:
-                    console.print(f"[yellow]File/IO error in {skill_class.__name__}: {e}[/yellow]")
-            except Exception as e:
-                if verbose:
-                    console.print(
-                        f"[yellow]Unexpected error loading {skill_class.__name__}: {e}[/yellow]"
+                        f"[yellow]Missing dependency for {spec.class_name}: "
+                        f"{', '.join(missing)}[/yellow]"
                     )
+                continue
+
+            self.register_skill(LazySkill(spec, self.config), verbose=verbose)
+            loaded += 1
 
         if verbose:
             console.print(f"[dim]Loaded {loaded} skills ({skipped} disabled)[/dim]")
@@ -198,6 +227,7 @@ class Agent:
                 )
                 self.tools.extend(tools)
                 self.external_tools.extend(tools)
+                self.tools_generation += 1
                 if verbose:
                     console.print(f"[dim]Loaded {len(tools)} MCP tools from {server_name}[/dim]")
             except MCPError as exc:
@@ -208,175 +238,14 @@ class Agent:
         """
         Select tools relevant to the user's query.
 
-        Uses keyword matching to filter tools, reducing context usage.
+        Ranks every registered tool, including MCP tools, with the shared
+        ToolIndex and returns the top max_tools, reducing context usage.
         """
-        # Keyword to skill mapping
-        skill_keywords = {
-            "datetime": [
-                "time",
-                "date",
-                "today",
-                "now",
-                "calendar",
-                "schedule",
-                "when",
-                "hour",
-                "minute",
-            ],
-            "math": [
-                "calculate",
-                "math",
-                "sum",
-                "multiply",
-                "divide",
-                "equation",
-                "number",
-                "factorial",
-                "sqrt",
-                "2+2",
-                "2 + 2",
-            ],
-            "text": [
-                "text",
-                "string",
-                "word",
-                "count",
-                "uppercase",
-                "lowercase",
-                "slug",
-                "reverse",
-                "trim",
-            ],
-            "json": ["json", "parse json", "format json", "validate json"],
-            "yaml": ["yaml", "yml", "config file"],
-            "csv": ["csv", "spreadsheet", "comma separated"],
-            "crypto": [
-                "hash",
-                "md5",
-                "sha256",
-                "sha",
-                "encrypt",
-                "decrypt",
-                "base64",
-                "encode",
-                "decode",
-                "hmac",
-            ],
-            "pdf": ["pdf", "document", "report"],
-            "code": [
-                "code",
-                "program",
-                "script",
-                "function",
-                "class",
-                "python",
-                "javascript",
-                "generate code",
-            ],
-            "sql": ["sql", "query", "database", "select from", "insert into"],
-            "git": ["git", "commit", "branch", "merge", "repository", "repo", "diff", "status"],
-            "http": ["http", "api", "request", "fetch", "endpoint", "rest"],
-            "fs": [
-                "file",
-                "folder",
-                "directory",
-                "read file",
-                "write file",
-                "list files",
-                "delete file",
-                "copy file",
-            ],
-            "archive": ["zip", "tar", "compress", "extract", "archive", "unzip"],
-            "regex": ["regex", "pattern", "regular expression", "match pattern"],
-            "translate": [
-                "translate",
-                "translation",
-                "spanish",
-                "english",
-                "french",
-                "german",
-                "idioma",
-            ],
-            "image": ["image", "picture", "photo", "resize image", "crop", "png", "jpg", "jpeg"],
-            "video": ["video", "movie", "clip", "ffmpeg", "mp4"],
-            "audio": ["audio", "sound", "music", "mp3", "wav", "recording"],
-            "weather": ["weather", "temperature", "forecast", "rain", "sunny", "clima"],
-            "email": ["email", "mail", "send email", "smtp"],
-            "docker": ["docker", "container", "compose", "dockerfile"],
-            "ssh": ["ssh", "remote server", "connect to server"],
-            "qr": ["qr", "qrcode", "qr code"],
-            "barcode": ["barcode", "ean", "upc"],
-            "ocr": ["ocr", "text from image", "extract text", "recognize text"],
-            "voice": ["voice", "speech", "tts", "speak", "transcribe", "whisper", "audio to text"],
-            "websearch": [
-                "search",
-                "google",
-                "internet",
-                "web",
-                "wikipedia",
-                "who is",
-                "who was",
-                "what is",
-                "what was",
-                "when did",
-                "where is",
-                "how to",
-                "news",
-                "latest",
-                "current",
-                "information about",
-                "tell me about",
-                "explain",
-                "definition",
-                "meaning",
-            ],
-        }
-
-        user_lower = user_input.lower()
-        matched_skills = set()
-
-        # Always include core skills for general queries
-        matched_skills.add("datetime")
-
-        # Find matching skills based on keywords
-        for skill_name, keywords in skill_keywords.items():
-            for keyword in keywords:
-                if keyword in user_lower:
-                    matched_skills.add(skill_name)
-                    break
-
-        # Build tool-to-skill mapping from loaded skills
-        skill_tools = {}
-        for skill_name, skill in self.skills.items():
-            skill_tools[skill_name] = [t.name for t in skill.get_tools()]
-
-        # Filter tools to only those from matched skills
-        relevant_tools = []
-        for tool in self.tools:
-            for skill_name in matched_skills:
-                if skill_name in skill_tools and tool.name in skill_tools[skill_name]:
-                    relevant_tools.append(tool)
-                    break
-
-        # If too few tools matched, return core tools
-        if len(relevant_tools) < 3:
-            # Return tools from core skills
-            core_skills = ["datetime", "math", "text", "fs", "json"]
-            for tool in self.tools:
-                for skill_name in core_skills:
-                    if skill_name in skill_tools and tool.name in skill_tools[skill_name]:
-                        relevant_tools.append(tool)
-                        break
-                if len(relevant_tools) >= max_tools:
-                    break
-
-        prompt_words = {word for word in user_lower.replace("_", " ").split() if len(word) > 3}
-        for tool in self.external_tools:
-            searchable = f"{tool.name} {tool.description}".lower()
-            if any(word in searchable for word in prompt_words) and tool not in relevant_tools:
-                relevant_tools.append(tool)
-
-        return relevant_tools[:max_tools]
+        skill_descriptions = {name: skill.description for name, skill in self.skills.items()}
+        self.tool_index.ensure(
+            self.tools, self.tool_skills, skill_descriptions, self.tools_generation
+        )
+        return self.tool_index.select(user_input, max_tools)
 
     def run(self, user_input: str, show_thinking: bool = True, smart_tools: bool = True) -> str:
         """
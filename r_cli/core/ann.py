@@ -0,0 +1,388 @@
+"""
+Nearest-neighbour search backends for SemanticIndex.
+
+Vectors are L2-normalised, so similarity is the inner product. Every backend
+answers "top-k rows of this matrix for this query, restricted to a row mask";
+ANN backends only choose candidate rows, the returned scores are always exact.
+
+Backends:
+- exact: argpartition over the (masked) scores, no index
+- ivf: in-repo inverted file index (spherical k-means), knob: nprobe
+- hnswlib / faiss: HNSW graphs when the optional packages are installed,
+  knob: ef_search
+
+ANNSearcher keeps a backend in sync with a VectorStore (appends are indexed
+incrementally, compaction triggers a rebuild) and decides per query whether
+exact search is cheaper, e.g. for small stores or selective metadata filters.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from r_cli.core.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+ANN_BACKENDS = ("auto", "exact", "ivf", "hnswlib", "faiss")
+
+# Below this many candidate rows a brute-force scan beats any index
+DEFAULT_MIN_ROWS = 4096
+_ASSIGN_CHUNK_ROWS = 65536
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k largest scores, best first, without a full sort."""
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        part = np.argpartition(scores, -k)[-k:]
+    else:
+        part = np.arange(len(scores))
+    return part[np.argsort(scores[part])[::-1]]
+
+
+def exact_search(
+    matrix: np.ndarray,
+    query: np.ndarray,
+    k: int,
+    mask: Optional[np.ndarray] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Brute-force top-k over the rows selected by mask."""
+    if mask is None:
+        scores = np.asarray(matrix @ query, dtype=np.float32)
+        best = top_k(scores, k)
+        return best, scores[best]
+
+    rows = np.flatnonzero(mask)
+    if len(rows) == len(matrix):
+        return exact_search(matrix, query, k)
+    scores = np.asarray(matrix[rows] @ query, dtype=np.float32)
+    best = top_k(scores, k)
+    return rows[best], scores[best]
+
+
+class ANNBackend:
+    """Base class: candidate generation over a (rows, dimension) matrix."""
+
+    name = "base"
+
+    def build(self, matrix: np.ndarray) -> None:
+        raise NotImplementedError
+
+    def add(self, start: int, vectors: np.ndarray) -> None:
+        """Index rows start .. start + len(vectors)."""
+        raise NotImplementedError
+
+    def search(
+        self,
+        matrix: np.ndarray,
+        query: np.ndarray,
+        k: int,
+        mask: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+
+class ExactBackend(ANNBackend):
+    """No index: argpartition over every live row."""
+
+    name = "exact"
+
+    def build(self, matrix: np.ndarray) -> None:
+        pass
+
+    def add(self, start: int, vectors: np.ndarray) -> None:
+        pass
+
+    def search(self, matrix, query, k, mask):
+        return exact_search(matrix, query, k, mask)
+
+
+class IVFBackend(ANNBackend):
+    """
+    Inverted file index in NumPy.
+
+    Rows are clustered with spherical k-means; a query scans only the rows of
+    its nprobe closest clusters. More lists make each probe cheaper, a larger
+    nprobe trades latency for recall.
+    """
+
+    name = "ivf"
+
+    def __init__(
+        self,
+        n_lists: Optional[int] = None,
+        nprobe: int = 8,
+        iterations: int = 10,
+        sample_size: int = 50000,
+        seed: int = 0,
+    ):
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.sample_size = sample_size
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: list[np.ndarray] = []
+
+    def build(self, matrix: np.ndarray) -> None:
+        rows = len(matrix)
+        n_lists = min(self.n_lists or max(1, int(np.sqrt(rows))), rows)
+        rng = np.random.default_rng(self.seed)
+
+        sample_rows = np.sort(rng.choice(rows, min(rows, self.sample_size), replace=False))
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(self.iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=n_lists)
+            filled = counts > 0
+            norms = np.linalg.norm(sums[filled], axis=1, keepdims=True)
+            centroids[filled] = sums[filled] / np.maximum(norms, 1e-12)
+
+        self.centroids = centroids
+        self._lists = [np.empty(0, dtype=np.int64) for _ in range(n_lists)]
+        self.add(0, matrix)
+
+    def add(self, start: int, vectors: np.ndarray) -> None:
+        buckets: list[list[np.ndarray]] = [[] for _ in self._lists]
+        for offset in range(0, len(vectors), _ASSIGN_CHUNK_ROWS):
+            chunk = np.asarray(vectors[offset : offset + _ASSIGN_CHUNK_ROWS], dtype=np.float32)
+            assignment = np.argmax(chunk @ self.centroids.T, axis=1)
+            rows = np.arange(start + offset, start + offset + len(chunk))
+            order = np.argsort(assignment, kind="stable")
+            bounds = np.searchsorted(assignment[order], np.arange(len(self._lists) + 1))
+            for list_id in np.flatnonzero(np.diff(bounds)):
+                buckets[list_id].append(rows[order[bounds[list_id] : bounds[list_id + 1]]])
+        for list_id, parts in enumerate(buckets):
+            if parts:
+                self._lists[list_id] = np.concatenate([self._lists[list_id], *parts])
+
+    def search(self, matrix, query, k, mask):
+        probes = top_k(self.centroids @ query, min(self.nprobe, len(self._lists)))
+        candidates = np.concatenate([self._lists[list_id] for list_id in probes])
+        # Sorted rows keep memmap reads sequential
+        candidates = np.sort(candidates[mask[candidates]])
+        scores = np.asarray(matrix[candidates] @ query, dtype=np.float32)
+        best = top_k(scores, k)
+        return candidates[best], scores[best]
+
+
+class HNSWLibBackend(ANNBackend):
+    """HNSW graph from the optional hnswlib package."""
+
+    name = "hnswlib"
+
+    def __init__(self, m: int = 16, ef_construction: int = 200, ef_search: int = 64):
+        import hnswlib  # noqa: F401 - fail at construction when unavailable
+
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._index: Any = None
+
+    def build(self, matrix: np.ndarray) -> None:
+        import hnswlib
+
+        self._index = hnswlib.Index(space="ip", dim=matrix.shape[1])
+        self._index.init_index(
+            max_elements=max(len(matrix), 1),
+            ef_construction=self.ef_construction,
+            M=self.m,
+        )
+        self.add(0, matrix)
+
+    def add(self, start: int, vectors: np.ndarray) -> None:
+        needed = start + len(vectors)
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, self._index.get_max_elements() * 2))
+        for offset in range(0, len(vectors), _ASSIGN_CHUNK_ROWS):
+            chunk = np.asarray(vectors[offset : offset + _ASSIGN_CHUNK_ROWS], dtype=np.float32)
+            ids = np.arange(start + offset, start + offset + len(chunk))
+            self._index.add_items(chunk, ids)
+
+    def search(self, matrix, query, k, mask):
+        self._index.set_ef(max(self.ef_search, k))
+        row_filter = None if mask.all() else (lambda row: bool(mask[row]))
+        try:
+            labels, _ = self._index.knn_query(query.reshape(1, -1), k=k, filter=row_filter)
+        except RuntimeError:
+            # hnswlib raises when fewer than k rows are reachable; caller goes exact
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        candidates = labels[0].astype(np.int64)
+        scores = np.asarray(matrix[candidates] @ query, dtype=np.float32)
+        best = np.argsort(scores)[::-1]
+        return candidates[best], scores[best]
+
+
+class FaissBackend(ANNBackend):
+    """HNSW graph from the optional faiss package."""
+
+    name = "faiss"
+
+    def __init__(self, m: int = 32, ef_construction: int = 200, ef_search: int = 64):
+        import faiss  # noqa: F401 - fail at construction when unavailable
+
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._index: Any = None
+
+    def build(self, matrix: np.ndarray) -> None:
+        import faiss
+
+        self._index = faiss.IndexHNSWFlat(matrix.shape[1], self.m, faiss.METRIC_INNER_PRODUCT)
+        self._index.hnsw.efConstruction = self.ef_construction
+        self.add(0, matrix)
+
+    def add(self, start: int, vectors: np.ndarray) -> None:
+        # faiss HNSW assigns sequential ids, which matches store rows
+        for offset in range(0, len(vectors), _ASSIGN_CHUNK_ROWS):
+            chunk = vectors[offset : offset + _ASSIGN_CHUNK_ROWS]
+            self._index.add(np.ascontiguousarray(chunk, dtype=np.float32))
+
+    def search(self, matrix, query, k, mask):
+        import faiss
+
+        selector = faiss.IDSelectorBatch(np.flatnonzero(mask).astype(np.int64))
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=max(self.ef_search, k))
+        _, labels = self._index.search(query.reshape(1, -1).astype(np.float32), k, params=params)
+        candidates = labels[0][labels[0] >= 0].astype(np.int64)
+        scores = np.asarray(matrix[candidates] @ query, dtype=np.float32)
+        best = np.argsort(scores)[::-1]
+        return candidates[best], scores[best]
+
+
+_BACKENDS: dict[str, type[ANNBackend]] = {
+    "exact": ExactBackend,
+    "ivf": IVFBackend,
+    "hnswlib": HNSWLibBackend,
+    "faiss": FaissBackend,
+}
+
+_PACKAGES = {"hnswlib": "hnswlib", "faiss": "faiss-cpu"}
+
+_BACKEND_PARAMS = {
+    "ivf": {"n_lists", "nprobe", "iterations", "sample_size", "seed"},
+    "hnswlib": {"m", "ef_construction", "ef_search"},
+    "faiss": {"m", "ef_construction", "ef_search"},
+    "exact": set(),
+}
+
+
+def create_backend(name: str = "auto", **params: Any) -> ANNBackend:
+    """
+    Instantiate a backend by name.
+
+    "auto" prefers hnswlib, then faiss, then the in-repo IVF index. Parameters
+    that do not apply to the chosen backend are ignored, so one set of knobs
+    (e.g. nprobe and ef_search) can be passed regardless of what is installed.
+    """
+    if name not in ANN_BACKENDS:
+        raise ValueError(f"Unknown ANN backend '{name}'. Use: {', '.join(ANN_BACKENDS)}")
+
+    def options(backend: str) -> dict[str, Any]:
+        return {key: value for key, value in params.items() if key in _BACKEND_PARAMS[backend]}
+
+    if name != "auto":
+        try:
+            return _BACKENDS[name](**options(name))
+        except ImportError:
+            raise ImportError(
+                f"ANN backend '{name}' is not installed. Run: pip install {_PACKAGES[name]}"
+            ) from None
+
+    for optional in ("hnswlib", "faiss"):
+        try:
+            return _BACKENDS[optional](**options(optional))
+        except ImportError:
+            logger.debug(f"{optional} not installed, trying next ANN backend")
+    return IVFBackend(**options("ivf"))
+
+
+class ANNSearcher:
+    """Keeps an ANN backend in sync with a VectorStore and routes queries."""
+
+    def __init__(
+        self,
+        backend: str = "auto",
+        min_rows: int = DEFAULT_MIN_ROWS,
+        **params: Any,
+    ):
+        """
+        Args:
+            backend: One of ANN_BACKENDS
+            min_rows: Candidate count below which queries use exact search
+            **params: Backend knobs (nprobe, n_lists, ef_search, m, ...)
+        """
+        self.backend_name = backend
+        self.min_rows = min_rows
+        self.params = params
+        self._backend: Optional[ANNBackend] = None
+        self._generation: Optional[int] = None
+        self._indexed_rows = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> str:
+        """Name of the active backend ("exact" until an index has been built)."""
+        return self._backend.name if self._backend else "exact"
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._backend = None
+            self._generation = None
+            self._indexed_rows = 0
+
+    def _sync(self, store: VectorStore, matrix: np.ndarray) -> ANNBackend:
+        if self._backend is None or self._generation != store.generation:
+            backend = create_backend(self.backend_name, **self.params)
+            backend.build(matrix)
+            self._backend = backend
+            self._generation = store.generation
+            self._indexed_rows = len(matrix)
+        elif len(matrix) > self._indexed_rows:
+            self._backend.add(self._indexed_rows, matrix[self._indexed_rows :])
+            self._indexed_rows = len(matrix)
+        return self._backend
+
+    def search(
+        self,
+        store: VectorStore,
+        query: np.ndarray,
+        k: int,
+        mask: np.ndarray,
+        exact: bool = False,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return (rows, similarities) of the best k rows allowed by mask.
+
+        Falls back to exact search when the backend is "exact", the query is
+        forced exact, too few rows pass the mask for an index to pay off, or
+        the index returns fewer than k candidates (heavily filtered queries).
+        """
+        matrix = store.matrix()
+        allowed = int(mask.sum())
+        k = min(k, allowed)
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if exact or self.backend_name == "exact" or allowed < self.min_rows:
+            return exact_search(matrix, query, k, mask)
+
+        with self._lock:
+            backend = self._sync(store, matrix)
+            rows, scores = backend.search(matrix, query, k, mask)
+
+        if len(rows) < k:
+            return exact_search(matrix, query, k, mask)
+        return rows, scores
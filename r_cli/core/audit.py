@@ -0,0 +1,279 @@
+"""
+Process-wide, buffered writer for the permission audit trail.
+
+Tool calls hand audit records to a queue and return; a background thread
+serializes them, appends them to the JSONL file in batches, and fsyncs at
+most once per fsync interval. Records that must not be lost (``denied``
+decisions, or every record in ``sync`` durability mode) block their caller
+until they are on disk. The file is rotated to ``<name>.1`` ... ``<name>.N``
+once it grows past ``max_bytes``.
+
+Usage:
+    writer = get_audit_writer(path)
+    writer.write(record)
+    writer.write(denied_record, durable=True)
+    flush_audit_logs()
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_FSYNC_INTERVAL = 1.0
+# An idle writer thread exits after this long and restarts on the next record
+IDLE_TIMEOUT = 30.0
+_MAX_BATCH = 512
+_STOP = object()
+
+
+class AuditWriter:
+    """Background JSONL appender for one audit file."""
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backups: int = DEFAULT_BACKUPS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        fsync_interval: float = DEFAULT_FSYNC_INTERVAL,
+    ):
+        """
+        Args:
+            path: Audit JSONL file
+            max_bytes: Size at which the file is rotated (0 disables rotation)
+            backups: Rotated files kept next to the active one
+            queue_size: Records buffered before writers block
+            fsync_interval: Longest time a written record waits for fsync
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.fsync_interval = fsync_interval
+
+        # Bounded: a stalled disk slows tool calls down instead of dropping records
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._handle = None
+        self._size = 0
+
+    # ==================== PRODUCERS ====================
+
+    def write(self, record: dict[str, Any], durable: bool = False) -> None:
+        """Queue a record; with durable=True, return only once it is fsynced."""
+        written = threading.Event() if durable else None
+        self._queue.put((record, written))
+        # Checked after queueing: a retiring thread only exits with an empty queue
+        self._ensure_worker()
+        if written is not None:
+            written.wait()
+
+    def flush(self) -> None:
+        """Block until every record queued so far is written and fsynced."""
+        flushed = threading.Event()
+        self._queue.put((None, flushed))
+        # Same order as write(): a retiring thread only exits with an empty queue
+        self._ensure_worker()
+        flushed.wait()
+
+    def close(self) -> None:
+        """Flush pending records and stop the writer thread."""
+        with self._worker_lock:
+            worker = self._worker
+        if worker is None or not worker.is_alive():
+            return
+        self._queue.put(_STOP)
+        worker.join()
+        # Records queued while the old thread was stopping get a new one
+        if not self._queue.empty():
+            self._ensure_worker()
+
+    def _retire(self, stopping: bool = False) -> bool:
+        """Detach the calling writer thread; an idle one stays while records are queued."""
+        with self._worker_lock:
+            if not stopping and not self._queue.empty():
+                return False
+            # Closed under the lock so a replacement thread never shares the handle
+            self._close_file()
+            if self._worker is threading.current_thread():
+                self._worker = None
+            return True
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="r-audit-writer", daemon=True
+                )
+                self._worker.start()
+
+    # ==================== WRITER THREAD ====================
+
+    def _run(self) -> None:
+        dirty = False
+        last_sync = last_record = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                if dirty:
+                    self._sync()
+                    dirty = False
+                    last_sync = time.monotonic()
+                elif time.monotonic() - last_record >= IDLE_TIMEOUT and self._retire():
+                    return
+                continue
+            last_record = time.monotonic()
+
+            batch = [item]
+            while len(batch) < _MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(entry is _STOP for entry in batch)
+            entries = [entry for entry in batch if entry is not _STOP]
+            waiters = [waiter for _, waiter in entries if waiter is not None]
+
+            try:
+                lines = [
+                    json.dumps(record, default=str) + "\n"
+                    for record, _ in entries
+                    if record is not None
+                ]
+                if lines:
+                    self._append(lines)
+                    dirty = True
+                if dirty and (
+                    waiters or stop or time.monotonic() - last_sync >= self.fsync_interval
+                ):
+                    self._sync()
+                    dirty = False
+                    last_sync = time.monotonic()
+            except Exception as e:
+                # Keep the thread alive; the batch is lost but nobody waits forever
+                logger.warning(f"Failed to write audit records to {self.path}: {e}")
+                self._close_file()
+                dirty = False
+            finally:
+                for waiter in waiters:
+                    waiter.set()
+            if stop:
+                self._retire(stopping=True)
+                return
+
+    def _append(self, lines: list[str]) -> None:
+        try:
+            if self._handle is None:
+                self._open()
+            chunk: list[bytes] = []
+            chunk_size = 0
+            for line in lines:
+                data = line.encode("utf-8")
+                if self.max_bytes and self._size + chunk_size + len(data) > self.max_bytes:
+                    self._handle.write(b"".join(chunk))
+                    self._size += chunk_size
+                    chunk, chunk_size = [], 0
+                    if self._size:
+                        self._rotate()
+                chunk.append(data)
+                chunk_size += len(data)
+            self._handle.write(b"".join(chunk))
+            # Flush to the OS per batch so readers in other processes see new records
+            self._handle.flush()
+            self._size += chunk_size
+        except OSError as e:
+            logger.warning(f"Failed to write audit records to {self.path}: {e}")
+            self._close_file()
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = open(self.path, "ab")  # noqa: SIM115 - kept open across batches
+        self._size = self._handle.tell()
+
+    def _rotate(self) -> None:
+        self._close_file()
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                source = self.path.with_name(f"{self.path.name}.{index}")
+                if source.exists():
+                    source.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+        self._open()
+
+    def _sync(self) -> None:
+        if self._handle is None:
+            return
+        try:
+            os.fsync(self._handle.fileno())
+        except OSError as e:
+            logger.warning(f"Failed to fsync audit log {self.path}: {e}")
+
+    def _close_file(self) -> None:
+        if self._handle is not None:
+            try:
+                self._handle.close()
+            except OSError:
+                pass
+            self._handle = None
+
+
+_writers: dict[Path, AuditWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_audit_writer(
+    path: Path,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backups: int = DEFAULT_BACKUPS,
+) -> AuditWriter:
+    """Return the process-wide writer for an audit file, creating it on first use."""
+    key = Path(path).expanduser().resolve()
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = AuditWriter(key, max_bytes=max_bytes, backups=backups)
+            _writers[key] = writer
+        return writer
+
+
+def flush_audit_log(path: Path) -> None:
+    """Make records queued by this process for one audit file visible on disk."""
+    with _writers_lock:
+        writer = _writers.get(Path(path).expanduser().resolve())
+    if writer is not None:
+        writer.flush()
+
+
+def flush_audit_logs() -> None:
+    """Flush every audit writer in this process."""
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.flush()
+
+
+@atexit.register
+def _close_audit_writers() -> None:
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close()
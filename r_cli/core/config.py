@@ -55,6 +55,10 @@ class LLMConfig(BaseModel):
     skill_timeout: float = 60.0  # Timeout for skill execution
     connection_timeout: float = 10.0  # Timeout for initial connection
 
+    # Tool execution
+    max_parallel_tools: int = 4  # Concurrent tool calls per assistant turn (1 = sequential)
+    stable_tool_order: bool = True  # Sort tools by name so servers can reuse prompt caches
+
     # Token limits
     max_context_tokens: int = 8192  # Maximum tokens in context
     token_warning_threshold: float = 0.8  # Warn at 80% of limit
@@ -107,6 +111,10 @@ class SkillsConfig(BaseModel):
     # Mode: "whitelist" (only enabled), "blacklist" (all except disabled), "lite" (essential only), "auto" (detect)
     mode: str = "blacklist"  # blacklist = use only 'disabled', whitelist = use only 'enabled'
 
+    # Tool selection per query: "auto" (embeddings when sentence-transformers is installed), "lexical", "embeddings"
+    tool_retrieval: str = "auto"
+    tool_embedding_model: str = "mini"  # EMBEDDING_MODELS entry used to embed tool descriptions
+
     # Essential skills for lite mode (loaded when context is limited)
     LITE_SKILLS: list[str] = [
         "datetime",
@@ -190,6 +198,9 @@ class SecurityConfig(BaseModel):
     denied_tools: list[str] = []
     audit_enabled: bool = True
     audit_path: str = "audit.jsonl"
+    audit_durability: str = "batched"  # batched (denied records synced immediately), sync
+    audit_max_bytes: int = 50 * 1024 * 1024  # rotate the audit log past this size
+    audit_backups: int = 5
     local_only: bool = True
     network_access: bool = False
     allowed_hosts: list[str] = []
@@ -206,6 +217,9 @@ class MCPServerConfig(BaseModel):
     cwd: Optional[str] = None
     enabled: bool = True
     timeout_seconds: float = 30.0
+    # Initialized sessions kept per server; requests are multiplexed over them
+    max_sessions: int = 1
+    idle_timeout_seconds: float = 300.0
 
 
 class MCPConfig(BaseModel):
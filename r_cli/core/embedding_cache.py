@@ -0,0 +1,229 @@
+"""
+Persistent embedding cache for LocalEmbeddings.
+
+Each model gets its own SQLite shard (<cache_dir>/<model>.sqlite3) holding
+key -> float32 vector blobs, so switching models never loads or evicts another
+model's entries. Lookups hit a bounded in-memory LRU first and fall back to a
+single indexed SELECT; nothing is loaded eagerly. Writes are inserts only;
+once a shard exceeds max_bytes the least recently used rows are deleted.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MEMORY_ITEMS = 4096
+# After eviction a shard is trimmed to this fraction of max_bytes
+_EVICT_TARGET = 0.9
+_SQLITE_MAX_VARIABLES = 900
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache for one model namespace."""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        namespace: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        memory_items: int = DEFAULT_MEMORY_ITEMS,
+    ):
+        """
+        Open (or create) the shard for a model.
+
+        Args:
+            cache_dir: Directory holding one shard per namespace
+            namespace: Model name; selects the shard file
+            max_bytes: Vector bytes kept on disk before LRU eviction
+            memory_items: Vectors kept in the in-memory LRU
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.namespace = namespace
+        self.path = self.cache_dir / f"{namespace}.sqlite3"
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        # Hits whose last_used is written with the next insert (or flush)
+        self._touched: set[str] = set()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)"
+            )
+        self._bytes = self._measure()
+
+        self._migrate_legacy_json()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def _measure(self) -> int:
+        # Vectors of one model share a dimension, so rows * row size is exact
+        count, row_bytes = self._conn.execute(
+            "SELECT COUNT(*), (SELECT LENGTH(vector) FROM embeddings LIMIT 1) FROM embeddings"
+        ).fetchone()
+        return count * (row_bytes or 0)
+
+    # ==================== LOOKUP ====================
+
+    def get(self, key: str) -> Optional[list[float]]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        """Return cached vectors for the keys that are present."""
+        found: dict[str, list[float]] = {}
+        missing: list[str] = []
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is None:
+                    missing.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    self._touched.add(key)
+                    found[key] = vector.tolist()
+
+            unique = list(dict.fromkeys(missing))
+            for offset in range(0, len(unique), _SQLITE_MAX_VARIABLES):
+                chunk = unique[offset : offset + _SQLITE_MAX_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                for key, blob in self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ):
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    self._remember(key, vector)
+                    self._touched.add(key)
+                    found[key] = vector.tolist()
+
+            if len(self._touched) > self.memory_items:
+                with self._conn:
+                    self._flush_touched(time.time())
+        return found
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    # ==================== WRITE ====================
+
+    def put(self, key: str, vector: list[float]) -> None:
+        self.put_many({key: vector})
+
+    def put_many(self, items: dict[str, list[float]]) -> None:
+        """Insert vectors in one transaction and evict if the shard is over budget."""
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, vector in items.items():
+            array = np.asarray(vector, dtype=np.float32)
+            rows.append((key, array.tobytes(), now))
+
+        with self._lock:
+            with self._conn:
+                inserted = self._conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings(key, vector, last_used) VALUES (?, ?, ?)",
+                    rows,
+                ).rowcount
+                self._bytes += max(inserted, 0) * len(rows[0][1])
+                self._flush_touched(now)
+                if self._bytes > self.max_bytes:
+                    self._evict()
+            for key, blob, _ in rows:
+                self._remember(key, np.frombuffer(blob, dtype=np.float32))
+
+    def _flush_touched(self, now: float) -> None:
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE embeddings SET last_used = ? WHERE key = ?",
+            [(now, key) for key in self._touched],
+        )
+        self._touched.clear()
+
+    def _evict(self) -> None:
+        """Delete least recently used rows until the shard is under budget."""
+        target = int(self.max_bytes * _EVICT_TARGET)
+        row_bytes = self._conn.execute("SELECT LENGTH(vector) FROM embeddings LIMIT 1").fetchone()
+        if not row_bytes:
+            return
+        excess_rows = -(-(self._bytes - target) // row_bytes[0])  # ceil division
+        evicted = [
+            key
+            for (key,) in self._conn.execute(
+                "SELECT key FROM embeddings ORDER BY last_used LIMIT ?", (excess_rows,)
+            )
+        ]
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", [(k,) for k in evicted])
+        for key in evicted:
+            self._memory.pop(key, None)
+        self._bytes = max(self._bytes - len(evicted) * row_bytes[0], 0)
+        logger.debug(f"Evicted {len(evicted)} embeddings from cache shard {self.path}")
+
+    def flush(self) -> None:
+        """Persist pending last-used updates."""
+        with self._lock, self._conn:
+            self._flush_touched(time.time())
+
+    def clear(self) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM embeddings")
+            self._memory.clear()
+            self._touched.clear()
+            self._bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    # ==================== MIGRATION ====================
+
+    def _migrate_legacy_json(self) -> None:
+        """Import cache_<namespace>.json written by earlier versions."""
+        legacy = self.cache_dir / f"cache_{self.namespace}.json"
+        if not legacy.is_file():
+            return
+        try:
+            with open(legacy) as f:
+                entries = json.load(f)
+            self.put_many(entries)
+            legacy.rename(legacy.with_name(legacy.name + ".migrated"))
+            logger.info(f"Migrated {len(entries)} cached embeddings from {legacy}")
+        except Exception as e:
+            logger.warning(f"Failed to migrate embedding cache {legacy}: {e}")
@@ -0,0 +1,250 @@
+"""
+Process-wide embedding service.
+
+One SentenceTransformer per EMBEDDING_MODELS entry is shared by every
+LocalEmbeddings instance and skill in the process. Concurrent embed calls are
+queued and encoded together by a worker thread: the first pending text opens
+a batch window of max_wait_ms, texts that arrive meanwhile join the batch, and
+identical texts already waiting share one encode.
+
+Usage:
+    service = get_embedding_service("mini")
+    vector = service.embed("hola")
+    vectors = service.embed_many(["a", "b"])
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from r_cli.core.embeddings import EmbeddingModel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+
+
+def detect_device(preferred: Optional[str] = None) -> str:
+    """Return the preferred device, or the best one torch can see."""
+    if preferred:
+        return preferred
+
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            return "cuda"
+        elif hasattr(torch.backends, "mps") and torch.backends.mps.is_available():
+            return "mps"
+    except ImportError:
+        logger.debug("torch not installed, using CPU for embeddings")
+
+    return "cpu"
+
+
+class EmbeddingService:
+    """Owns one embedding model and micro-batches requests to it."""
+
+    def __init__(
+        self,
+        model_config: EmbeddingModel,
+        device: Optional[str] = None,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        model: Any = None,
+    ):
+        """
+        Args:
+            model_config: Model to serve
+            device: 'cuda', 'cpu', 'mps' or None (auto-detect)
+            max_batch_size: Texts encoded per model call
+            max_wait_ms: How long the first queued text waits for others to join
+            model: Preloaded model with a SentenceTransformer-style encode()
+        """
+        self.model_config = model_config
+        self.device = device
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._model = model
+        self._model_lock = threading.Lock()
+        self._cond = threading.Condition()
+        # text -> future, in arrival order; identical texts share one future
+        self._pending: dict[str, Future] = {}
+        self._worker: Optional[threading.Thread] = None
+
+        self._started_at = time.monotonic()
+        self._requests = 0
+        self._texts = 0
+        self._deduplicated = 0
+        self._batches = 0
+        self._encoded = 0
+        self._encode_seconds = 0.0
+        self._max_queue_depth = 0
+
+    # ==================== MODEL ====================
+
+    @property
+    def model(self):
+        """Lazily loaded model, shared by every caller of this service."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
+
+    def _load_model(self):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError(
+                "sentence-transformers no está instalado. "
+                "Ejecuta: pip install sentence-transformers"
+            )
+
+        model = SentenceTransformer(
+            self.model_config.model_id,
+            device=detect_device(self.device),
+        )
+        model.max_seq_length = self.model_config.max_seq_length
+        return model
+
+    # ==================== REQUESTS ====================
+
+    def embed(self, text: str) -> list[float]:
+        """Embed one text (blocks until its batch has been encoded)."""
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts, sharing model calls with concurrent callers."""
+        if not texts:
+            return []
+
+        futures = []
+        with self._cond:
+            self._requests += 1
+            self._texts += len(texts)
+            for text in texts:
+                future = self._pending.get(text)
+                if future is None:
+                    future = Future()
+                    self._pending[text] = future
+                else:
+                    self._deduplicated += 1
+                futures.append(future)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._pending))
+            self._ensure_worker()
+            self._cond.notify()
+
+        return [future.result().tolist() for future in futures]
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run,
+                name=f"r-embed-{self.model_config.name}",
+                daemon=True,
+            )
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # Give concurrent callers a short window to join this batch
+                deadline = time.monotonic() + self.max_wait_ms / 1000
+                while len(self._pending) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = []
+                for text in list(self._pending)[: self.max_batch_size]:
+                    batch.append((text, self._pending.pop(text)))
+
+            self._encode(batch)
+
+    def _encode(self, batch: list[tuple[str, Future]]) -> None:
+        started_at = time.perf_counter()
+        try:
+            vectors = np.asarray(
+                self.model.encode(
+                    [text for text, _ in batch],
+                    batch_size=len(batch),
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False,
+                ),
+                dtype=np.float32,
+            )
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+
+        elapsed = time.perf_counter() - started_at
+        with self._cond:
+            self._batches += 1
+            self._encoded += len(batch)
+            self._encode_seconds += elapsed
+        for (_, future), vector in zip(batch, vectors):
+            future.set_result(vector)
+
+    # ==================== METRICS ====================
+
+    def stats(self) -> dict[str, Any]:
+        """Throughput and queue metrics since the service was created."""
+        with self._cond:
+            uptime = time.monotonic() - self._started_at
+            return {
+                "model": self.model_config.name,
+                "loaded": self._model is not None,
+                "requests": self._requests,
+                "texts": self._texts,
+                "deduplicated": self._deduplicated,
+                "batches": self._batches,
+                "encoded": self._encoded,
+                "avg_batch_size": self._encoded / self._batches if self._batches else 0.0,
+                "queue_depth": len(self._pending),
+                "max_queue_depth": self._max_queue_depth,
+                "encode_seconds": round(self._encode_seconds, 4),
+                "texts_per_second": self._encoded / self._encode_seconds
+                if self._encode_seconds
+                else 0.0,
+                "uptime_seconds": round(uptime, 3),
+            }
+
+
+_services: dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(
+    model_name: str = "mini", device: Optional[str] = None
+) -> EmbeddingService:
+    """Return the process-wide service for a model, creating it on first use."""
+    from r_cli.core.embeddings import EMBEDDING_MODELS
+
+    model_config = EMBEDDING_MODELS.get(model_name, EMBEDDING_MODELS["mini"])
+    with _services_lock:
+        service = _services.get(model_config.name)
+        if service is None:
+            service = EmbeddingService(model_config, device=device)
+            _services[model_config.name] = service
+        return service
+
+
+def embedding_service_stats() -> list[dict[str, Any]]:
+    """Metrics for every service created in this process."""
+    with _services_lock:
+        services = list(_services.values())
+    return [service.stats() for service in services]
@@ -19,6 +19,11 @@ from typing import Any, Optional
 
 import numpy as np
 
+from r_cli.core.ann import ANNSearcher
+from r_cli.core.embedding_cache import DEFAULT_MAX_BYTES, EmbeddingCache
+from r_cli.core.embedding_service import EmbeddingService, detect_device, get_embedding_service
+from r_cli.core.vector_store import VectorStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -118,7 +123,9 @@ class LocalEmbeddings:
 
     Características:
     - 100% offline después de descargar el modelo
-    - Caché de embeddings para evitar recálculos
+    - Caché de embeddings en SQLite (un fichero por modelo, LRU en memoria)
+    - Un único modelo por proceso (EmbeddingService), compartido entre
+      instancias y con micro-batching de llamadas concurrentes
     - Soporte para GPU (CUDA) y CPU
     - Múltiples modelos para diferentes casos de uso
     """
@@ -129,6 +136,7 @@ class LocalEmbeddings:
         cache_dir: Optional[Path] = None,
         device: Optional[str] = None,
         use_cache: bool = True,
+        cache_max_bytes: int = DEFAULT_MAX_BYTES,
     ):
         """
         Inicializa el generador de embeddings.
@@ -138,94 +146,41 @@ class LocalEmbeddings:
             cache_dir: Directorio para caché de embeddings
             device: 'cuda', 'cpu', o None (auto-detect)
             use_cache: Si usar caché de embeddings
+            cache_max_bytes: Tamaño máximo en disco de la caché de este modelo
         """
         self.model_config = EMBEDDING_MODELS.get(model_name, EMBEDDING_MODELS["mini"])
         self.cache_dir = cache_dir or Path.home() / ".r-cli" / "embeddings_cache"
         self.use_cache = use_cache
 
-        self._model = None
         self._device = device
-        self._cache: dict[str, list[float]] = {}
+        self._cache: Optional[EmbeddingCache] = None
 
-        # Crear directorio de caché
         if use_cache:
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
-            self._load_cache()
+            self._cache = EmbeddingCache(
+                self.cache_dir,
+                self.model_config.name,
+                max_bytes=cache_max_bytes,
+            )
 
     def _detect_device(self) -> str:
         """Detecta el mejor dispositivo disponible."""
-        if self._device:
-            return self._device
-
-        try:
-            import torch
-
-            if torch.cuda.is_available():
-                return "cuda"
-            elif hasattr(torch.backends, "mps") and torch.backends.mps.is_available():
-                return "mps"
-        except ImportError:
-            logger.debug("torch not installed, using CPU for embeddings")
+        return detect_device(self._device)
 
-        return "cpu"
+    @property
+    def service(self) -> EmbeddingService:
+        """Servicio compartido del proceso para este modelo."""
+        return get_embedding_service(self.model_config.name, device=self._device)
 
     @property
     def model(self):
-        """Lazy loading del modelo."""
-        if self._model is None:
-            self._model = self._load_model()
-        return self._model
-
-    def _load_model(self):
-        """Carga el modelo de sentence-transformers."""
-        try:
-            from sentence_transformers import SentenceTransformer
-
-            device = self._detect_device()
-            model = SentenceTransformer(
-                self.model_config.model_id,
-                device=device,
-            )
-
-            # Configurar max_seq_length
-            model.max_seq_length = self.model_config.max_seq_length
-
-            return model
-
-        except ImportError:
-            raise ImportError(
-                "sentence-transformers no está instalado. "
-                "Ejecuta: pip install sentence-transformers"
-            )
+        """Modelo de sentence-transformers (cargado una vez por proceso)."""
+        return self.service.model
 
     def _get_cache_key(self, text: str) -> str:
         """Genera clave de caché para un texto."""
         content = f"{self.model_config.model_id}:{text}"
         return hashlib.md5(content.encode()).hexdigest()
 
-    def _load_cache(self):
-        """Carga caché de disco."""
-        cache_file = self.cache_dir / f"cache_{self.model_config.name}.json"
-        if cache_file.exists():
-            try:
-                with open(cache_file) as f:
-                    self._cache = json.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load embedding cache from {cache_file}: {e}")
-                self._cache = {}
-
-    def _save_cache(self):
-        """Guarda caché a disco."""
-        if not self.use_cache:
-            return
-
-        cache_file = self.cache_dir / f"cache_{self.model_config.name}.json"
-        try:
-            with open(cache_file, "w") as f:
-                json.dump(self._cache, f)
-        except Exception as e:
-            logger.warning(f"Failed to save embedding cache to {cache_file}: {e}")
-
     def embed(self, text: str) -> list[float]:
         """
         Genera embedding para un texto.
@@ -237,24 +192,18 @@ class LocalEmbeddings:
             Vector de embedding (lista de floats)
         """
         # Verificar caché
-        if self.use_cache:
+        if self._cache is not None:
             cache_key = self._get_cache_key(text)
-            if cache_key in self._cache:
-                return self._cache[cache_key]
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        # Generar embedding
-        embedding = self.model.encode(
-            text,
-            convert_to_numpy=True,
-            normalize_embeddings=True,
-        ).tolist()
+        # Generar embedding (agrupado con otras llamadas concurrentes)
+        embedding = self.service.embed(text)
 
         # Guardar en caché
-        if self.use_cache:
-            self._cache[cache_key] = embedding
-            # Guardar periódicamente (cada 100 nuevos embeddings)
-            if len(self._cache) % 100 == 0:
-                self._save_cache()
+        if self._cache is not None:
+            self._cache.put(cache_key, embedding)
 
         return embedding
 
@@ -264,7 +213,7 @@ class LocalEmbeddings:
 
         Args:
             texts: Lista de textos
-            batch_size: Tamaño del batch para procesamiento
+            batch_size: Ignorado; el servicio compartido decide el tamaño del batch
 
         Returns:
             Lista de vectores de embedding
@@ -274,43 +223,33 @@ class LocalEmbeddings:
         texts_to_encode = []
         indices_to_encode = []
 
+        keys = [self._get_cache_key(text) for text in texts] if self._cache is not None else []
+        hits = self._cache.get_many(keys) if self._cache is not None else {}
+
         for i, text in enumerate(texts):
-            if self.use_cache:
-                cache_key = self._get_cache_key(text)
-                if cache_key in self._cache:
-                    cached_results[i] = self._cache[cache_key]
-                    continue
+            if hits and keys[i] in hits:
+                cached_results[i] = hits[keys[i]]
+                continue
 
             texts_to_encode.append(text)
             indices_to_encode.append(i)
 
         # Generar embeddings para textos nuevos
         if texts_to_encode:
-            new_embeddings = self.model.encode(
-                texts_to_encode,
-                batch_size=batch_size,
-                convert_to_numpy=True,
-                normalize_embeddings=True,
-                show_progress_bar=len(texts_to_encode) > 100,
-            )
+            new_embeddings = self.service.embed_many(texts_to_encode)
 
-            # Guardar en caché
-            for idx, embedding in zip(indices_to_encode, new_embeddings):
-                emb_list = embedding.tolist()
+            # Guardar en caché (una sola transacción)
+            new_entries = {}
+            for idx, emb_list in zip(indices_to_encode, new_embeddings):
                 cached_results[idx] = emb_list
+                if self._cache is not None:
+                    new_entries[keys[idx]] = emb_list
 
-                if self.use_cache:
-                    cache_key = self._get_cache_key(texts[idx])
-                    self._cache[cache_key] = emb_list
+            if new_entries:
+                self._cache.put_many(new_entries)
 
         # Reconstruir orden original
-        results = [cached_results[i] for i in range(len(texts))]
-
-        # Guardar caché
-        if self.use_cache and texts_to_encode:
-            self._save_cache()
-
-        return results
+        return [cached_results[i] for i in range(len(texts))]
 
     def similarity(self, text1: str, text2: str) -> float:
         """
@@ -374,15 +313,14 @@ class LocalEmbeddings:
             "multilingual": self.model_config.multilingual,
             "max_seq_length": self.model_config.max_seq_length,
             "device": self._detect_device(),
-            "cache_size": len(self._cache),
+            "cache_size": len(self._cache) if self._cache is not None else 0,
+            "service": self.service.stats(),
         }
 
     def clear_cache(self):
-        """Limpia la caché de embeddings."""
-        self._cache = {}
-        cache_file = self.cache_dir / f"cache_{self.model_config.name}.json"
-        if cache_file.exists():
-            cache_file.unlink()
+        """Limpia la caché de embeddings de este modelo."""
+        if self._cache is not None:
+            self._cache.clear()
 
 
 class SemanticIndex:
@@ -390,55 +328,71 @@ class SemanticIndex:
     Índice semántico para búsqueda eficiente.
 
     Almacena documentos con sus embeddings y permite búsqueda
-    semántica sin necesidad de ChromaDB.
+    semántica sin necesidad de ChromaDB. Los vectores se guardan en un
+    VectorStore binario (segmento mmap + SQLite), así que añadir y borrar
+    no reescribe el índice completo. Las búsquedas pasan por un ANNSearcher
+    (IVF propio, o hnswlib/faiss si están instalados) cuando el índice es
+    grande, y por top-k exacto con argpartition cuando no.
     """
 
     def __init__(
         self,
         embeddings: LocalEmbeddings,
         index_path: Optional[Path] = None,
+        dtype: str = "float32",
+        ann: str = "auto",
+        ann_params: Optional[dict[str, Any]] = None,
     ):
         """
         Inicializa el índice semántico.
 
         Args:
             embeddings: Instancia de LocalEmbeddings
-            index_path: Ruta para persistir el índice
+            index_path: Ruta para persistir el índice. Un índice JSON antiguo en
+                esta ruta se migra al directorio del mismo nombre sin extensión.
+            dtype: Precisión de los vectores en disco ("float32" o "float16")
+            ann: Backend de búsqueda ("auto", "exact", "ivf", "hnswlib", "faiss")
+            ann_params: Ajustes de recall/latencia (min_rows, nprobe, n_lists,
+                ef_search, m, ef_construction)
         """
         self.embeddings = embeddings
         self.index_path = index_path or Path.home() / ".r-cli" / "semantic_index.json"
 
-        self.documents: list[dict[str, Any]] = []
-        self.vectors: Optional[np.ndarray] = None
-
-        self._load_index()
-
-    def _load_index(self):
-        """Carga el índice de disco."""
-        if self.index_path.exists():
-            try:
-                with open(self.index_path) as f:
-                    data = json.load(f)
+        store_dir = self.index_path.with_suffix("") if self.index_path.suffix else self.index_path
+        self.store = VectorStore(store_dir, dtype=dtype)
+        self.searcher = ANNSearcher(ann, **(ann_params or {}))
 
-                self.documents = data.get("documents", [])
+        self._migrate_legacy_index()
 
-                # Reconstruir matriz de vectores
-                if self.documents:
-                    vectors = [doc["embedding"] for doc in self.documents]
-                    self.vectors = np.array(vectors)
+    def __len__(self) -> int:
+        return len(self.store)
 
-            except Exception:
-                self.documents = []
-                self.vectors = None
-
-    def _save_index(self):
-        """Guarda el índice a disco."""
-        self.index_path.parent.mkdir(parents=True, exist_ok=True)
-
-        data = {"documents": self.documents}
+    def _migrate_legacy_index(self):
+        """Importa un índice JSON de versiones anteriores al VectorStore."""
+        legacy = self.index_path
+        if legacy.suffix != ".json" or not legacy.is_file() or len(self.store):
+            return
 
-        with open(self.index_path, "w") as f:
-            json.dump(data, f)
+        try:
+            with open(legacy) as f:
+                documents = json.load(f).get("documents", [])
+            if documents:
+                self.store.append(
+                    [
+                        {
+                            "id": doc["id"],
+                            "content": doc["content"],
+                            "metadata": doc.get("metadata", {}),
+                            "created_at": doc.get("created_at", datetime.now().isoformat()),
+                        }
+                        for doc in documents
+                    ],
+                    [doc["embedding"] for doc in documents],
+                )
+            legacy.rename(legacy.with_name(legacy.name + ".migrated"))
+            logger.info(f"Migrated {len(documents)} documents from {legacy}")
+        except Exception as e:
+            logger.warning(f"Failed to migrate legacy semantic index {legacy}: {e}")
 
     def add(
         self,
@@ -463,26 +417,17 @@ class SemanticIndex:
         # Generar embedding
         embedding = self.embeddings.embed(content)
 
-        # Crear documento
-        doc = {
-            "id": doc_id,
-            "content": content,
-            "embedding": embedding,
-            "metadata": metadata or {},
-            "created_at": datetime.now().isoformat(),
-        }
-
-        # Añadir al índice
-        self.documents.append(doc)
-
-        # Actualizar matriz de vectores
-        if self.vectors is None:
-            self.vectors = np.array([embedding])
-        else:
-            self.vectors = np.vstack([self.vectors, embedding])
-
-        # Guardar
-        self._save_index()
+        self.store.append(
+            [
+                {
+                    "id": doc_id,
+                    "content": content,
+                    "metadata": metadata or {},
+                    "created_at": datetime.now().isoformat(),
+                }
+            ],
+            [embedding],
+        )
 
         return doc_id
 
@@ -503,33 +448,22 @@ class SemanticIndex:
         embeddings = self.embeddings.embed_batch(contents)
 
         ids = []
-        new_docs = []
-        new_vectors = []
+        records = []
+        created_at = datetime.now().isoformat()
 
-        for doc, embedding in zip(documents, embeddings):
+        for doc in documents:
             doc_id = doc.get("id") or hashlib.md5(doc["content"].encode()).hexdigest()[:12]
             ids.append(doc_id)
+            records.append(
+                {
+                    "id": doc_id,
+                    "content": doc["content"],
+                    "metadata": doc.get("metadata", {}),
+                    "created_at": created_at,
+                }
+            )
 
-            new_doc = {
-                "id": doc_id,
-                "content": doc["content"],
-                "embedding": embedding,
-                "metadata": doc.get("metadata", {}),
-                "created_at": datetime.now().isoformat(),
-            }
-            new_docs.append(new_doc)
-            new_vectors.append(embedding)
-
-        # Actualizar índice
-        self.documents.extend(new_docs)
-
-        if self.vectors is None:
-            self.vectors = np.array(new_vectors)
-        else:
-            self.vectors = np.vstack([self.vectors, new_vectors])
-
-        # Guardar
-        self._save_index()
+        self.store.append(records, embeddings)
 
         return ids
 
@@ -538,6 +472,8 @@ class SemanticIndex:
         query: str,
         top_k: int = 5,
         threshold: float = 0.0,
+        where: Optional[dict[str, Any]] = None,
+        exact: bool = False,
     ) -> list[dict[str, Any]]:
         """
         Busca documentos similares a la query.
@@ -546,59 +482,55 @@ class SemanticIndex:
             query: Texto de búsqueda
             top_k: Número máximo de resultados
             threshold: Similitud mínima (0-1)
+            where: Filtro de metadatos aplicado antes de buscar,
+                {clave: valor} o {clave: [valores]}
+            exact: Forzar búsqueda exacta aunque haya índice ANN
 
         Returns:
             Lista de documentos con similitud
         """
-        if not self.documents or self.vectors is None:
+        if not len(self.store):
             return []
 
         # Generar embedding de la query
-        query_emb = np.array(self.embeddings.embed(query))
+        query_emb = np.asarray(self.embeddings.embed(query), dtype=np.float32)
 
-        # Calcular similitudes
-        similarities = np.dot(self.vectors, query_emb)
+        # Pre-filtrado: solo filas vivas que cumplen el filtro de metadatos
+        mask = self.store.metadata_mask(where) if where else self.store.alive.copy()
 
-        # Filtrar por threshold y ordenar
-        indices = np.where(similarities >= threshold)[0]
-        sorted_indices = indices[np.argsort(similarities[indices])[::-1]][:top_k]
+        rows, similarities = self.searcher.search(self.store, query_emb, top_k, mask, exact=exact)
+        keep = similarities >= threshold
+        rows, similarities = rows[keep], similarities[keep]
 
-        results = []
-        for idx in sorted_indices:
-            doc = self.documents[idx].copy()
-            doc["similarity"] = float(similarities[idx])
-            del doc["embedding"]  # No incluir embedding en resultado
-            results.append(doc)
+        results = self.store.get(rows.tolist())
+        for doc, similarity in zip(results, similarities):
+            doc["similarity"] = float(similarity)
 
         return results
 
     def delete(self, doc_id: str) -> bool:
         """Elimina un documento del índice."""
-        for i, doc in enumerate(self.documents):
-            if doc["id"] == doc_id:
-                self.documents.pop(i)
-                self.vectors = np.delete(self.vectors, i, axis=0)
-                self._save_index()
-                return True
-        return False
+        return self.store.delete(doc_id)
+
+    def compact(self) -> int:
+        """Reescribe el segmento de vectores sin los documentos borrados."""
+        return self.store.compact()
 
     def get_stats(self) -> dict[str, Any]:
         """Retorna estadísticas del índice."""
         return {
-            "total_documents": len(self.documents),
+            "total_documents": len(self.store),
             "embedding_dimension": self.embeddings.model_config.dimension,
             "model": self.embeddings.model_config.name,
-            "index_size_mb": self.index_path.stat().st_size / 1024 / 1024
-            if self.index_path.exists()
-            else 0,
+            "index_size_mb": self.store.size_bytes() / 1024 / 1024,
+            "storage_dtype": self.store.dtype.name,
+            "ann_backend": self.searcher.backend,
         }
 
     def clear(self):
         """Limpia todo el índice."""
-        self.documents = []
-        self.vectors = None
-        if self.index_path.exists():
-            self.index_path.unlink()
+        self.store.clear()
+        self.searcher.invalidate()
 
 
 def list_available_models() -> str:
@@ -13,9 +13,12 @@ Supports:
 - Retry with exponential backoff
 """
 
+import asyncio
+import functools
 import json
 import time
-from collections.abc import AsyncIterator, Callable, Iterator
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Any, Optional
 
@@ -143,6 +146,23 @@ class ToolCall:
     id: str
     name: str
     arguments: dict[str, Any]
+    # Arguments exactly as the model produced them, sent back verbatim so the
+    # server's cached prompt prefix still matches on the next round-trip
+    raw_arguments: Optional[str] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_raw(cls, id: str, name: str, raw_arguments: Optional[str]) -> "ToolCall":
+        """Build a tool call from the model's JSON arguments string."""
+        if not raw_arguments:
+            return cls(id=id, name=name, arguments={})
+        try:
+            arguments = json.loads(raw_arguments)
+        except json.JSONDecodeError:
+            logger.warning(f"Error parsing tool call arguments: {raw_arguments}")
+            return cls(id=id, name=name, arguments={})
+        if not isinstance(arguments, dict):
+            return cls(id=id, name=name, arguments={})
+        return cls(id=id, name=name, arguments=arguments, raw_arguments=raw_arguments)
 
 
 @dataclass
@@ -155,8 +175,36 @@ class Message:
     tool_call_id: Optional[str] = None  # For tool responses
     name: Optional[str] = None  # Tool name (for role=tool)
 
+    # Cached (content, token_count) so each message is tokenized only once
+    _token_cache: Optional[tuple[str, int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Cached (content, tool call count, payload) so history is serialized once
+    _dict_cache: Optional[tuple[Optional[str], int, dict]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def token_count(self, estimator: Callable[[str], int]) -> int:
+        """Return the token count of the content, computing it at most once."""
+        if not self.content:
+            return 0
+        cached = self._token_cache
+        if cached is not None and cached[0] is self.content:
+            return cached[1]
+        count = estimator(self.content)
+        self._token_cache = (self.content, count)
+        return count
+
     def to_dict(self) -> dict:
-        """Convert to OpenAI API format."""
+        """Convert to OpenAI API format.
+
+        The payload is built once and reused while content and tool calls are
+        unchanged; treat the returned dict as read-only.
+        """
+        cached = self._dict_cache
+        if cached is not None and cached[0] is self.content and cached[1] == len(self.tool_calls):
+            return cached[2]
+
         msg = {"role": self.role}
 
         if self.content is not None:
@@ -167,7 +215,10 @@ class Message:
                 {
                     "id": tc.id,
                     "type": "function",
-                    "function": {"name": tc.name, "arguments": json.dumps(tc.arguments)},
+                    "function": {
+                        "name": tc.name,
+                        "arguments": tc.raw_arguments or json.dumps(tc.arguments),
+                    },
                 }
                 for tc in self.tool_calls
             ]
@@ -178,6 +229,7 @@ class Message:
         if self.name:
             msg["name"] = self.name
 
+        self._dict_cache = (self.content, len(self.tool_calls), msg)
         return msg
 
 
@@ -189,17 +241,25 @@ class Tool:
     description: str
     parameters: dict[str, Any]  # JSON Schema
     handler: Callable[..., str]  # Función que ejecuta la tool
+    # Optional coroutine used by the async streaming path instead of a worker thread
+    async_handler: Optional[Callable[..., Awaitable[str]]] = None
+    timeout: Optional[float] = None  # Seconds; defaults to LLMConfig.skill_timeout
+
+    # Serialized once; tool definitions do not change after registration
+    _payload: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
 
     def to_dict(self) -> dict:
-        """Convert to OpenAI API format."""
-        return {
-            "type": "function",
-            "function": {
-                "name": self.name,
-                "description": self.description,
-                "parameters": self.parameters,
-            },
-        }
+        """Convert to OpenAI API format (cached; treat as read-only)."""
+        if self._payload is None:
+            self._payload = {
+                "type": "function",
+                "function": {
+                    "name": self.name,
+                    "description": self.description,
+                    "parameters": self.parameters,
+                },
+            }
+        return self._payload
 
 
 class LLMClient:
@@ -244,6 +304,9 @@ class LLMClient:
         # Message history
         self.messages: list[Message] = []
 
+        # Worker pool for concurrent tool calls (created on first use)
+        self._tool_executor: Optional[ThreadPoolExecutor] = None
+
     def _estimate_tokens(self, text: str) -> int:
         """Count tokens in text using tiktoken for accuracy."""
         encoder = _get_token_encoder()
@@ -256,12 +319,12 @@ class LLMClient:
         return len(text) // 4 + 1
 
     def _get_context_tokens(self) -> int:
-        """Calculate total tokens in current context."""
-        total = 0
-        for msg in self.messages:
-            if msg.content:
-                total += self._estimate_tokens(msg.content)
-        return total
+        """Calculate total tokens in current context.
+
+        Each message caches its own count, so only messages added since the
+        last call are tokenized.
+        """
+        return sum(msg.token_count(self._estimate_tokens) for msg in self.messages)
 
     def _check_token_limits(self, new_message: str) -> tuple[bool, str]:
         """
@@ -288,19 +351,56 @@ class LLMClient:
     def _truncate_context_if_needed(self) -> None:
         """Truncate context if it exceeds limits, keeping system prompt."""
         max_tokens = self.llm_config.max_context_tokens
+        total = self._get_context_tokens()
+        if total <= max_tokens:
+            return
+
+        # Single pass: drop the oldest non-system messages until under the limit
+        remaining = len(self.messages)
+        dropped: set[int] = set()
+        for i, msg in enumerate(self.messages):
+            if total <= max_tokens or remaining <= 2:
+                break
+            if msg.role == "system":
+                continue
+            total -= msg.token_count(self._estimate_tokens)
+            dropped.add(i)
+            remaining -= 1
+
+        if dropped:
+            self.messages = [m for i, m in enumerate(self.messages) if i not in dropped]
+            logger.info(f"Truncated {len(dropped)} messages to stay within token limit")
+
+    def _message_payloads(self) -> list[dict]:
+        """History in API format; each message is serialized only once."""
+        return [m.to_dict() for m in self.messages]
+
+    def _tool_payloads(self, tools: list[Tool]) -> list[dict]:
+        """Tool definitions in API format.
+
+        With llm.stable_tool_order the tools are sent sorted by name, so the
+        rendered prompt prefix is byte-identical across iterations and turns
+        and local servers can reuse their prompt (KV) cache.
+        """
+        if self.llm_config.stable_tool_order:
+            tools = sorted(tools, key=lambda tool: tool.name)
+        return [t.to_dict() for t in tools]
+
+    def ping(self, timeout: Optional[float] = None) -> None:
+        """List models once; raises if the server is unreachable.
 
-        while self._get_context_tokens() > max_tokens and len(self.messages) > 2:
-            # Keep system prompt (index 0), remove oldest messages
-            for i, msg in enumerate(self.messages):
-                if msg.role != "system":
-                    self.messages.pop(i)
-                    logger.info("Truncated message to stay within token limit")
-                    break
+        With a timeout the request is not retried, so a down server costs at
+        most ``timeout`` seconds.
+        """
+        client = self.client
+        if timeout is not None:
+            client = client.with_options(timeout=timeout, max_retries=0)
+        client.models.list()
 
     def _check_connection(self) -> bool:
         """Check if the LLM server is available."""
         try:
-            self.client.models.list()
+            self.ping()
             return True
         except Exception:
             return False
@@ -355,13 +455,13 @@ class LLMClient:
         # Preparar request
         request_params = {
             "model": self.llm_config.model,
-            "messages": [m.to_dict() for m in self.messages],
+            "messages": self._message_payloads(),
             "temperature": temperature or self.llm_config.temperature,
             "max_tokens": max_tokens or self.llm_config.max_tokens,
         }
 
         if tools:
-            request_params["tools"] = [t.to_dict() for t in tools]
+            request_params["tools"] = self._tool_payloads(tools)
             request_params["tool_choice"] = "auto"
 
         # Llamar al LLM con retry
@@ -391,14 +491,8 @@ class LLMClient:
 
         if choice.message.tool_calls:
             for tc in choice.message.tool_calls:
-                try:
-                    args = json.loads(tc.function.arguments)
-                except json.JSONDecodeError:
-                    logger.warning(f"Error parsing tool call arguments: {tc.function.arguments}")
-                    args = {}
-
                 assistant_message.tool_calls.append(
-                    ToolCall(id=tc.id, name=tc.function.name, arguments=args)
+                    ToolCall.from_raw(tc.id, tc.function.name, tc.function.arguments)
                 )
 
         # Agregar al historial
@@ -415,21 +509,115 @@ class LLMClient:
         """Llamada al LLM con retry automático."""
         return self.client.chat.completions.create(**request_params)
 
-    def execute_tools(self, tool_calls: list[ToolCall], tools: list[Tool]) -> list[Message]:
-        """Ejecuta las tools llamadas y retorna los resultados."""
-        results = []
+    def _get_tool_executor(self) -> ThreadPoolExecutor:
+        """Return the bounded pool used to run tool calls concurrently."""
+        if self._tool_executor is None:
+            self._tool_executor = ThreadPoolExecutor(
+                max_workers=max(1, self.llm_config.max_parallel_tools),
+                thread_name_prefix="r-tool",
+            )
+        return self._tool_executor
+
+    @staticmethod
+    def _invoke_tool(tc: ToolCall, tool_map: dict[str, Tool]) -> str:
+        """Run a single tool call, turning failures into a result string."""
+        tool = tool_map.get(tc.name)
+        if tool is None:
+            return f"Tool no encontrada: {tc.name}"
+        try:
+            return tool.handler(**tc.arguments)
+        except Exception as e:
+            return f"Error ejecutando {tc.name}: {e}"
+
+    @staticmethod
+    def _needs_approval(tc: ToolCall, tool_map: dict[str, Tool]) -> bool:
+        """Whether the call will prompt for interactive approval (see PermissionManager.wrap)."""
+        tool = tool_map.get(tc.name)
+        check = getattr(tool.handler, "needs_approval", None) if tool else None
+        return bool(check and check(tc.arguments))
+
+    def _run_tool_calls(self, tool_calls: list[ToolCall], tools: list[Tool]) -> list[str]:
+        """
+        Execute the tool calls of one assistant turn.
+
+        Independent calls run concurrently on the tool pool; calls that need
+        interactive approval run one at a time on the calling thread. Results
+        are returned in the same order as ``tool_calls``.
+        """
         tool_map = {t.name: t for t in tools}
+        results: list[str] = [""] * len(tool_calls)
+        serial = [i for i, tc in enumerate(tool_calls) if self._needs_approval(tc, tool_map)]
+        parallel = sorted(set(range(len(tool_calls))) - set(serial))
+
+        if len(parallel) < 2 or self.llm_config.max_parallel_tools <= 1:
+            for i, tc in enumerate(tool_calls):
+                results[i] = self._invoke_tool(tc, tool_map)
+            return results
+
+        executor = self._get_tool_executor()
+        futures = {i: executor.submit(self._invoke_tool, tool_calls[i], tool_map) for i in parallel}
+        for i in serial:
+            results[i] = self._invoke_tool(tool_calls[i], tool_map)
+        for i, future in futures.items():
+            results[i] = future.result()
+        return results
 
-        for tc in tool_calls:
-            if tc.name in tool_map:
-                tool = tool_map[tc.name]
-                try:
-                    result = tool.handler(**tc.arguments)
-                except Exception as e:
-                    result = f"Error ejecutando {tc.name}: {e}"
+    async def _invoke_tool_async(
+        self, tc: ToolCall, tool_map: dict[str, Tool], timeout: Optional[float]
+    ) -> str:
+        """
+        Run a single tool call without blocking the event loop.
+
+        Uses the tool's async_handler when it has one, otherwise offloads the
+        sync handler to the tool pool. A timed-out worker thread cannot be
+        interrupted, but the stream stops waiting for it.
+        """
+        tool = tool_map.get(tc.name)
+        if tool is None:
+            return f"Tool no encontrada: {tc.name}"
+        try:
+            if tool.async_handler is not None:
+                pending = tool.async_handler(**tc.arguments)
             else:
-                result = f"Tool no encontrada: {tc.name}"
+                pending = asyncio.get_running_loop().run_in_executor(
+                    self._get_tool_executor(), functools.partial(tool.handler, **tc.arguments)
+                )
+            return await asyncio.wait_for(pending, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Tool {tc.name} timed out after {timeout}s")
+            return f"Error ejecutando {tc.name}: tiempo de espera agotado ({timeout:g}s)"
+        except Exception as e:
+            return f"Error ejecutando {tc.name}: {e}"
+
+    async def _run_tool_calls_async(
+        self, tool_calls: list[ToolCall], tools: list[Tool]
+    ) -> list[str]:
+        """Async counterpart of _run_tool_calls that never blocks the event loop."""
+        tool_map = {t.name: t for t in tools}
+        results: list[str] = [""] * len(tool_calls)
+        serial = [i for i, tc in enumerate(tool_calls) if self._needs_approval(tc, tool_map)]
+        parallel = sorted(set(range(len(tool_calls))) - set(serial))
+
+        def timeout_for(tc: ToolCall) -> float:
+            tool = tool_map.get(tc.name)
+            return (tool.timeout if tool else None) or self.llm_config.skill_timeout
+
+        async def run_serial() -> None:
+            # No timeout here: the handler includes a human approval prompt
+            for i in serial:
+                results[i] = await self._invoke_tool_async(tool_calls[i], tool_map, None)
+
+        async def run_one(i: int) -> None:
+            tc = tool_calls[i]
+            results[i] = await self._invoke_tool_async(tc, tool_map, timeout_for(tc))
 
+        await asyncio.gather(run_serial(), *(run_one(i) for i in parallel))
+        return results
+
+    def execute_tools(self, tool_calls: list[ToolCall], tools: list[Tool]) -> list[Message]:
+        """Ejecuta las tools llamadas y retorna los resultados."""
+        results = []
+        for tc, result in zip(tool_calls, self._run_tool_calls(tool_calls, tools)):
             msg = Message(
                 role="tool",
                 content=result,
@@ -463,8 +651,8 @@ class LLMClient:
                 # Continuar conversación sin nuevo mensaje de usuario
                 request_params = {
                     "model": self.llm_config.model,
-                    "messages": [m.to_dict() for m in self.messages],
-                    "tools": [t.to_dict() for t in tools],
+                    "messages": self._message_payloads(),
+                    "tools": self._tool_payloads(tools),
                     "tool_choice": "auto",
                 }
 
@@ -483,12 +671,8 @@ class LLMClient:
 
                     if choice.message.tool_calls:
                         for tc in choice.message.tool_calls:
-                            try:
-                                args = json.loads(tc.function.arguments)
-                            except json.JSONDecodeError:
-                                args = {}
                             response.tool_calls.append(
-                                ToolCall(id=tc.id, name=tc.function.name, arguments=args)
+                                ToolCall.from_raw(tc.id, tc.function.name, tc.function.arguments)
                             )
 
                     self.messages.append(response)
@@ -533,13 +717,13 @@ class LLMClient:
 
             request_params = {
                 "model": self.llm_config.model,
-                "messages": [m.to_dict() for m in self.messages],
+                "messages": self._message_payloads(),
                 "temperature": self.llm_config.temperature,
                 "stream": True,
             }
 
             if tools:
-                request_params["tools"] = [t.to_dict() for t in tools]
+                request_params["tools"] = self._tool_payloads(tools)
 
             full_content = ""
             tool_calls_data: dict[int, dict] = {}  # index -> {id, name, arguments}
@@ -589,12 +773,8 @@ class LLMClient:
             if tool_calls_data:
                 for idx in sorted(tool_calls_data.keys()):
                     tc_data = tool_calls_data[idx]
-                    try:
-                        args = json.loads(tc_data["arguments"]) if tc_data["arguments"] else {}
-                    except json.JSONDecodeError:
-                        args = {}
                     assistant_message.tool_calls.append(
-                        ToolCall(id=tc_data["id"], name=tc_data["name"], arguments=args)
+                        ToolCall.from_raw(tc_data["id"], tc_data["name"], tc_data["arguments"])
                     )
 
             self.messages.append(assistant_message)
@@ -609,18 +789,13 @@ class LLMClient:
 
             # Execute tool calls
             yield "\n"  # Separator before tool execution
-            tool_map = {t.name: t for t in tools}
+            tool_names = {t.name for t in tools}
             for tc in assistant_message.tool_calls:
-                if tc.name in tool_map:
-                    tool = tool_map[tc.name]
+                if tc.name in tool_names:
                     yield f"[Executing: {tc.name}...]\n"
-                    try:
-                        result = tool.handler(**tc.arguments)
-                    except Exception as e:
-                        result = f"Error executing {tc.name}: {e}"
-                else:
-                    result = f"Tool not found: {tc.name}"
 
+            results = self._run_tool_calls(assistant_message.tool_calls, tools)
+            for tc, result in zip(assistant_message.tool_calls, results):
                 # Add tool result to messages
                 tool_msg = Message(
                     role="tool",
@@ -661,13 +836,13 @@ class LLMClient:
 
             request_params = {
                 "model": self.llm_config.model,
-                "messages": [m.to_dict() for m in self.messages],
+                "messages": self._message_payloads(),
                 "temperature": self.llm_config.temperature,
                 "stream": True,
             }
 
             if tools:
-                request_params["tools"] = [t.to_dict() for t in tools]
+                request_params["tools"] = self._tool_payloads(tools)
 
             full_content = ""
             tool_calls_data: dict[int, dict] = {}
@@ -717,12 +892,8 @@ class LLMClient:
             if tool_calls_data:
                 for idx in sorted(tool_calls_data.keys()):
                     tc_data = tool_calls_data[idx]
-                    try:
-                        args = json.loads(tc_data["arguments"]) if tc_data["arguments"] else {}
-                    except json.JSONDecodeError:
-                        args = {}
                     assistant_message.tool_calls.append(
-                        ToolCall(id=tc_data["id"], name=tc_data["name"], arguments=args)
+                        ToolCall.from_raw(tc_data["id"], tc_data["name"], tc_data["arguments"])
                     )
 
             self.messages.append(assistant_message)
@@ -737,18 +908,13 @@ class LLMClient:
 
             # Execute tool calls
             yield "\n"
-            tool_map = {t.name: t for t in tools}
+            tool_names = {t.name for t in tools}
             for tc in assistant_message.tool_calls:
-                if tc.name in tool_map:
-                    tool = tool_map[tc.name]
+                if tc.name in tool_names:
                     yield f"[Executing: {tc.name}...]\n"
-                    try:
-                        result = tool.handler(**tc.arguments)
-                    except Exception as e:
-                        result = f"Error executing {tc.name}: {e}"
-                else:
-                    result = f"Tool not found: {tc.name}"
 
+            results = await self._run_tool_calls_async(assistant_message.tool_calls, tools)
+            for tc, result in zip(assistant_message.tool_calls, results):
                 tool_msg = Message(
                     role="tool",
                     content=result,
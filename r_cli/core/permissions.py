@@ -2,16 +2,18 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import threading
 import time
 import uuid
-from collections.abc import Callable
-from dataclasses import asdict, dataclass
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+from r_cli.core.audit import get_audit_writer
 from r_cli.security import (
     NETWORK_SKILLS,
     PARAMETERIZED_NETWORK_SKILLS,
@@ -23,6 +25,7 @@ from r_cli.security import (
 )
 
 if TYPE_CHECKING:
+    from r_cli.core.audit import AuditWriter
     from r_cli.core.config import Config
 
 
@@ -152,6 +155,9 @@ class PermissionRequest:
 
 ApprovalCallback = Callable[[PermissionRequest], bool]
 
+# Interactive approval prompts must never interleave, even when tool calls run in parallel
+_APPROVAL_LOCK = threading.Lock()
+
 
 def classify_risk(
     skill_name: str,
@@ -204,6 +210,7 @@ class PermissionManager:
         self.approval_callback = approval_callback
         self.auto_approve = auto_approve
         self.source = source
+        self._writer: AuditWriter | None = None
 
     def authorize(
         self,
@@ -315,10 +322,7 @@ class PermissionManager:
             return request
 
         mode = self.security.mode
-        requires_confirmation = (
-            skill_name in self.config.skills.require_confirmation
-            or risk.value in self.security.confirm_risk
-        )
+        requires_confirmation = self._requires_confirmation(skill_name, risk)
 
         if mode == "permissive" or not requires_confirmation:
             request = PermissionRequest(
@@ -351,9 +355,10 @@ class PermissionManager:
             uuid.uuid4().hex,
             self.source,
         )
-        approved = self.auto_approve or (
-            self.approval_callback is not None and self.approval_callback(request)
-        )
+        approved = self.auto_approve
+        if not approved and self.approval_callback is not None:
+            with _APPROVAL_LOCK:
+                approved = self.approval_callback(request)
         if not approved:
             return self._deny(
                 skill_name,
@@ -366,6 +371,29 @@ class PermissionManager:
         self._audit(request, "approved")
         return request
 
+    def needs_approval(
+        self,
+        skill_name: str,
+        tool_name: str,
+        arguments: dict[str, Any] | None = None,
+    ) -> bool:
+        """Return True when authorizing this call would prompt the approval callback."""
+        if self.auto_approve or self.approval_callback is None:
+            return False
+        if self.security.mode in ("permissive", "strict"):
+            return False
+        target = f"{skill_name}.{tool_name}"
+        if skill_name in self.security.allowed_skills or target in self.security.allowed_tools:
+            return False
+        risk = classify_risk(skill_name, tool_name, arguments or {})
+        return self._requires_confirmation(skill_name, risk)
+
+    def _requires_confirmation(self, skill_name: str, risk: RiskLevel) -> bool:
+        return (
+            skill_name in self.config.skills.require_confirmation
+            or risk.value in self.security.confirm_risk
+        )
+
     def execute(
         self,
         skill_name: str,
@@ -387,6 +415,30 @@ class PermissionManager:
         self._audit(request, "completed", duration_ms=duration_ms)
         return result
 
+    async def execute_async(
+        self,
+        skill_name: str,
+        tool_name: str,
+        handler: Callable[..., Awaitable[Any]],
+        arguments: dict[str, Any] | None = None,
+    ) -> Any:
+        """Async variant of execute for coroutine handlers.
+
+        Authorization may block on an approval prompt, so it runs in a worker thread.
+        """
+        arguments = arguments or {}
+        request = await asyncio.to_thread(self.authorize, skill_name, tool_name, arguments)
+        started_at = time.perf_counter()
+        try:
+            result = await handler(**arguments)
+        except Exception as exc:
+            duration_ms = (time.perf_counter() - started_at) * 1000
+            self._audit(request, "error", error=str(exc), duration_ms=duration_ms)
+            raise
+        duration_ms = (time.perf_counter() - started_at) * 1000
+        self._audit(request, "completed", duration_ms=duration_ms)
+        return result
+
     def wrap(
         self,
         skill_name: str,
@@ -398,6 +450,23 @@ class PermissionManager:
         def guarded(**kwargs: Any) -> Any:
             return self.execute(skill_name, tool_name, handler, kwargs)
 
+        # Lets callers that run tool calls concurrently keep prompting calls serial
+        guarded.needs_approval = lambda arguments: self.needs_approval(  # type: ignore[attr-defined]
+            skill_name, tool_name, arguments
+        )
+        return guarded
+
+    def wrap_async(
+        self,
+        skill_name: str,
+        tool_name: str,
+        handler: Callable[..., Awaitable[Any]],
+    ) -> Callable[..., Awaitable[Any]]:
+        """Return a guarded coroutine tool handler."""
+
+        async def guarded(**kwargs: Any) -> Any:
+            return await self.execute_async(skill_name, tool_name, handler, kwargs)
+
         return guarded
 
     def _deny(
@@ -432,13 +501,10 @@ class PermissionManager:
         if not self.security.audit_enabled:
             return
 
-        path = Path(self.security.audit_path).expanduser()
-        if not path.is_absolute():
-            path = Path(self.config.home_dir).expanduser() / path
-        path.parent.mkdir(parents=True, exist_ok=True)
         payload = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
-            **asdict(request),
+            # Shallow copy: arguments are already a redacted copy owned by the request
+            **vars(request),
             "risk": request.risk.value,
             "decision": decision,
         }
@@ -446,8 +512,25 @@ class PermissionManager:
             payload["error"] = error
         if duration_ms is not None:
             payload["duration_ms"] = round(duration_ms, 3)
-        with path.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(payload, default=str) + "\n")
+        durable = decision == "denied" or self.security.audit_durability == "sync"
+        self._audit_writer().write(payload, durable=durable)
+
+    def _audit_writer(self) -> AuditWriter:
+        if self._writer is None:
+            self._writer = get_audit_writer(
+                audit_log_path(self.config),
+                max_bytes=self.security.audit_max_bytes,
+                backups=self.security.audit_backups,
+            )
+        return self._writer
+
+
+def audit_log_path(config: Config) -> Path:
+    """Resolve the configured audit log, relative paths being under home_dir."""
+    path = Path(config.security.audit_path).expanduser()
+    if not path.is_absolute():
+        path = Path(config.home_dir).expanduser() / path
+    return path
 
 
 def _redact_arguments(arguments: dict[str, Any]) -> dict[str, Any]:
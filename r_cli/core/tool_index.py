@@ -0,0 +1,363 @@
+"""
+Tool retrieval for Agent.get_relevant_tools.
+
+Every registered tool becomes one document: its name, description, parameter
+names and descriptions, the owning skill's name and description, and a few
+hand-picked synonyms per skill (SKILL_KEYWORDS). Queries are ranked with BM25
+over those documents. When an embedding model is available the documents are
+also embedded once, and the final score blends cosine similarity with the
+normalised BM25 score, so exact keyword hits still win over loose paraphrases.
+
+Document vectors go through LocalEmbeddings, whose on-disk cache is keyed by
+model and document text. The text contains the tool schema, so a changed
+skill re-embeds only its own tools and an unchanged one is read from disk.
+
+The index rebuilds itself when the tool list changes and is shared, read-only,
+by sessions spawned from the same agent.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from r_cli.core.embeddings import LocalEmbeddings
+    from r_cli.core.llm import Tool
+
+logger = logging.getLogger(__name__)
+
+TOOL_RETRIEVAL_MODES = ("auto", "lexical", "embeddings")
+
+# Skills whose tools are offered when a query matches almost nothing
+CORE_SKILLS = ["datetime", "math", "text", "fs", "json"]
+MIN_RELEVANT_TOOLS = 3
+
+# Synonyms users type that rarely appear in tool descriptions
+SKILL_KEYWORDS: dict[str, list[str]] = {
+    "datetime": ["time", "date", "today", "now", "calendar", "schedule", "hour", "minute"],
+    "math": ["calculate", "math", "sum", "multiply", "divide", "equation", "number", "sqrt"],
+    "text": ["text", "string", "word", "count", "uppercase", "lowercase", "slug", "reverse"],
+    "json": ["json", "parse", "format", "validate"],
+    "yaml": ["yaml", "yml", "config"],
+    "csv": ["csv", "spreadsheet", "comma", "separated"],
+    "crypto": ["hash", "md5", "sha256", "sha", "encrypt", "decrypt", "base64", "hmac"],
+    "pdf": ["pdf", "document", "report"],
+    "code": ["code", "program", "script", "function", "class", "python", "javascript"],
+    "sql": ["sql", "query", "database", "select", "insert"],
+    "git": ["git", "commit", "branch", "merge", "repository", "repo", "diff", "status"],
+    "http": ["http", "api", "request", "fetch", "endpoint", "rest"],
+    "fs": ["file", "folder", "directory", "read", "write", "list", "delete", "copy"],
+    "archive": ["zip", "tar", "compress", "extract", "archive", "unzip"],
+    "regex": ["regex", "pattern", "regular", "expression", "match"],
+    "translate": ["translate", "translation", "spanish", "english", "french", "german", "idioma"],
+    "image": ["image", "picture", "photo", "resize", "crop", "png", "jpg", "jpeg"],
+    "video": ["video", "movie", "clip", "ffmpeg", "mp4"],
+    "audio": ["audio", "sound", "music", "mp3", "wav", "recording"],
+    "weather": ["weather", "temperature", "forecast", "rain", "sunny", "clima"],
+    "email": ["email", "mail", "smtp"],
+    "docker": ["docker", "container", "compose", "dockerfile"],
+    "ssh": ["ssh", "remote", "server"],
+    "qr": ["qr", "qrcode"],
+    "barcode": ["barcode", "ean", "upc"],
+    "ocr": ["ocr", "recognize", "extract", "scan"],
+    "voice": ["voice", "speech", "tts", "speak", "transcribe", "whisper"],
+    "websearch": [
+        "search",
+        "google",
+        "internet",
+        "web",
+        "wikipedia",
+        "news",
+        "latest",
+        "current",
+        "information",
+        "explain",
+        "definition",
+        "meaning",
+    ],
+}
+
+_STOPWORDS = frozenset(
+    {
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "by",
+        "can",
+        "do",
+        "for",
+        "from",
+        "how",
+        "i",
+        "in",
+        "is",
+        "it",
+        "me",
+        "my",
+        "of",
+        "on",
+        "or",
+        "please",
+        "that",
+        "the",
+        "this",
+        "to",
+        "was",
+        "what",
+        "when",
+        "where",
+        "which",
+        "who",
+        "why",
+        "with",
+        "you",
+        "your",
+    }
+)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens without stopwords; a trailing plural 's' is dropped."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def tool_document(tool: Tool, skill_name: Optional[str], skill_description: str = "") -> str:
+    """Text that represents a tool for both lexical and embedding retrieval."""
+    parts = [tool.name.replace("_", " "), tool.description]
+    properties = (tool.parameters or {}).get("properties", {})
+    for name, schema in properties.items():
+        parts.append(name.replace("_", " "))
+        if isinstance(schema, dict) and schema.get("description"):
+            parts.append(str(schema["description"]))
+    if skill_name:
+        parts.append(skill_name)
+        parts.append(skill_description)
+        parts.extend(SKILL_KEYWORDS.get(skill_name, []))
+    return " ".join(part for part in parts if part)
+
+
+def embeddings_available() -> bool:
+    """Whether sentence-transformers is installed (checked without importing it)."""
+    return find_spec("sentence_transformers") is not None
+
+
+class ToolIndex:
+    """Ranks registered tools against a user query."""
+
+    def __init__(
+        self,
+        mode: str = "auto",
+        embedding_model: str = "mini",
+        embedding_weight: float = 0.6,
+        embeddings: Optional[LocalEmbeddings] = None,
+    ):
+        """
+        Args:
+            mode: 'auto' (embeddings when installed), 'lexical' or 'embeddings'
+            embedding_model: EMBEDDING_MODELS entry used for tool documents
+            embedding_weight: Share of the score taken by cosine similarity
+            embeddings: Preconfigured embedder, mainly for tests
+        """
+        if mode not in TOOL_RETRIEVAL_MODES:
+            raise ValueError(f"Unknown tool retrieval mode: {mode}")
+        self.mode = mode
+        self.embedding_model = embedding_model
+        self.embedding_weight = embedding_weight
+
+        self._embeddings = embeddings
+        self._embeddings_failed = False
+        self._lock = threading.Lock()
+
+        self._generation: Optional[int] = None
+        self._tools: list[Tool] = []
+        self._skills: list[Optional[str]] = []
+        self._term_freqs: list[Counter] = []
+        self._doc_lengths: list[int] = []
+        self._avg_length = 0.0
+        self._idf: dict[str, float] = {}
+        self._vectors: Any = None
+
+        self.build_ms = 0.0
+        self.last_query_ms = 0.0
+
+    @property
+    def backend(self) -> str:
+        """'hybrid' when document vectors are in use, otherwise 'lexical'."""
+        return "hybrid" if self._vectors is not None else "lexical"
+
+    def _embedder(self) -> Optional[LocalEmbeddings]:
+        if self._embeddings is not None:
+            return self._embeddings
+        if self.mode == "lexical" or self._embeddings_failed:
+            return None
+        if self.mode == "auto" and not embeddings_available():
+            return None
+
+        from r_cli.core.embeddings import LocalEmbeddings
+
+        self._embeddings = LocalEmbeddings(self.embedding_model)
+        return self._embeddings
+
+    def ensure(
+        self,
+        tools: list[Tool],
+        tool_skills: dict[str, str],
+        skill_descriptions: dict[str, str],
+        generation: int,
+    ) -> None:
+        """
+        Rebuild the index if the tool list changed since the last build.
+
+        Args:
+            generation: Counter the owner bumps whenever it changes tools
+        """
+        if generation == self._generation:
+            return
+        with self._lock:
+            if generation != self._generation:
+                self._build(list(tools), tool_skills, skill_descriptions)
+                self._generation = generation
+
+    def _build(
+        self,
+        tools: list[Tool],
+        tool_skills: dict[str, str],
+        skill_descriptions: dict[str, str],
+    ) -> None:
+        start = time.perf_counter()
+        skills = [tool_skills.get(tool.name) for tool in tools]
+        documents = [
+            tool_document(tool, skill, skill_descriptions.get(skill or "", ""))
+            for tool, skill in zip(tools, skills)
+        ]
+
+        term_freqs = [Counter(tokenize(document)) for document in documents]
+        doc_lengths = [sum(counts.values()) for counts in term_freqs]
+        doc_freq: Counter = Counter()
+        for counts in term_freqs:
+            doc_freq.update(counts.keys())
+        total = len(documents)
+        idf = {
+            term: math.log(1 + (total - count + 0.5) / (count + 0.5))
+            for term, count in doc_freq.items()
+        }
+
+        vectors = None
+        embedder = self._embedder()
+        if embedder is not None and documents:
+            try:
+                import numpy as np
+
+                vectors = np.asarray(embedder.embed_batch(documents), dtype=np.float32)
+                norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                vectors /= np.where(norms == 0, 1, norms)
+            except Exception as exc:
+                # Model missing or not downloaded: keep serving lexical results
+                logger.warning("Tool embeddings unavailable, using lexical retrieval: %s", exc)
+                self._embeddings_failed = True
+                self._embeddings = None
+                vectors = None
+
+        self._tools = tools
+        self._skills = skills
+        self._term_freqs = term_freqs
+        self._doc_lengths = doc_lengths
+        self._avg_length = (sum(doc_lengths) / total) if total else 0.0
+        self._idf = idf
+        self._vectors = vectors
+        self.build_ms = (time.perf_counter() - start) * 1000
+
+    def _bm25(self, query_terms: list[str]) -> list[float]:
+        scores = [0.0] * len(self._tools)
+        terms = [term for term in dict.fromkeys(query_terms) if term in self._idf]
+        if not terms:
+            return scores
+        avg_length = self._avg_length or 1.0
+        for position, counts in enumerate(self._term_freqs):
+            norm = _K1 * (1 - _B + _B * self._doc_lengths[position] / avg_length)
+            score = 0.0
+            for term in terms:
+                freq = counts.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (_K1 + 1) / (freq + norm)
+            scores[position] = score
+        return scores
+
+    def _similarities(self, query: str) -> Optional[list[float]]:
+        if self._vectors is None or self._embeddings is None:
+            return None
+        import numpy as np
+
+        try:
+            vector = np.asarray(self._embeddings.embed(query), dtype=np.float32)
+        except Exception as exc:
+            logger.warning("Query embedding failed, using lexical retrieval: %s", exc)
+            return None
+        norm = float(np.linalg.norm(vector)) or 1.0
+        return (self._vectors @ (vector / norm)).tolist()
+
+    def search(self, query: str, k: int) -> list[tuple[Tool, float]]:
+        """Return up to k (tool, score) pairs with a positive score, best first."""
+        start = time.perf_counter()
+        scores = self._bm25(tokenize(query))
+        similarities = self._similarities(query)
+        if similarities is not None:
+            best = max(scores, default=0.0) or 1.0
+            weight = self.embedding_weight
+            scores = [
+                weight * max(similarity, 0.0) + (1 - weight) * score / best
+                for score, similarity in zip(scores, similarities)
+            ]
+
+        ranked = sorted(
+            (position for position, score in enumerate(scores) if score > 0),
+            key=lambda position: scores[position],
+            reverse=True,
+        )[:k]
+        self.last_query_ms = (time.perf_counter() - start) * 1000
+        return [(self._tools[position], scores[position]) for position in ranked]
+
+    def select(self, query: str, max_tools: int) -> list[Tool]:
+        """Top tools for a query, padded with core skill tools when too few match."""
+        selected = [tool for tool, _ in self.search(query, max_tools)]
+        if len(selected) < MIN_RELEVANT_TOOLS:
+            chosen = {tool.name for tool in selected}
+            for tool, skill in zip(self._tools, self._skills):
+                if len(selected) >= max_tools:
+                    break
+                if skill in CORE_SKILLS and tool.name not in chosen:
+                    selected.append(tool)
+                    chosen.add(tool.name)
+        return selected[:max_tools]
+
+    def stats(self) -> dict[str, Any]:
+        """Index size, backend and timings."""
+        return {
+            "tools": len(self._tools),
+            "backend": self.backend,
+            "build_ms": round(self.build_ms, 3),
+            "last_query_ms": round(self.last_query_ms, 3),
+        }
@@ -0,0 +1,372 @@
+"""
+Binary vector store for R CLI semantic search.
+
+Vectors live in a flat float32 (or float16) segment file that is memory-mapped
+for search and only ever appended to; document text and metadata live in
+SQLite next to it. Deletes are tombstones and the segment is rewritten by
+compaction once enough rows are dead.
+
+Layout of a store directory:
+- documents.sqlite3: documents table (row -> id, content, metadata) and meta
+- vectors.<generation>.bin: raw row-major vectors, one row per document row
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_DTYPES = ("float32", "float16")
+DEFAULT_COMPACT_RATIO = 0.25
+_COMPACT_CHUNK_ROWS = 65536
+
+
+class VectorStore:
+    """Append-only, memory-mapped vector segment with a SQLite document table."""
+
+    def __init__(
+        self,
+        directory: Path,
+        dtype: str = "float32",
+        compact_ratio: float = DEFAULT_COMPACT_RATIO,
+    ):
+        """
+        Open (or create) a store.
+
+        Args:
+            directory: Directory holding the SQLite file and vector segments
+            dtype: Storage precision for new stores ("float32" or "float16")
+            compact_ratio: Fraction of tombstoned rows that triggers compaction
+        """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype '{dtype}'. Use: {', '.join(SUPPORTED_DTYPES)}")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.directory / "documents.sqlite3"
+        self.compact_ratio = compact_ratio
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._init_db()
+
+        meta = self._read_meta()
+        self.dtype = np.dtype(meta.get("dtype", dtype))
+        self.dimension: Optional[int] = int(meta["dimension"]) if "dimension" in meta else None
+        self._generation = int(meta.get("generation", 0))
+        self._count = int(meta.get("count", 0))
+        self._mmap: Optional[np.memmap] = None
+
+        self._recover()
+        self._alive = np.ones(max(self._count, 16), dtype=bool)
+        for (row,) in self._conn.execute("SELECT row FROM documents WHERE deleted = 1"):
+            self._alive[row] = False
+        self._deleted = int(self._count - self._alive[: self._count].sum())
+
+    # ==================== SETUP ====================
+
+    def _init_db(self) -> None:
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    row INTEGER NOT NULL,
+                    id TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    metadata TEXT NOT NULL DEFAULT '{}',
+                    created_at TEXT NOT NULL,
+                    deleted INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_row ON documents(row)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_id ON documents(id)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+    def _read_meta(self) -> dict[str, str]:
+        return dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+
+    def _write_meta(self, **values: Any) -> None:
+        self._conn.executemany(
+            "INSERT INTO meta(key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            [(key, str(value)) for key, value in values.items()],
+        )
+
+    @property
+    def generation(self) -> int:
+        """Segment generation; bumped by compaction, which renumbers rows."""
+        return self._generation
+
+    @property
+    def segment_path(self) -> Path:
+        return self.directory / f"vectors.{self._generation}.bin"
+
+    @property
+    def _row_bytes(self) -> int:
+        return (self.dimension or 0) * self.dtype.itemsize
+
+    def _recover(self) -> None:
+        """Drop vectors appended after the last committed transaction and stale segments."""
+        for stale in self.directory.glob("vectors.*.bin"):
+            if stale != self.segment_path:
+                stale.unlink(missing_ok=True)
+
+        if self.dimension is None:
+            return
+        expected = self._count * self._row_bytes
+        actual = self.segment_path.stat().st_size if self.segment_path.exists() else 0
+        if actual > expected:
+            with open(self.segment_path, "r+b") as handle:
+                handle.truncate(expected)
+        elif actual < expected:
+            # Segment lost rows (e.g. disk full): keep only what is readable
+            usable = actual // self._row_bytes
+            logger.warning(
+                f"Vector segment {self.segment_path} is short: {usable}/{self._count} rows"
+            )
+            with self._conn:
+                self._conn.execute("DELETE FROM documents WHERE row >= ?", (usable,))
+                self._write_meta(count=usable)
+            self._count = usable
+
+    # ==================== READ ====================
+
+    def __len__(self) -> int:
+        """Number of live (non-tombstoned) documents."""
+        return self._count - self._deleted
+
+    @property
+    def rows(self) -> int:
+        """Number of rows in the segment, tombstones included."""
+        return self._count
+
+    @property
+    def alive(self) -> np.ndarray:
+        """Boolean mask over segment rows; False marks tombstones."""
+        return self._alive[: self._count]
+
+    def matrix(self) -> np.ndarray:
+        """Memory-mapped (rows, dimension) view of every stored vector."""
+        with self._lock:
+            if self._count == 0 or self.dimension is None:
+                return np.empty((0, self.dimension or 0), dtype=self.dtype)
+            if self._mmap is None or self._mmap.shape[0] != self._count:
+                self._mmap = np.memmap(
+                    self.segment_path,
+                    dtype=self.dtype,
+                    mode="r",
+                    shape=(self._count, self.dimension),
+                )
+            return self._mmap
+
+    def get(self, rows: list[int]) -> list[dict[str, Any]]:
+        """Return documents for segment rows, in the given order."""
+        if not rows:
+            return []
+        placeholders = ",".join("?" * len(rows))
+        with self._lock:
+            found = {
+                row: {
+                    "id": doc_id,
+                    "content": content,
+                    "metadata": json.loads(metadata),
+                    "created_at": created_at,
+                }
+                for row, doc_id, content, metadata, created_at in self._conn.execute(
+                    "SELECT row, id, content, metadata, created_at FROM documents "
+                    f"WHERE row IN ({placeholders})",
+                    [int(row) for row in rows],
+                )
+            }
+        return [found[int(row)] for row in rows if int(row) in found]
+
+    def metadata_mask(self, where: dict[str, Any]) -> np.ndarray:
+        """
+        Boolean row mask of live documents whose metadata matches every filter.
+
+        Args:
+            where: {key: value} for equality or {key: [values]} for membership
+        """
+        clauses = ["deleted = 0"]
+        params: list[Any] = []
+        for key, value in where.items():
+            if '"' in key:
+                raise ValueError(f"Invalid metadata key: {key!r}")
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            if not values:
+                return np.zeros(self._count, dtype=bool)
+            placeholders = ",".join("?" * len(values))
+            clauses.append(f"json_extract(metadata, ?) IN ({placeholders})")
+            params.append(f'$."{key}"')
+            params.extend(values)
+
+        with self._lock:
+            mask = np.zeros(self._count, dtype=bool)
+            rows = self._conn.execute(
+                f"SELECT row FROM documents WHERE {' AND '.join(clauses)}", params
+            ).fetchall()
+        if rows:
+            mask[np.fromiter((row for (row,) in rows), dtype=np.int64, count=len(rows))] = True
+        return mask
+
+    def size_bytes(self) -> int:
+        """Bytes used on disk by the segment and the SQLite database."""
+        paths = [self.segment_path, self.db_path, self.db_path.with_name("documents.sqlite3-wal")]
+        return sum(path.stat().st_size for path in paths if path.exists())
+
+    # ==================== WRITE ====================
+
+    def append(self, records: list[dict[str, Any]], vectors: Any) -> list[int]:
+        """
+        Append documents and their vectors.
+
+        Args:
+            records: Dicts with id, content, metadata and created_at
+            vectors: Array-like of shape (len(records), dimension)
+
+        Returns:
+            Segment rows assigned to the new documents
+        """
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if len(records) != matrix.shape[0]:
+            raise ValueError("records and vectors must have the same length")
+        if not records:
+            return []
+
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = int(matrix.shape[1])
+                with self._conn:
+                    self._write_meta(dimension=self.dimension, dtype=self.dtype.name)
+            elif matrix.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Vector dimension {matrix.shape[1]} does not match index dimension "
+                    f"{self.dimension}; clear the index before switching models"
+                )
+
+            start = self._count
+            rows = list(range(start, start + len(records)))
+
+            # Vectors first: rows past the committed count are discarded on recovery
+            with open(self.segment_path, "ab") as handle:
+                handle.write(matrix.astype(self.dtype, copy=False).tobytes())
+
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO documents(row, id, content, metadata, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            row,
+                            record["id"],
+                            record["content"],
+                            json.dumps(record.get("metadata") or {}),
+                            record["created_at"],
+                        )
+                        for row, record in zip(rows, records)
+                    ],
+                )
+                self._write_meta(count=start + len(records))
+
+            self._count += len(records)
+            if self._count > len(self._alive):
+                grown = np.ones(max(self._count, len(self._alive) * 2), dtype=bool)
+                grown[:start] = self._alive[:start]
+                self._alive = grown
+            self._alive[start : self._count] = True
+            return rows
+
+    def delete(self, doc_id: str) -> bool:
+        """Tombstone the oldest live document with this id."""
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT row FROM documents WHERE id = ? AND deleted = 0 ORDER BY row LIMIT 1",
+                (doc_id,),
+            ).fetchone()
+            if found is None:
+                return False
+            with self._conn:
+                self._conn.execute("UPDATE documents SET deleted = 1 WHERE row = ?", found)
+            self._alive[found[0]] = False
+            self._deleted += 1
+
+            if self._count and self._deleted / self._count >= self.compact_ratio:
+                self.compact()
+            return True
+
+    def compact(self) -> int:
+        """
+        Rewrite the segment without tombstoned rows.
+
+        The new segment is written under the next generation and switched to in
+        the same transaction that renumbers the documents, so a crash leaves
+        either the old or the new layout intact.
+
+        Returns:
+            Number of rows removed
+        """
+        with self._lock:
+            if self._deleted == 0:
+                return 0
+
+            keep = np.flatnonzero(self.alive)
+            old_segment = self.segment_path
+            new_generation = self._generation + 1
+            new_segment = self.directory / f"vectors.{new_generation}.bin"
+
+            source = self.matrix()
+            with open(new_segment, "wb") as handle:
+                for offset in range(0, len(keep), _COMPACT_CHUNK_ROWS):
+                    chunk = keep[offset : offset + _COMPACT_CHUNK_ROWS]
+                    handle.write(np.ascontiguousarray(source[chunk]).tobytes())
+            del source
+            self._mmap = None
+
+            with self._conn:
+                self._conn.execute("DELETE FROM documents WHERE deleted = 1")
+                self._conn.executemany(
+                    "UPDATE documents SET row = ? WHERE row = ?",
+                    [(new, int(old)) for new, old in enumerate(keep) if new != old],
+                )
+                self._write_meta(count=len(keep), generation=new_generation)
+
+            removed = self._count - len(keep)
+            self._generation = new_generation
+            self._count = len(keep)
+            self._deleted = 0
+            self._alive = np.ones(max(self._count, 16), dtype=bool)
+            old_segment.unlink(missing_ok=True)
+            return removed
+
+    def clear(self) -> None:
+        """Remove every document and vector (the dimension is forgotten too)."""
+        with self._lock:
+            self._mmap = None
+            with self._conn:
+                self._conn.execute("DELETE FROM documents")
+                self._conn.execute("DELETE FROM meta")
+            self.segment_path.unlink(missing_ok=True)
+            self._generation = 0
+            self._count = 0
+            self._deleted = 0
+            self.dimension = None
+            self._alive = np.ones(16, dtype=bool)
+
+    def close(self) -> None:
+        with self._lock:
+            self._mmap = None
+            self._conn.close()
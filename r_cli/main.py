@@ -12,7 +12,6 @@ import contextlib
 import io
 import json
 import sys
-import time
 from pathlib import Path
 from typing import Optional
 
@@ -63,9 +62,9 @@ SKILL_CATEGORIES = {
 
 def get_all_skill_names() -> list[str]:
     """Get all available skill names."""
-    from r_cli.skills import get_all_skills
+    from r_cli.skills.registry import get_skill_specs
 
-    return [skill_class.name for skill_class in get_all_skills() if hasattr(skill_class, "name")]
+    return [spec.name for spec in get_skill_specs() if not spec.missing_requirements()]
 
 
 def get_config_path() -> str:
@@ -511,18 +510,9 @@ def permissions_explain(skill_name: str, tool_name: str, as_json: bool):
 @click.option("--json", "as_json", is_flag=True, help="Output machine-readable JSON")
 def permissions_audit(limit: int, as_json: bool):
     """Show recent local tool authorization decisions."""
-    config = Config.load()
-    audit_path = Path(config.security.audit_path).expanduser()
-    if not audit_path.is_absolute():
-        audit_path = Path(config.home_dir).expanduser() / audit_path
-
-    records = []
-    if audit_path.exists():
-        for line in audit_path.read_text(encoding="utf-8").splitlines()[-limit:]:
-            try:
-                records.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
+    from r_cli.observability import TraceStore
+
+    records = TraceStore(Config.load()).read(limit=limit)
 
     if as_json:
         click.echo(json.dumps(records, indent=2))
@@ -554,6 +544,8 @@ def traces():
 @click.option("--risk", type=click.Choice(["low", "medium", "high", "critical"]))
 @click.option("--skill")
 @click.option("--source")
+@click.option("--trace-id", help="Only records of one tool call")
+@click.option("--since", help="Only records at or after an ISO 8601 UTC timestamp")
 @click.option("--json", "as_json", is_flag=True, help="Output machine-readable JSON")
 def traces_list(
     limit: int,
@@ -561,6 +553,8 @@ def traces_list(
     risk: str | None,
     skill: str | None,
     source: str | None,
+    trace_id: str | None,
+    since: str | None,
     as_json: bool,
 ):
     """List recent completed, denied, or failed executions."""
@@ -573,6 +567,8 @@ def traces_list(
         skill=skill,
         source=source,
         terminal_only=True,
+        trace_id=trace_id,
+        since=since,
     )
     if as_json:
         click.echo(json.dumps(records, indent=2))
@@ -673,6 +669,18 @@ def workflow_validate(path: Path, as_json: bool):
 @click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
 @click.option("--var", "values", multiple=True, metavar="KEY=VALUE", help="Workflow variable")
 @click.option("--dry-run", is_flag=True, help="Render and plan without executing tools")
+@click.option(
+    "--max-parallel",
+    type=click.IntRange(1, 32),
+    default=None,
+    help="Steps to run at once (overrides the workflow's max_parallel)",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Result cache for steps with cache: enabled (default: ~/.r-cli/workflow-cache)",
+)
 @click.option("--yes", is_flag=True, help="Approve risky actions without prompting")
 @click.option("--json", "as_json", is_flag=True, help="Output machine-readable JSON")
 @click.pass_context
@@ -681,6 +689,8 @@ def workflow_run(
     path: Path,
     values: tuple[str, ...],
     dry_run: bool,
+    max_parallel: int | None,
+    cache_dir: Path | None,
     yes: bool,
     as_json: bool,
 ):
@@ -699,6 +709,8 @@ def workflow_run(
             approval_callback=callback,
             auto_approve=auto_approve,
             dry_run=dry_run,
+            max_parallel=max_parallel,
+            cache_dir=cache_dir,
         )
     except (WorkflowError, ToolRunnerError) as exc:
         raise click.ClickException(str(exc)) from exc
@@ -717,7 +729,7 @@ def workflow_run(
             table.add_row(
                 step.id,
                 step.target,
-                step.status,
+                f"{step.status} (cached)" if step.cached else step.status,
                 str(step.attempts or "-"),
                 f"{step.duration_ms:.1f} ms",
             )
@@ -1085,12 +1097,20 @@ def agent_os_reprioritize(task_id: str, priority: str, as_json: bool):
 
 @agent_os_command.command("worker")
 @click.option("--agent", "agent_name", help="Only process tasks for one installed agent")
+@click.option(
+    "--concurrency",
+    "-c",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1, max=64),
+    help="Tasks run at once (agents may cap themselves with max_concurrency)",
+)
 @click.option(
     "--poll-interval",
     default=2.0,
     show_default=True,
     type=click.FloatRange(min=0.1),
-    help="Seconds to wait when the queue is empty",
+    help="Longest wait between queue checks; submissions wake the worker immediately",
 )
 @click.option("--max-tasks", type=click.IntRange(min=1), help="Exit after processing N tasks")
 @click.option("--once", is_flag=True, help="Process at most one queued task and exit")
@@ -1100,6 +1120,7 @@ def agent_os_reprioritize(task_id: str, priority: str, as_json: bool):
 def agent_os_worker(
     ctx,
     agent_name: str | None,
+    concurrency: int,
     poll_interval: float,
     max_tasks: int | None,
     once: bool,
@@ -1108,6 +1129,7 @@ def agent_os_worker(
 ):
     """Run queued Agent OS tasks in scheduler order."""
     from r_cli.agent_os import AgentOS
+    from r_cli.agent_os_worker import AgentOSWorkerPool
 
     if as_json and not once and max_tasks is None:
         raise click.ClickException("--json requires --once or --max-tasks")
@@ -1115,45 +1137,38 @@ def agent_os_worker(
     runtime = AgentOS(Config.load())
     auto_approve = yes or ctx.obj.get("yes", False)
     callback = approval_prompt if sys.stdin.isatty() and not auto_approve else None
-    processed: list[dict[str, object]] = []
-    waiting_announced = False
 
-    try:
-        while True:
-            task = runtime.run_next_task(
-                agent_name=agent_name,
-                approval_callback=callback,
-                auto_approve=auto_approve,
+    def report(task: dict[str, object]) -> None:
+        if as_json:
+            return
+        if task["status"] == "completed":
+            console.print(
+                f"[green]Completed {task['id']}[/green] ({task['priority']}, {task['agent_name']})"
+            )
+        else:
+            console.print(
+                f"[red]Task {task['id']} ended as {task['status']}:[/red] {task['error']}"
             )
-            if task is None:
-                if once or max_tasks is not None:
-                    break
-                if not waiting_announced:
-                    scope = f" for agent {agent_name}" if agent_name else ""
-                    console.print(
-                        f"[dim]Worker idle{scope}; polling every {poll_interval:.1f}s[/dim]"
-                    )
-                    waiting_announced = True
-                time.sleep(poll_interval)
-                continue
 
-            waiting_announced = False
-            processed.append(task)
-            if not as_json:
-                if task["status"] == "completed":
-                    console.print(
-                        f"[green]Completed {task['id']}[/green] "
-                        f"({task['priority']}, {task['agent_name']})"
-                    )
-                else:
-                    console.print(
-                        f"[red]Task {task['id']} ended as {task['status']}:[/red] {task['error']}"
-                    )
-            if once or (max_tasks is not None and len(processed) >= max_tasks):
-                break
-    except KeyboardInterrupt:
-        if not as_json:
-            console.print("[yellow]Worker interrupted[/yellow]")
+    def announce_idle() -> None:
+        scope = f" for agent {agent_name}" if agent_name else ""
+        console.print(f"[dim]Worker idle{scope}; waiting for new tasks[/dim]")
+
+    pool = AgentOSWorkerPool(
+        runtime,
+        concurrency=concurrency,
+        agent_name=agent_name,
+        approval_callback=callback,
+        auto_approve=auto_approve,
+        poll_interval=poll_interval,
+        max_tasks=1 if once else max_tasks,
+        stop_when_idle=once or max_tasks is not None,
+        on_task=report,
+        on_idle=None if as_json else announce_idle,
+    )
+    processed = pool.run()
+    if pool.interrupted and not as_json:
+        console.print("[yellow]Worker interrupted[/yellow]")
 
     summary = {
         "agent_name": agent_name,
@@ -1722,6 +1737,71 @@ def doctor(as_json: bool):
 cli.add_command(doctor, "status")
 
 
+@cli.group()
+def diagnostics():
+    """Measure and troubleshoot the CLI itself."""
+
+
+@diagnostics.command("startup")
+@click.option("--runs", default=3, type=click.IntRange(min=1, max=20), help="Cold runs per probe")
+@click.option("--top", default=15, type=click.IntRange(min=0, max=200), help="Slowest imports")
+@click.option("--check", is_flag=True, help="Exit with an error when a budget is exceeded")
+@click.option("--json", "as_json", is_flag=True, help="Output machine-readable JSON")
+@click.pass_context
+def diagnostics_startup(ctx, runs: int, top: int, check: bool, as_json: bool):
+    """Profile CLI startup: imports, startup phases, and common commands."""
+    from r_cli.startup import STARTUP_BUDGET_MS, check_budget, profile_startup
+
+    try:
+        report = profile_startup(get_config_path(), runs=runs)
+    except (RuntimeError, OSError) as exc:
+        console.print(f"[red]Error: {exc}[/red]")
+        ctx.exit(1)
+    violations = check_budget(report)
+
+    if as_json:
+        payload = report.to_dict(limit=top)
+        payload["budget_ms"] = STARTUP_BUDGET_MS
+        payload["violations"] = violations
+        click.echo(json.dumps(payload, indent=2))
+    else:
+        table = Table(show_header=True, header_style="bold")
+        table.add_column("Measurement")
+        table.add_column("Time", justify="right")
+        table.add_column("Budget", justify="right")
+        for name, value in report.timings().items():
+            limit = STARTUP_BUDGET_MS.get(name)
+            over = limit is not None and value > limit
+            table.add_row(
+                name,
+                f"[red]{value:.1f} ms[/red]" if over else f"{value:.1f} ms",
+                f"{limit:.0f} ms" if limit is not None else "-",
+            )
+        console.print(Panel(table, title="R CLI startup"))
+
+        for name, error in report.phase_errors.items():
+            console.print(f"[yellow]{name}: {error}[/yellow]")
+
+        if top:
+            imports = Table(show_header=True, header_style="bold")
+            imports.add_column("Module")
+            imports.add_column("Self", justify="right")
+            imports.add_column("Cumulative", justify="right")
+            for timing in report.slowest_imports(top):
+                imports.add_row(
+                    timing.module,
+                    f"{timing.self_ms:.1f} ms",
+                    f"{timing.cumulative_ms:.1f} ms",
+                )
+            console.print(Panel(imports, title=f"Slowest {top} imports (self time)"))
+
+        for violation in violations:
+            console.print(f"[red]Over budget: {violation}[/red]")
+
+    if check and violations:
+        ctx.exit(1)
+
+
 @cli.command()
 @click.argument("shell", type=click.Choice(["bash", "zsh", "fish"]))
 def completion(shell: str):
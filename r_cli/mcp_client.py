@@ -1,18 +1,39 @@
-"""Optional Model Context Protocol client integration."""
+"""Optional Model Context Protocol client integration.
+
+MCP servers are started once and kept running. A process-wide session
+manager owns a background event loop holding up to ``max_sessions``
+initialized sessions per configured server. Requests from any thread or
+event loop are multiplexed over those sessions. A server that exits is
+restarted on the next request, with exponential backoff while it keeps
+failing. Tool lists are cached until the server sends
+``notifications/tools/list_changed`` or restarts.
+"""
 
 from __future__ import annotations
 
 import asyncio
+import atexit
+import hashlib
+import json
+import logging
 import os
 import re
+import threading
 from dataclasses import dataclass
 from datetime import timedelta
-from typing import Any
+from typing import Any, Awaitable, Callable, Optional
 
 from r_cli.core.config import Config, MCPServerConfig
 from r_cli.core.llm import Tool
 from r_cli.core.permissions import ApprovalCallback, PermissionManager
 
+logger = logging.getLogger(__name__)
+
+RESTART_BACKOFF_SECONDS = 0.5
+MAX_RESTART_BACKOFF_SECONDS = 30.0
+_IDLE_CHECK_SECONDS = 30.0
+_CLOSE_TIMEOUT_SECONDS = 10.0
+
 
 class MCPError(RuntimeError):
     """Raised when an MCP server cannot be used."""
@@ -36,11 +57,366 @@ def _sdk():
     return ClientSession, StdioServerParameters, stdio_client
 
 
+class _Session:
+    """One server process and its initialized ClientSession."""
+
+    def __init__(self, pool: _ServerPool):
+        self.pool = pool
+        self.session: Any = None
+        self.error: Optional[BaseException] = None
+        self.in_flight = 0
+        self.last_used = asyncio.get_running_loop().time()
+        self.stopping = False
+        self.started = asyncio.Event()
+        self.closed = asyncio.Event()
+        self._done = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name=f"r-mcp:{pool.name}")
+
+    @property
+    def ready(self) -> bool:
+        return self.session is not None and not self.closed.is_set()
+
+    def stop(self) -> None:
+        self.stopping = True
+        self._done.set()
+
+    async def request(self, send: Callable[[Any], Awaitable[Any]]) -> Any:
+        """Run one request, failing as soon as the server exits instead of timing out."""
+        self.in_flight += 1
+        response = asyncio.ensure_future(send(self.session))
+        closed = asyncio.ensure_future(self.closed.wait())
+        try:
+            await asyncio.wait({response, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if not response.done():
+                raise MCPError(f"MCP server '{self.pool.name}' exited while handling the request")
+            return response.result()
+        finally:
+            response.cancel()
+            closed.cancel()
+            self.in_flight -= 1
+            self.last_used = asyncio.get_running_loop().time()
+
+    async def _run(self) -> None:
+        import anyio
+
+        client_session_class, _, stdio_client = _sdk()
+        try:
+            async with stdio_client(self.pool.parameters) as (read, write):
+                # Relayed so a server exit is noticed at once: the SDK alone only
+                # fails requests that are already in flight when stdout closes
+                relay_send, relay_receive = anyio.create_memory_object_stream(0)
+                async with anyio.create_task_group() as group:
+                    group.start_soon(self._relay, read, relay_send)
+                    async with client_session_class(
+                        relay_receive, write, message_handler=self.pool.on_message
+                    ) as session:
+                        with anyio.fail_after(self.pool.server.timeout_seconds):
+                            await session.initialize()
+                        self.session = session
+                        self.started.set()
+                        await self._done.wait()
+                    group.cancel_scope.cancel()
+        except BaseException as exc:
+            self.error = exc
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+        finally:
+            self.closed.set()
+            self.started.set()
+            self.pool.on_closed(self)
+
+    async def _relay(self, source: Any, sink: Any) -> None:
+        async with sink:
+            async for message in source:
+                await sink.send(message)
+        self._done.set()
+
+
+class _ServerPool:
+    """Sessions, restart state, and cached tools for one configured server."""
+
+    def __init__(self, name: str, server: MCPServerConfig, parameters: Any):
+        self.name = name
+        self.server = server
+        self.parameters = parameters
+        self.sessions: list[_Session] = []
+        self.failures = 0
+        self.retry_at = 0.0
+        self.tools: Optional[list[MCPToolInfo]] = None
+        self.tools_version = 0
+
+    async def acquire(self) -> _Session:
+        """Return the least busy live session, starting or restarting one if needed."""
+        loop = asyncio.get_running_loop()
+        while True:
+            self.sessions = [session for session in self.sessions if not session.closed.is_set()]
+            ready = [session for session in self.sessions if session.ready]
+            if ready:
+                session = min(ready, key=lambda candidate: candidate.in_flight)
+                if (
+                    session.in_flight
+                    and len(self.sessions) < max(self.server.max_sessions, 1)
+                    and loop.time() >= self.retry_at
+                ):
+                    # Grow in the background; this request shares a busy session
+                    self.sessions.append(_Session(self))
+                return session
+
+            starting = next(iter(self.sessions), None)
+            if starting is None:
+                delay = self.retry_at - loop.time()
+                if delay > self.server.timeout_seconds:
+                    raise MCPError(
+                        f"MCP server '{self.name}' keeps failing; retrying in {delay:.0f}s"
+                    )
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                starting = _Session(self)
+                self.sessions.append(starting)
+
+            await starting.started.wait()
+            if starting.ready:
+                return starting
+            if starting.error is not None:
+                raise MCPError(
+                    f"MCP server '{self.name}' failed to start: {_describe(starting.error)}"
+                ) from starting.error
+
+    async def on_message(self, message: Any) -> None:
+        from mcp import types
+
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ToolListChangedNotification
+        ):
+            self.invalidate_tools()
+
+    def on_closed(self, session: _Session) -> None:
+        if session in self.sessions:
+            self.sessions.remove(session)
+        if session.stopping:
+            return
+        # Unexpected exit or failed start: back off before the next process
+        self.failures += 1
+        backoff = min(
+            RESTART_BACKOFF_SECONDS * 2 ** (self.failures - 1), MAX_RESTART_BACKOFF_SECONDS
+        )
+        self.retry_at = asyncio.get_running_loop().time() + backoff
+        self.invalidate_tools()
+        logger.warning(f"MCP server '{self.name}' exited; next start in {backoff:.1f}s")
+
+    def invalidate_tools(self) -> None:
+        self.tools = None
+        self.tools_version += 1
+
+    def reap_idle(self, now: float) -> None:
+        for session in self.sessions:
+            if (
+                session.ready
+                and not session.in_flight
+                and now - session.last_used >= self.server.idle_timeout_seconds
+            ):
+                session.stop()
+
+    async def close(self) -> None:
+        sessions = list(self.sessions)
+        for session in sessions:
+            session.stop()
+        for session in sessions:
+            await session.closed.wait()
+
+
+class MCPSessionManager:
+    """Process-wide owner of persistent MCP sessions and their event loop."""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._pools: dict[str, _ServerPool] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        self._closing: set[asyncio.Task] = set()
+
+    # ==================== ENTRY POINTS ====================
+
+    def run(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a coroutine on the session loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(factory(), self._ensure_loop()).result()
+
+    async def run_async(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await a coroutine on the session loop from any other event loop."""
+        loop = self._ensure_loop()
+        if asyncio.get_running_loop() is loop:
+            return await factory()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(factory(), loop))
+
+    async def list_tools(
+        self, name: str, server: MCPServerConfig, parameters: Any, refresh: bool = False
+    ) -> list[MCPToolInfo]:
+        pool = self._pool(name, server, parameters)
+        if pool.tools is not None and not refresh:
+            return pool.tools
+        version = pool.tools_version
+        result = await self._request(pool, lambda session: session.list_tools())
+        tools = [
+            MCPToolInfo(
+                name=tool.name,
+                description=tool.description or "",
+                input_schema=tool.inputSchema,
+            )
+            for tool in result.tools
+        ]
+        if pool.tools_version == version:
+            pool.tools = tools
+        return tools
+
+    async def call_tool(
+        self,
+        name: str,
+        server: MCPServerConfig,
+        parameters: Any,
+        tool_name: str,
+        arguments: dict[str, Any],
+    ) -> Any:
+        pool = self._pool(name, server, parameters)
+        return await self._request(
+            pool,
+            lambda session: session.call_tool(
+                tool_name,
+                arguments,
+                read_timeout_seconds=timedelta(seconds=server.timeout_seconds),
+            ),
+        )
+
+    def close(self) -> None:
+        """Stop every server process and the session loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+
+        async def shutdown() -> None:
+            if self._reaper is not None:
+                self._reaper.cancel()
+            pools = list(self._pools.values())
+            self._pools.clear()
+            await asyncio.gather(*(pool.close() for pool in pools), return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result(_CLOSE_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.debug(f"MCP sessions did not close cleanly: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(_CLOSE_TIMEOUT_SECONDS)
+
+    # ==================== SESSION LOOP ====================
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._serve, args=(loop,), name="r-mcp-sessions", daemon=True
+                )
+                self._loop = loop
+                self._thread.start()
+            return self._loop
+
+    @staticmethod
+    def _serve(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def _pool(self, name: str, server: MCPServerConfig, parameters: Any) -> _ServerPool:
+        # Keyed by launch settings too: editing a server's config starts a new process
+        key = f"{name}:{_fingerprint(parameters)}"
+        pool = self._pools.get(key)
+        if pool is None:
+            for stale_key in [k for k in self._pools if k.startswith(f"{name}:")]:
+                task = asyncio.create_task(self._pools.pop(stale_key).close())
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+            pool = _ServerPool(name, server, parameters)
+            self._pools[key] = pool
+            if self._reaper is None or self._reaper.done():
+                self._reaper = asyncio.create_task(self._reap_idle())
+        pool.server = server
+        return pool
+
+    async def _request(self, pool: _ServerPool, send: Callable[[Any], Awaitable[Any]]) -> Any:
+        import anyio
+
+        async with asyncio.timeout(pool.server.timeout_seconds):
+            for attempt in range(2):
+                session = await pool.acquire()
+                try:
+                    result = await session.request(send)
+                except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+                    # The request never reached the server, so resending it is safe
+                    session.stop()
+                    if attempt:
+                        raise
+                    continue
+                pool.failures = 0
+                return result
+        raise AssertionError("unreachable")
+
+    async def _reap_idle(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pools:
+            await asyncio.sleep(_IDLE_CHECK_SECONDS)
+            for pool in list(self._pools.values()):
+                pool.reap_idle(loop.time())
+
+
+def _fingerprint(parameters: Any) -> str:
+    payload = json.dumps(
+        [parameters.command, parameters.args, parameters.env, str(parameters.cwd)],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _describe(error: BaseException) -> str:
+    # anyio task groups wrap failures in exception groups
+    while len(getattr(error, "exceptions", ())) == 1:
+        error = error.exceptions[0]
+    return str(error) or type(error).__name__
+
+
+_manager: Optional[MCPSessionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_session_manager() -> MCPSessionManager:
+    """Return the process-wide MCP session manager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = MCPSessionManager()
+        return _manager
+
+
+@atexit.register
+def close_mcp_sessions() -> None:
+    """Stop all persistent MCP server processes."""
+    with _manager_lock:
+        manager = _manager
+    if manager is not None:
+        manager.close()
+
+
 class MCPClient:
     """Connect to configured MCP servers over stdio."""
 
     def __init__(self, config: Config | None = None):
         self.config = config or Config.load()
+        self.sessions = get_session_manager()
 
     def get_server(self, server_name: str) -> MCPServerConfig:
         server = self.config.mcp.servers.get(server_name)
@@ -67,35 +443,28 @@ class MCPClient:
                 resolved[key] = value
         return resolved
 
-    async def list_tools_async(self, server_name: str) -> list[MCPToolInfo]:
-        client_session_class, server_parameters_class, stdio_client = _sdk()
-        server = self.get_server(server_name)
-        parameters = server_parameters_class(
+    def _parameters(self, server: MCPServerConfig) -> Any:
+        _, server_parameters_class, _ = _sdk()
+        return server_parameters_class(
             command=server.command,
             args=server.args,
             env=self.resolve_environment(server.env) or None,
             cwd=server.cwd,
         )
 
+    async def list_tools_async(self, server_name: str, refresh: bool = False) -> list[MCPToolInfo]:
+        server = self.get_server(server_name)
+        parameters = self._parameters(server)
         try:
-            async with asyncio.timeout(server.timeout_seconds):
-                async with stdio_client(parameters) as (read, write):
-                    async with client_session_class(read, write) as session:
-                        await session.initialize()
-                        result = await session.list_tools()
+            return await self.sessions.run_async(
+                lambda: self.sessions.list_tools(server_name, server, parameters, refresh)
+            )
+        except MCPError:
+            raise
         except TimeoutError as exc:
             raise MCPError(f"MCP server '{server_name}' timed out") from exc
         except Exception as exc:
-            raise MCPError(f"MCP server '{server_name}' failed: {exc}") from exc
-
-        return [
-            MCPToolInfo(
-                name=tool.name,
-                description=tool.description or "",
-                input_schema=tool.inputSchema,
-            )
-            for tool in result.tools
-        ]
+            raise MCPError(f"MCP server '{server_name}' failed: {_describe(exc)}") from exc
 
     async def call_tool_async(
         self,
@@ -103,30 +472,26 @@ class MCPClient:
         tool_name: str,
         arguments: dict[str, Any],
     ) -> Any:
-        client_session_class, server_parameters_class, stdio_client = _sdk()
         server = self.get_server(server_name)
-        parameters = server_parameters_class(
-            command=server.command,
-            args=server.args,
-            env=self.resolve_environment(server.env) or None,
-            cwd=server.cwd,
-        )
-
+        parameters = self._parameters(server)
         try:
-            async with asyncio.timeout(server.timeout_seconds):
-                async with stdio_client(parameters) as (read, write):
-                    async with client_session_class(read, write) as session:
-                        await session.initialize()
-                        result = await session.call_tool(
-                            tool_name,
-                            arguments,
-                            read_timeout_seconds=timedelta(seconds=server.timeout_seconds),
-                        )
+            result = await self.sessions.run_async(
+                lambda: self.sessions.call_tool(
+                    server_name, server, parameters, tool_name, arguments
+                )
+            )
+        except MCPError:
+            raise
         except TimeoutError as exc:
             raise MCPError(f"MCP tool '{server_name}.{tool_name}' timed out") from exc
         except Exception as exc:
-            raise MCPError(f"MCP tool '{server_name}.{tool_name}' failed: {exc}") from exc
+            raise MCPError(
+                f"MCP tool '{server_name}.{tool_name}' failed: {_describe(exc)}"
+            ) from exc
+        return self._tool_result(server_name, tool_name, result)
 
+    @staticmethod
+    def _tool_result(server_name: str, tool_name: str, result: Any) -> Any:
         if result.isError:
             raise MCPError(f"MCP tool '{server_name}.{tool_name}' returned an error")
         if result.structuredContent is not None:
@@ -142,8 +507,8 @@ class MCPClient:
                 content.append(str(item))
         return content[0] if len(content) == 1 else content
 
-    def list_tools(self, server_name: str) -> list[MCPToolInfo]:
-        return asyncio.run(self.list_tools_async(server_name))
+    def list_tools(self, server_name: str, refresh: bool = False) -> list[MCPToolInfo]:
+        return self.sessions.run(lambda: self.list_tools_async(server_name, refresh))
 
     def call_tool(
         self,
@@ -162,7 +527,9 @@ class MCPClient:
         return permissions.execute(
             f"mcp:{server_name}",
             tool_name,
-            lambda **kwargs: asyncio.run(self.call_tool_async(server_name, tool_name, kwargs)),
+            lambda **kwargs: self.sessions.run(
+                lambda: self.call_tool_async(server_name, tool_name, kwargs)
+            ),
             arguments,
         )
 
@@ -175,6 +542,13 @@ class MCPClient:
         """Expose one MCP server's tools through R's native Tool model."""
         tools = []
         safe_server_name = re.sub(r"[^a-zA-Z0-9_-]", "_", server_name)
+        server = self.get_server(server_name)
+        permissions = PermissionManager(
+            self.config,
+            approval_callback=approval_callback,
+            auto_approve=auto_approve,
+            source=f"mcp:{server_name}",
+        )
         for info in self.list_tools(server_name):
             original_name = info.name
 
@@ -187,12 +561,22 @@ class MCPClient:
                     auto_approve=auto_approve,
                 )
 
+            async def async_handler(_tool_name=original_name, **kwargs):
+                return await permissions.execute_async(
+                    f"mcp:{server_name}",
+                    _tool_name,
+                    lambda **arguments: self.call_tool_async(server_name, _tool_name, arguments),
+                    kwargs,
+                )
+
             tools.append(
                 Tool(
                     name=f"mcp_{safe_server_name}_{original_name}",
                     description=f"[MCP:{server_name}] {info.description}",
                     parameters=info.input_schema,
                     handler=handler,
+                    async_handler=async_handler,
+                    timeout=server.timeout_seconds,
                 )
             )
         return tools
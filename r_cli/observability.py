@@ -1,25 +1,121 @@
-"""Read and summarize local execution traces."""
+"""Read and summarize local execution traces.
+
+The JSONL audit trail stays the source of truth. TraceStore mirrors it into
+an indexed SQLite file next to it (``audit.traces.sqlite3`` for
+``audit.jsonl``). Each query first ingests only the bytes appended since
+the previous one. Rotation is followed through ``<name>.1``, and a file
+rewritten in place is re-indexed from scratch. Summary counters and a
+t-digest of durations are updated during ingest, so ``summary()`` costs
+O(new records) rather than O(history).
+"""
 
 from __future__ import annotations
 
 import csv
+import hashlib
 import json
-from collections import Counter
-from pathlib import Path
-from typing import TYPE_CHECKING, Any
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Any, Optional
+
+from r_cli.core.audit import flush_audit_log
+from r_cli.core.permissions import audit_log_path
 
 if TYPE_CHECKING:
+    import os
+    from pathlib import Path
+
     from r_cli.core.config import Config
 
 TERMINAL_DECISIONS = {"completed", "denied", "error"}
 
+INDEX_SCHEMA_VERSION = 1
+DIGEST_COMPRESSION = 100.0
+# Bytes at the start of the indexed file used to notice it was replaced
+_HEAD_BYTES = 256
+_READ_CHUNK_BYTES = 4 * 1024 * 1024
+_INSERT_BATCH = 5_000
+
+
+class QuantileDigest:
+    """Merging t-digest: bounded-size quantile sketch of a stream of values.
+
+    Centroids are small near both tails and large in the middle, so p50 and
+    p95 stay accurate with about ``compression`` centroids. While every
+    centroid holds one value, quantiles are exact nearest-rank values.
+    """
+
+    def __init__(
+        self,
+        compression: float = DIGEST_COMPRESSION,
+        centroids: Optional[list[list[float]]] = None,
+    ):
+        self.compression = compression
+        self._centroids: list[list[float]] = [list(centroid) for centroid in centroids or []]
+        self._buffer: list[float] = []
+
+    @property
+    def count(self) -> int:
+        return int(sum(weight for _, weight in self._centroids)) + len(self._buffer)
+
+    def add(self, value: float) -> None:
+        self._buffer.append(float(value))
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def quantile(self, q: float) -> float:
+        self._compress()
+        if not self._centroids:
+            return 0.0
+        total = sum(weight for _, weight in self._centroids)
+        rank = round((total - 1) * q)
+        seen = 0.0
+        for mean, weight in self._centroids:
+            seen += weight
+            if rank < seen:
+                return mean
+        return self._centroids[-1][0]
+
+    def to_json(self) -> str:
+        self._compress()
+        return json.dumps({"compression": self.compression, "centroids": self._centroids})
+
+    @classmethod
+    def from_json(cls, payload: Optional[str]) -> QuantileDigest:
+        if not payload:
+            return cls()
+        data = json.loads(payload)
+        return cls(data.get("compression", DIGEST_COMPRESSION), data.get("centroids"))
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        points = sorted(self._centroids + [[value, 1.0] for value in self._buffer])
+        self._buffer = []
+        total = sum(weight for _, weight in points)
+        merged = [list(points[0])]
+        cumulative = 0.0
+        for mean, weight in points[1:]:
+            last = merged[-1]
+            combined = last[1] + weight
+            q = (cumulative + combined / 2) / total
+            if combined <= 4 * total * q * (1 - q) / self.compression:
+                last[0] += (mean - last[0]) * weight / combined
+                last[1] = combined
+            else:
+                cumulative += last[1]
+                merged.append([mean, weight])
+        self._centroids = merged
+
 
 class TraceStore:
     """Query the JSONL audit trail as execution traces."""
 
     def __init__(self, config: Config):
-        path = Path(config.security.audit_path).expanduser()
-        self.path = path if path.is_absolute() else Path(config.home_dir).expanduser() / path
+        self.path = audit_log_path(config)
+        self.index_path = self.path.with_name(f"{self.path.stem}.traces.sqlite3")
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
 
     def read(
         self,
@@ -29,49 +125,73 @@ class TraceStore:
         skill: str | None = None,
         source: str | None = None,
         terminal_only: bool = False,
+        trace_id: str | None = None,
+        since: str | None = None,
     ) -> list[dict[str, Any]]:
-        records: list[dict[str, Any]] = []
-        if not self.path.exists():
-            return records
-
-        for line in self.path.read_text(encoding="utf-8").splitlines():
-            try:
-                record = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            if terminal_only and record.get("decision") not in TERMINAL_DECISIONS:
-                continue
-            if decision and record.get("decision") != decision:
-                continue
-            if risk and record.get("risk") != risk:
-                continue
-            if skill and record.get("skill") != skill:
-                continue
-            if source and record.get("source", "local") != source:
-                continue
-            records.append(record)
-        return records[-limit:] if limit else records
+        """Return matching records oldest first; with limit, only the newest ones."""
+        clauses: list[str] = []
+        params: list[Any] = []
+        if terminal_only:
+            clauses.append(f"decision IN ({', '.join('?' * len(TERMINAL_DECISIONS))})")
+            params.extend(sorted(TERMINAL_DECISIONS))
+        for column, value in (
+            ("decision", decision),
+            ("risk", risk),
+            ("skill", skill),
+            ("source", source),
+            ("trace_id", trace_id),
+        ):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            connection = self._refresh()
+            if limit:
+                # Walk the rowid index backwards and stop after `limit` matches
+                rows = connection.execute(
+                    f"SELECT record FROM traces {where} ORDER BY id DESC LIMIT ?",
+                    (*params, limit),
+                ).fetchall()
+                rows.reverse()
+            else:
+                rows = connection.execute(
+                    f"SELECT record FROM traces {where} ORDER BY id",
+                    params,
+                ).fetchall()
+        return [json.loads(row[0]) for row in rows]
 
     def summary(self) -> dict[str, Any]:
-        records = self.read(terminal_only=True)
-        durations = sorted(
-            float(record["duration_ms"]) for record in records if "duration_ms" in record
-        )
-        decisions = Counter(record.get("decision", "unknown") for record in records)
-        completed = decisions["completed"]
-        errors = decisions["error"]
+        with self._lock:
+            connection = self._refresh()
+            counters: dict[str, dict[str, int]] = {"decision": {}, "skill": {}, "source": {}}
+            for kind, key, count in connection.execute(
+                "SELECT kind, key, count FROM counters ORDER BY rowid"
+            ):
+                counters[kind][key] = count
+            duration_sum = float(self._meta(connection, "duration_sum") or 0)
+            digest = QuantileDigest.from_json(self._meta(connection, "durations"))
+
+        decisions = counters["decision"]
+        completed = decisions.get("completed", 0)
+        errors = decisions.get("error", 0)
         executed = completed + errors
+        durations = digest.count
         return {
-            "total": len(records),
+            "total": sum(decisions.values()),
             "completed": completed,
             "errors": errors,
-            "denied": decisions["denied"],
+            "denied": decisions.get("denied", 0),
             "success_rate": round(completed / executed * 100, 2) if executed else 0.0,
-            "average_duration_ms": round(sum(durations) / len(durations), 3) if durations else 0.0,
-            "p50_duration_ms": _percentile(durations, 0.50),
-            "p95_duration_ms": _percentile(durations, 0.95),
-            "by_skill": dict(Counter(record.get("skill", "unknown") for record in records)),
-            "by_source": dict(Counter(record.get("source", "local") for record in records)),
+            "average_duration_ms": round(duration_sum / durations, 3) if durations else 0.0,
+            "p50_duration_ms": round(digest.quantile(0.50), 3),
+            "p95_duration_ms": round(digest.quantile(0.95), 3),
+            "by_skill": counters["skill"],
+            "by_source": counters["source"],
         }
 
     def export(self, output: Path, file_format: str) -> int:
@@ -95,9 +215,243 @@ class TraceStore:
                     )
         return len(records)
 
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ==================== INDEX ====================
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.index_path), timeout=30, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        if connection.execute("PRAGMA user_version").fetchone()[0] != INDEX_SCHEMA_VERSION:
+            # The index is derived data: rebuild it rather than migrate it
+            connection.executescript(
+                f"""
+                DROP TABLE IF EXISTS traces;
+                DROP TABLE IF EXISTS counters;
+                DROP TABLE IF EXISTS meta;
+                CREATE TABLE traces (
+                    id INTEGER PRIMARY KEY,
+                    timestamp TEXT,
+                    decision TEXT,
+                    risk TEXT,
+                    skill TEXT,
+                    tool TEXT,
+                    source TEXT NOT NULL,
+                    trace_id TEXT,
+                    duration_ms REAL,
+                    record TEXT NOT NULL
+                );
+                CREATE INDEX idx_traces_timestamp ON traces(timestamp);
+                CREATE INDEX idx_traces_decision ON traces(decision);
+                CREATE INDEX idx_traces_skill ON traces(skill);
+                CREATE INDEX idx_traces_source ON traces(source);
+                CREATE INDEX idx_traces_trace_id ON traces(trace_id);
+                CREATE TABLE counters (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (kind, key)
+                );
+                CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+                PRAGMA user_version = {INDEX_SCHEMA_VERSION};
+                """
+            )
+        self._conn = connection
+        return connection
+
+    def _refresh(self) -> sqlite3.Connection:
+        """Bring the index up to date with the audit file (caller holds the lock)."""
+        # Records from this process may still be queued in the audit writer
+        flush_audit_log(self.path)
+        connection = self._connection()
+        # Serializes concurrent ingesters so no record is indexed twice
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._ingest(connection)
+        except BaseException:
+            connection.rollback()
+            raise
+        connection.commit()
+        return connection
+
+    def _ingest(self, connection: sqlite3.Connection) -> None:
+        raw_state = self._meta(connection, "position")
+        state = json.loads(raw_state) if raw_state else None
+        stat = _stat(self.path)
+
+        if state is not None and (stat is None or stat.st_ino != state["inode"]):
+            # Rotated: finish the tail of the file we were reading, then start over
+            rotated = self.path.with_name(f"{self.path.name}.1")
+            rotated_stat = _stat(rotated)
+            if (
+                rotated_stat is not None
+                and rotated_stat.st_ino == state["inode"]
+                and _same_head(rotated, state)
+            ):
+                self._ingest_file(connection, rotated, state["offset"])
+            state = None
+        elif state is not None and (
+            stat.st_size < state["offset"] or not _same_head(self.path, state)
+        ):
+            # Rewritten in place: what was indexed is no longer in the file
+            connection.execute("DELETE FROM traces")
+            connection.execute("DELETE FROM counters")
+            connection.execute("DELETE FROM meta")
+            state = None
+
+        if stat is None:
+            connection.execute("DELETE FROM meta WHERE key = 'position'")
+            return
+
+        offset = self._ingest_file(connection, self.path, state["offset"] if state else 0)
+        if state is None or state["head_length"] < _HEAD_BYTES:
+            head_length, head_digest = _head(self.path, min(offset, _HEAD_BYTES))
+        else:
+            head_length, head_digest = state["head_length"], state["head_digest"]
+        position = {
+            "inode": stat.st_ino,
+            "offset": offset,
+            "head_length": head_length,
+            "head_digest": head_digest,
+        }
+        self._set_meta(connection, "position", json.dumps(position))
+
+    def _ingest_file(self, connection: sqlite3.Connection, path: Path, offset: int) -> int:
+        """Index complete records after `offset`; returns the new offset."""
+        rows: list[tuple] = []
+        counters: dict[tuple[str, str], int] = {}
+        durations: list[float] = []
+        try:
+            with path.open("rb") as handle:
+                handle.seek(offset)
+                pending = b""
+                while chunk := handle.read(_READ_CHUNK_BYTES):
+                    data = pending + chunk
+                    end = data.rfind(b"\n") + 1
+                    pending = data[end:]
+                    for line in data[:end].splitlines():
+                        _parse_line(line, rows, counters, durations)
+                    offset += end
+                    if len(rows) >= _INSERT_BATCH:
+                        self._store(connection, rows, counters, durations)
+                        rows, counters, durations = [], {}, []
+                # A final line without a newline counts once it is complete JSON
+                if pending and _parse_line(pending, rows, counters, durations):
+                    offset += len(pending)
+        except OSError:
+            pass
+        self._store(connection, rows, counters, durations)
+        return offset
+
+    def _store(
+        self,
+        connection: sqlite3.Connection,
+        rows: list[tuple],
+        counters: dict[tuple[str, str], int],
+        durations: list[float],
+    ) -> None:
+        if rows:
+            connection.executemany(
+                """
+                INSERT INTO traces(
+                    timestamp, decision, risk, skill, tool, source, trace_id, duration_ms, record
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+        if counters:
+            connection.executemany(
+                """
+                INSERT INTO counters(kind, key, count) VALUES (?, ?, ?)
+                ON CONFLICT(kind, key) DO UPDATE SET count = count + excluded.count
+                """,
+                [(kind, key, count) for (kind, key), count in counters.items()],
+            )
+        if durations:
+            digest = QuantileDigest.from_json(self._meta(connection, "durations"))
+            for duration in durations:
+                digest.add(duration)
+            total = float(self._meta(connection, "duration_sum") or 0) + sum(durations)
+            self._set_meta(connection, "durations", digest.to_json())
+            self._set_meta(connection, "duration_sum", repr(total))
+
+    @staticmethod
+    def _meta(connection: sqlite3.Connection, key: str) -> Optional[str]:
+        row = connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _set_meta(connection: sqlite3.Connection, key: str, value: str) -> None:
+        connection.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+
+def _parse_line(
+    line: bytes,
+    rows: list[tuple],
+    counters: dict[tuple[str, str], int],
+    durations: list[float],
+) -> bool:
+    """Queue one JSONL record for insertion; returns False for unparseable lines."""
+    try:
+        text = line.decode("utf-8")
+        record = json.loads(text)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return False
+    if not isinstance(record, dict):
+        return False
+
+    source = str(record.get("source", "local"))
+    duration = record.get("duration_ms")
+    duration = float(duration) if isinstance(duration, (int, float)) else None
+    decision = record.get("decision")
+    rows.append(
+        (
+            record.get("timestamp"),
+            decision,
+            record.get("risk"),
+            record.get("skill"),
+            record.get("tool"),
+            source,
+            record.get("trace_id"),
+            duration,
+            text.strip(),
+        )
+    )
+    if decision in TERMINAL_DECISIONS:
+        for key in (
+            ("decision", decision),
+            ("skill", str(record.get("skill", "unknown"))),
+            ("source", source),
+        ):
+            counters[key] = counters.get(key, 0) + 1
+        if duration is not None:
+            durations.append(duration)
+    return True
+
+
+def _stat(path: Path) -> Optional[os.stat_result]:
+    try:
+        return path.stat()
+    except OSError:
+        return None
+
+
+def _head(path: Path, length: int) -> tuple[int, str]:
+    try:
+        with path.open("rb") as handle:
+            data = handle.read(length)
+    except OSError:
+        data = b""
+    return len(data), hashlib.sha256(data).hexdigest()
+
 
-def _percentile(values: list[float], percentile: float) -> float:
-    if not values:
-        return 0.0
-    index = min(round((len(values) - 1) * percentile), len(values) - 1)
-    return round(values[index], 3)
+def _same_head(path: Path, state: dict[str, Any]) -> bool:
+    return _head(path, state["head_length"]) == (state["head_length"], state["head_digest"])
@@ -11,6 +11,7 @@ Features:
 - Memory consolidation and decay
 """
 
+import importlib.util
 import json
 import os
 from datetime import datetime
@@ -32,12 +33,8 @@ try:
 except ImportError:
     HAS_PSYCOPG = False
 
-try:
-    from sentence_transformers import SentenceTransformer
-
-    HAS_EMBEDDINGS = True
-except ImportError:
-    HAS_EMBEDDINGS = False
+# The model itself is owned by the process-wide embedding service
+HAS_EMBEDDINGS = importlib.util.find_spec("sentence_transformers") is not None
 
 
 class MemoryType(str, Enum):
@@ -85,19 +82,20 @@ class AGIMemoryPGSkill(Skill):
 
     @property
     def embedder(self):
-        """Lazy load embedding model."""
+        """Shared all-MiniLM-L6-v2 embedding service (batched across callers)."""
         if self._embedder is None:
             if not HAS_EMBEDDINGS:
                 return None
-            self._embedder = SentenceTransformer("all-MiniLM-L6-v2")
+            from r_cli.core.embedding_service import get_embedding_service
+
+            self._embedder = get_embedding_service("mini")
         return self._embedder
 
     def get_embedding(self, text: str) -> list[float] | None:
         """Generate embedding for text."""
         if self.embedder is None:
             return None
-        embedding = self.embedder.encode(text)
-        return embedding.tolist()
+        return self.embedder.embed(text)
 
     def get_tools(self) -> list[Tool]:
         return [
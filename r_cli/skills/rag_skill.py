@@ -436,6 +436,14 @@ Text 2: {text2[:100]}{"..." if len(text2) > 100 else ""}"""
             if model_info:
                 result.append(f"  Device: {model_info.get('device', 'N/A')}")
                 result.append(f"  Embedding cache: {model_info.get('cache_size', 0)} entries")
+                service = model_info.get("service") or {}
+                if service.get("batches"):
+                    result.append(
+                        f"  Embedding service: {service['encoded']} texts in "
+                        f"{service['batches']} batches "
+                        f"({service['texts_per_second']:.0f} texts/s, "
+                        f"queue {service['queue_depth']}/{service['max_queue_depth']} max)"
+                    )
 
             return "\n".join(result)
 
@@ -0,0 +1,288 @@
+"""
+Manifest-driven skill registry.
+
+``skills_manifest.json`` records, for every class in ``_SKILL_REGISTRY``, the
+skill name, module, description, third-party modules imported at module
+level, and each tool's name, description, and JSON schema. The agent can
+advertise tools and ``r tool`` can resolve a skill from it without importing
+unrelated modules. A skill module is imported, and its class instantiated,
+only when one of its tools is first called.
+
+Regenerate the manifest after adding or changing a skill:
+
+    python -m r_cli.skills.registry
+"""
+
+from __future__ import annotations
+
+import ast
+import importlib.util
+import json
+import sys
+import threading
+from dataclasses import dataclass, field
+from importlib import import_module
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from r_cli.core.llm import Tool
+
+if TYPE_CHECKING:
+    from r_cli.core.agent import Skill
+    from r_cli.core.config import Config
+
+MANIFEST_VERSION = 1
+MANIFEST_PATH = Path(__file__).with_name("skills_manifest.json")
+
+_specs: Optional[list[SkillSpec]] = None
+_specs_lock = threading.Lock()
+_available_modules: dict[str, bool] = {}
+
+
+@dataclass
+class SkillSpec:
+    """Static description of one skill, read from the manifest."""
+
+    name: str
+    module: str
+    class_name: str
+    description: str
+    tools: list[dict[str, Any]]
+    requires: list[str] = field(default_factory=list)
+
+    def load_class(self) -> type[Skill]:
+        return getattr(import_module(self.module), self.class_name)
+
+    def missing_requirements(self) -> list[str]:
+        """Required top-level modules that are not installed (checked without importing)."""
+        missing = []
+        for module in self.requires:
+            if module not in _available_modules:
+                _available_modules[module] = importlib.util.find_spec(module) is not None
+            if not _available_modules[module]:
+                missing.append(module)
+        return missing
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "module": self.module,
+            "class": self.class_name,
+            "description": self.description,
+            "requires": self.requires,
+            "tools": self.tools,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> SkillSpec:
+        return cls(
+            name=data["name"],
+            module=data["module"],
+            class_name=data["class"],
+            description=data["description"],
+            tools=data["tools"],
+            requires=data.get("requires", []),
+        )
+
+
+class LazySkill:
+    """Stand-in for a skill instance that imports the real skill on first use.
+
+    ``name``, ``description``, and ``get_tools()`` come from the manifest. Tool
+    handlers, ``execute``, and any other attribute load the skill first.
+    """
+
+    def __init__(self, spec: SkillSpec, config: Config):
+        self.spec = spec
+        self.name = spec.name
+        self.description = spec.description
+        self.config = config
+        self._instance: Optional[Skill] = None
+        self._real_tools: dict[str, Tool] = {}
+        self._tools: Optional[list[Tool]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    @property
+    def instance(self) -> Skill:
+        return self._load()
+
+    def get_tools(self) -> list[Tool]:
+        if self._tools is None:
+            self._tools = [self._lazy_tool(entry) for entry in self.spec.tools]
+        return self._tools
+
+    def execute(self, **kwargs) -> str:
+        return self.instance.execute(**kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes the manifest does not provide
+        if name.startswith("__") or name in {"spec", "_instance", "_lock"}:
+            raise AttributeError(name)
+        return getattr(self.instance, name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "lazy"
+        return f"<LazySkill {self.name} ({state})>"
+
+    def _load(self) -> Skill:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    instance = self.spec.load_class()(self.config)
+                    self._real_tools = {tool.name: tool for tool in instance.get_tools()}
+                    self._instance = instance
+        return self._instance
+
+    def _real_tool(self, tool_name: str) -> Tool:
+        self._load()
+        tool = self._real_tools.get(tool_name)
+        if tool is None:
+            raise RuntimeError(
+                f"Skill '{self.name}' has no tool '{tool_name}'; "
+                "regenerate the skill manifest with: python -m r_cli.skills.registry"
+            )
+        return tool
+
+    def _lazy_tool(self, entry: dict[str, Any]) -> Tool:
+        tool_name = entry["name"]
+
+        def handler(**kwargs):
+            return self._real_tool(tool_name).handler(**kwargs)
+
+        async_handler = None
+        if entry.get("async"):
+
+            async def async_handler(**kwargs):
+                return await self._real_tool(tool_name).async_handler(**kwargs)
+
+        return Tool(
+            name=tool_name,
+            description=entry["description"],
+            parameters=entry["parameters"],
+            handler=handler,
+            async_handler=async_handler,
+            timeout=entry.get("timeout"),
+        )
+
+
+def get_skill_specs() -> list[SkillSpec]:
+    """Specs for every registered skill class, in registry order.
+
+    Classes missing from the manifest (a skill added without regenerating
+    it) are imported and described on the spot.
+    """
+    global _specs
+
+    if _specs is not None:
+        return _specs
+    with _specs_lock:
+        if _specs is None:
+            from r_cli.skills import _SKILL_REGISTRY, _load_skill
+
+            manifest = load_manifest()
+            specs = []
+            for class_name in _SKILL_REGISTRY:
+                entry = manifest.get(class_name)
+                if entry is not None:
+                    specs.append(SkillSpec.from_dict(entry))
+                    continue
+                try:
+                    specs.append(describe_skill(_load_skill(class_name)))
+                except Exception:
+                    continue
+            _specs = specs
+    return _specs
+
+
+def find_skill_spec(skill_name: str) -> Optional[SkillSpec]:
+    """First registered skill with this public name."""
+    return next((spec for spec in get_skill_specs() if spec.name == skill_name), None)
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> dict[str, dict[str, Any]]:
+    """Manifest entries keyed by class name; empty when missing or outdated."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("skills", {})
+
+
+# ==================== GENERATION ====================
+
+
+def describe_skill(skill_class: type[Skill]) -> SkillSpec:
+    """Import-time description of one skill class, as stored in the manifest."""
+    from r_cli.core.config import Config
+
+    tools = []
+    for tool in skill_class(Config()).get_tools():
+        tools.append(
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "parameters": tool.parameters,
+                "async": tool.async_handler is not None,
+                "timeout": tool.timeout,
+            }
+        )
+    return SkillSpec(
+        name=skill_class.name,
+        module=skill_class.__module__,
+        class_name=skill_class.__name__,
+        description=skill_class.description,
+        tools=tools,
+        requires=_module_requirements(skill_class.__module__),
+    )
+
+
+def build_manifest() -> dict[str, Any]:
+    from r_cli.skills import _SKILL_REGISTRY, _load_skill
+
+    return {
+        "version": MANIFEST_VERSION,
+        "skills": {
+            class_name: describe_skill(_load_skill(class_name)).to_dict()
+            for class_name in _SKILL_REGISTRY
+        },
+    }
+
+
+def write_manifest(path: Path = MANIFEST_PATH) -> int:
+    """Regenerate the manifest; returns the number of skills written."""
+    manifest = build_manifest()
+    path.write_text(json.dumps(manifest, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+    return len(manifest["skills"])
+
+
+def _module_requirements(module_name: str) -> list[str]:
+    """Third-party top-level modules a skill module imports unconditionally."""
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or spec.origin is None:
+        return []
+    tree = ast.parse(Path(spec.origin).read_text(encoding="utf-8"))
+    required: set[str] = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        else:
+            continue
+        required.update(name.split(".")[0] for name in names)
+    return sorted(
+        name
+        for name in required
+        if name not in sys.stdlib_module_names and name not in {"r_cli", "__future__"}
+    )
+
+
+if __name__ == "__main__":
+    count = write_manifest()
+    print(f"Wrote {count} skills to {MANIFEST_PATH}")
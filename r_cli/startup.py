@@ -0,0 +1,266 @@
+"""Startup profiling for the R CLI.
+
+Every measurement runs in a fresh interpreter so imports are cold and the
+numbers match what a user sees when typing ``r --help``. The report covers
+three things:
+
+- per-module import times, parsed from ``python -X importtime``
+- per-phase timings: importing the CLI, loading the config, discovering
+  skills, and constructing the LLM client
+- wall time of a few representative commands
+
+``check_budget`` compares a report against ``STARTUP_BUDGET_MS`` so both
+``r diagnostics startup --check`` and ``benchmarks/benchmark.py`` can fail
+on a startup regression.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+# Upper bounds in milliseconds. They are deliberately loose so slow CI
+# machines pass; a failure means something heavy moved onto the startup path.
+STARTUP_BUDGET_MS: dict[str, float] = {
+    "import r_cli.main": 1500.0,
+    "phase:config_load": 250.0,
+    "phase:skill_discovery": 500.0,
+    "phase:llm_client": 750.0,
+    "r --help": 2500.0,
+    "r tool --help": 2500.0,
+    "r serve --help": 2500.0,
+}
+
+STARTUP_COMMANDS: list[list[str]] = [
+    ["--help"],
+    ["tool", "--help"],
+    ["serve", "--help"],
+]
+
+_CLI_SCRIPT = "from r_cli.main import cli; cli(prog_name='r')"
+
+# Runs in the child interpreter. It must not import r_cli before the first
+# timer starts, otherwise the import cost leaks out of the measurement.
+_PHASE_SCRIPT = """
+import json, sys, time
+
+config_path = sys.argv[1] or None
+phases = {}
+errors = {}
+
+def timed(name, func):
+    start = time.perf_counter()
+    try:
+        return func()
+    except Exception as exc:
+        errors[name] = f"{type(exc).__name__}: {exc}"
+    finally:
+        phases[name] = (time.perf_counter() - start) * 1000
+
+timed("cli_import", lambda: __import__("r_cli.main"))
+
+from r_cli.core.config import Config
+
+config = timed("config_load", lambda: Config.load(config_path)) or Config()
+
+from r_cli.skills.registry import get_skill_specs
+
+timed("skill_discovery", get_skill_specs)
+
+
+def build_client():
+    from r_cli.core.llm import LLMClient
+
+    return LLMClient(config)
+
+
+timed("llm_client", build_client)
+print(json.dumps({"phases": phases, "errors": errors}))
+"""
+
+
+@dataclass
+class ImportTiming:
+    """Import cost of one module as reported by ``-X importtime``."""
+
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation."""
+        return asdict(self)
+
+
+@dataclass
+class StartupReport:
+    """Cold-start measurements for the CLI."""
+
+    imports: list[ImportTiming] = field(default_factory=list)
+    phases: dict[str, float] = field(default_factory=dict)
+    phase_errors: dict[str, str] = field(default_factory=dict)
+    commands: dict[str, float] = field(default_factory=dict)
+
+    def import_ms(self, module: str) -> Optional[float]:
+        """Return the cumulative import time of a module, if it was imported."""
+        for timing in self.imports:
+            if timing.module == module:
+                return timing.cumulative_ms
+        return None
+
+    def slowest_imports(self, limit: int = 15) -> list[ImportTiming]:
+        """Return the modules with the highest self time."""
+        return sorted(self.imports, key=lambda timing: timing.self_ms, reverse=True)[:limit]
+
+    def timings(self) -> dict[str, float]:
+        """Return every budgeted measurement under its budget key."""
+        values: dict[str, float] = {}
+        cli_import = self.import_ms("r_cli.main")
+        if cli_import is not None:
+            values["import r_cli.main"] = cli_import
+        for name, elapsed in self.phases.items():
+            values[f"phase:{name}"] = elapsed
+        values.update(self.commands)
+        return values
+
+    def to_dict(self, limit: int = 15) -> dict[str, Any]:
+        """Return a JSON-serializable representation."""
+        return {
+            "timings_ms": {name: round(value, 2) for name, value in self.timings().items()},
+            "phase_errors": self.phase_errors,
+            "slowest_imports": [timing.to_dict() for timing in self.slowest_imports(limit)],
+        }
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """Parse the stderr of ``python -X importtime`` into import timings."""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us, name = parts
+        try:
+            self_value = int(self_us.strip())
+            cumulative_value = int(cumulative_us.strip())
+        except ValueError:
+            continue  # Header line
+        stripped = name.lstrip(" ")
+        # Nested imports are indented by two spaces per level after one leading space.
+        depth = max(0, (len(name) - len(stripped) - 1) // 2)
+        timings.append(
+            ImportTiming(
+                module=stripped.strip(),
+                self_ms=self_value / 1000,
+                cumulative_ms=cumulative_value / 1000,
+                depth=depth,
+            )
+        )
+    return timings
+
+
+def _child_env() -> dict[str, str]:
+    env = dict(os.environ)
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    return env
+
+
+def profile_imports(module: str = "r_cli.main", timeout: float = 60.0) -> list[ImportTiming]:
+    """Import a module in a fresh interpreter and return its import timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=False,
+        text=True,
+        timeout=timeout,
+        env=_child_env(),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed: {result.stderr.strip()[-500:]}")
+    return parse_importtime(result.stderr)
+
+
+def measure_phases(
+    config_path: Optional[str] = None,
+    timeout: float = 60.0,
+) -> tuple[dict[str, float], dict[str, str]]:
+    """Time the startup phases in a fresh interpreter.
+
+    Returns the phase timings in milliseconds and any phase errors. A phase
+    that raises (for example an LLM client rejecting a remote endpoint) is
+    still timed and reported rather than aborting the profile.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", _PHASE_SCRIPT, config_path or ""],
+        capture_output=True,
+        check=False,
+        text=True,
+        timeout=timeout,
+        env=_child_env(),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup phase probe failed: {result.stderr.strip()[-500:]}")
+    payload = json.loads(result.stdout.strip().splitlines()[-1])
+    return payload["phases"], payload["errors"]
+
+
+def measure_command(args: list[str], runs: int = 3, timeout: float = 60.0) -> float:
+    """Return the fastest wall time of ``r <args>`` over several cold runs."""
+    times = []
+    for _ in range(max(1, runs)):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", _CLI_SCRIPT, *args],
+            capture_output=True,
+            check=False,
+            timeout=timeout,
+            env=_child_env(),
+            stdin=subprocess.DEVNULL,
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            stderr = result.stderr.decode(errors="replace").strip()[-500:]
+            raise RuntimeError(f"Command 'r {' '.join(args)}' failed: {stderr}")
+        times.append(elapsed)
+    return min(times)
+
+
+def profile_startup(
+    config_path: Optional[str] = None,
+    runs: int = 3,
+    commands: Optional[list[list[str]]] = None,
+) -> StartupReport:
+    """Collect import, phase, and command timings for the CLI."""
+    report = StartupReport(imports=profile_imports("r_cli.main"))
+
+    phase_runs = [measure_phases(config_path) for _ in range(max(1, runs))]
+    for name in phase_runs[0][0]:
+        report.phases[name] = statistics.median(run[0][name] for run in phase_runs)
+    report.phase_errors = phase_runs[0][1]
+
+    for args in STARTUP_COMMANDS if commands is None else commands:
+        report.commands["r " + " ".join(args)] = measure_command(args, runs=runs)
+
+    return report
+
+
+def check_budget(
+    report: StartupReport,
+    budget: Optional[dict[str, float]] = None,
+) -> list[str]:
+    """Return a message for each measurement that exceeds its budget."""
+    budget = STARTUP_BUDGET_MS if budget is None else budget
+    timings = report.timings()
+    violations = []
+    for name, limit in budget.items():
+        value = timings.get(name)
+        if value is not None and value > limit:
+            violations.append(f"{name}: {value:.0f}ms exceeds budget of {limit:.0f}ms")
+    return violations
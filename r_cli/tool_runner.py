@@ -1,6 +1,8 @@
 """Direct, schema-aware execution of R CLI tools."""
 
 import json
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any
 
@@ -9,6 +11,16 @@ from r_cli.core.config import Config
 from r_cli.core.llm import Tool
 from r_cli.core.permissions import ApprovalCallback, PermissionManager
 
+# Resolved (config, skill, tool) matches kept per thread for reuse across calls
+MAX_RESOLVED_TOOLS = 256
+# Config objects whose serialized form is remembered for cache keys
+MAX_CONFIG_KEYS = 32
+
+# Skills keep mutable state, so threads (parallel workflow steps) never share one
+_local = threading.local()
+_config_keys: OrderedDict[int, tuple[Config, str]] = OrderedDict()
+_config_keys_lock = threading.Lock()
+
 
 class ToolRunnerError(ValueError):
     """Raised when a skill, tool, or argument is invalid."""
@@ -23,28 +35,74 @@ class ToolMatch:
 
 
 def load_skill(skill_name: str, config: Config | None = None) -> Skill:
-    """Load one skill by its public name."""
-    from r_cli.skills import get_all_skills
+    """Load one skill by its public name, importing only that skill's module."""
+    from r_cli.skills.registry import find_skill_spec
 
     active_config = config or Config.load()
     active_config.ensure_directories()
-    for skill_class in get_all_skills():
-        if getattr(skill_class, "name", None) == skill_name:
-            return skill_class(active_config)
-    raise ToolRunnerError(f"Unknown skill: {skill_name}")
+    spec = find_skill_spec(skill_name)
+    if spec is None:
+        raise ToolRunnerError(f"Unknown skill: {skill_name}")
+    return spec.load_class()(active_config)
+
+
+def _config_key(config: Config) -> str:
+    """Serialized config, computed once per config object.
+
+    The entry holds a reference to the config so its id cannot be reused by
+    another object. A config changed after its first lookup keeps its key.
+    """
+    with _config_keys_lock:
+        entry = _config_keys.get(id(config))
+        if entry is not None and entry[0] is config:
+            _config_keys.move_to_end(id(config))
+            return entry[1]
+
+    key = config.model_dump_json()
+    with _config_keys_lock:
+        _config_keys[id(config)] = (config, key)
+        while len(_config_keys) > MAX_CONFIG_KEYS:
+            _config_keys.popitem(last=False)
+    return key
+
+
+def _resolved_tools() -> OrderedDict[tuple[str, str, str], ToolMatch]:
+    resolved = getattr(_local, "resolved", None)
+    if resolved is None:
+        resolved = _local.resolved = OrderedDict()
+    return resolved
 
 
 def resolve_tool(skill_name: str, tool_name: str, config: Config | None = None) -> ToolMatch:
-    """Resolve a tool from a skill."""
-    skill = load_skill(skill_name, config)
-    for tool in skill.get_tools():
-        if tool.name == tool_name:
-            return ToolMatch(skill=skill, tool=tool)
-
-    available = ", ".join(tool.name for tool in skill.get_tools()) or "none"
-    raise ToolRunnerError(
-        f"Unknown tool '{tool_name}' for skill '{skill_name}'. Available: {available}"
+    """Resolve a tool from a skill.
+
+    Matches are cached per configuration and thread, so repeated calls
+    (workflow steps, retries, and later runs) on one thread reuse one skill
+    instance and its bound handler, while concurrent steps get their own.
+    """
+    active_config = config or Config.load()
+    key = (_config_key(active_config), skill_name, tool_name)
+    resolved = _resolved_tools()
+    match = resolved.get(key)
+    if match is not None:
+        resolved.move_to_end(key)
+        return match
+
+    skill = load_skill(skill_name, active_config)
+    tools = skill.get_tools()
+    match = next(
+        (ToolMatch(skill=skill, tool=tool) for tool in tools if tool.name == tool_name), None
     )
+    if match is None:
+        available = ", ".join(tool.name for tool in tools) or "none"
+        raise ToolRunnerError(
+            f"Unknown tool '{tool_name}' for skill '{skill_name}'. Available: {available}"
+        )
+
+    resolved[key] = match
+    while len(resolved) > MAX_RESOLVED_TOOLS:
+        resolved.popitem(last=False)
+    return match
 
 
 def parse_key_value(value: str) -> tuple[str, Any]:
@@ -105,17 +163,23 @@ def execute_tool(
     approval_callback: ApprovalCallback | None = None,
     auto_approve: bool = False,
     source: str = "cli",
+    permissions: PermissionManager | None = None,
 ) -> Any:
-    """Resolve, validate, and execute a tool."""
+    """Resolve, validate, and execute a tool.
+
+    Callers running many tools under one policy (workflows) pass a shared
+    ``permissions`` manager instead of building one per call.
+    """
     active_config = config or Config.load()
     match = resolve_tool(skill_name, tool_name, active_config)
     validate_arguments(match.tool, arguments)
-    permissions = PermissionManager(
-        active_config,
-        approval_callback=approval_callback,
-        auto_approve=auto_approve,
-        source=source,
-    )
+    if permissions is None:
+        permissions = PermissionManager(
+            active_config,
+            approval_callback=approval_callback,
+            auto_approve=auto_approve,
+            source=source,
+        )
     return permissions.execute(skill_name, tool_name, match.tool.handler, arguments)
 
 
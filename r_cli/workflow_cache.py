@@ -0,0 +1,193 @@
+"""Content-addressed result cache for deterministic workflow steps.
+
+A step opts in with ``cache: true`` (or ``cache: {ttl: seconds}``). Its key
+covers the tool, the rendered arguments, and a fingerprint of every file the
+arguments reference (found with r_cli.security.find_paths). A file is
+fingerprinted by the SHA-256 of its content. The digest is remembered per
+(path, mtime, size), so files that have not changed are not read again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from r_cli.security import find_paths
+
+logger = logging.getLogger(__name__)
+
+CACHE_SCHEMA_VERSION = 1
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# After eviction the cache is trimmed to this fraction of max_bytes
+_EVICT_TARGET = 0.9
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+class StepCache:
+    """SQLite-backed store of completed step results."""
+
+    def __init__(self, directory: str | Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            directory: Directory holding the cache database
+            max_bytes: Result bytes kept before least recently used entries are evicted
+        """
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / "steps.sqlite3"
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    target TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_results_last_used ON results(last_used);
+                CREATE TABLE IF NOT EXISTS file_digests (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    digest TEXT NOT NULL
+                );
+                """
+            )
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    # ==================== KEYS ====================
+
+    def key(self, target: str, arguments: dict[str, Any]) -> str:
+        """Content-addressed key for one tool call."""
+        files = {str(path): self._fingerprint(path) for path in find_paths(arguments)}
+        payload = json.dumps(
+            {
+                "version": CACHE_SCHEMA_VERSION,
+                "target": target,
+                "arguments": arguments,
+                "files": files,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _fingerprint(self, path: Path) -> str:
+        try:
+            stat = path.stat()
+        except OSError:
+            return "missing"
+        if not path.is_file():
+            return f"dir:{stat.st_mtime_ns}:{stat.st_size}"
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime_ns, size, digest FROM file_digests WHERE path = ?", (str(path),)
+            ).fetchone()
+        if row is not None and (row[0], row[1]) == (stat.st_mtime_ns, stat.st_size):
+            return row[2]
+
+        digest = hashlib.sha256()
+        try:
+            with path.open("rb") as handle:
+                while chunk := handle.read(_HASH_CHUNK_BYTES):
+                    digest.update(chunk)
+        except OSError:
+            return "unreadable"
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_digests(path, mtime_ns, size, digest) "
+                "VALUES (?, ?, ?, ?)",
+                (str(path), stat.st_mtime_ns, stat.st_size, digest.hexdigest()),
+            )
+        return digest.hexdigest()
+
+    # ==================== LOOKUP ====================
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """Return (hit, result); expired entries count as misses and are removed."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT result, size, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return False, None
+            if row[2] <= now:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._bytes = max(self._bytes - row[1], 0)
+                return False, None
+            self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+        return True, json.loads(row[0])
+
+    def put(self, key: str, target: str, result: Any, ttl: float) -> bool:
+        """Store a result; returns False when it cannot be serialized or is too large."""
+        try:
+            payload = json.dumps(result)
+        except (TypeError, ValueError):
+            return False
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return False
+
+        now = time.time()
+        with self._lock, self._conn:
+            previous = self._conn.execute(
+                "SELECT size FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO results(key, target, result, size, expires_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, target, payload, size, now + ttl, now),
+            )
+            self._bytes += size - (previous[0] if previous else 0)
+            if self._bytes > self.max_bytes:
+                self._evict(now)
+        return True
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones, until under budget."""
+        self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        target = int(self.max_bytes * _EVICT_TARGET)
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM results ORDER BY last_used"
+        ).fetchall():
+            if self._bytes <= target:
+                break
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._bytes -= size
+            evicted += 1
+        logger.debug(f"Evicted {evicted} workflow step results from {self.path}")
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results")
+            self._conn.execute("DELETE FROM file_digests")
+            self._bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
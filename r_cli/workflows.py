@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import logging
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
@@ -12,7 +15,7 @@ from jinja2 import StrictUndefined
 from jinja2.nativetypes import NativeEnvironment
 from jinja2.sandbox import SandboxedEnvironment
 
-from r_cli.core.permissions import PermissionDeniedError
+from r_cli.core.permissions import PermissionDeniedError, PermissionManager
 from r_cli.tool_runner import (
     ToolRunnerError,
     execute_tool,
@@ -20,13 +23,20 @@ from r_cli.tool_runner import (
     resolve_tool,
     validate_arguments,
 )
+from r_cli.workflow_cache import DEFAULT_TTL_SECONDS, StepCache
 
 if TYPE_CHECKING:
+    from jinja2 import Template
+
     from r_cli.core.config import Config
     from r_cli.core.permissions import ApprovalCallback
 
+logger = logging.getLogger(__name__)
+
 MAX_WORKFLOW_STEPS = 100
-ROOT_KEYS = {"version", "name", "variables", "steps"}
+DEFAULT_MAX_PARALLEL = 1
+MAX_PARALLEL_LIMIT = 32
+ROOT_KEYS = {"version", "name", "variables", "steps", "max_parallel", "max_parallel_per_skill"}
 STEP_KEYS = {
     "id",
     "uses",
@@ -35,7 +45,9 @@ STEP_KEYS = {
     "if",
     "retry",
     "continue_on_error",
+    "cache",
 }
+CACHE_KEYS = {"ttl"}
 
 
 class WorkflowError(ValueError):
@@ -46,6 +58,18 @@ class SandboxedNativeEnvironment(SandboxedEnvironment, NativeEnvironment):
     """Render native Python values without exposing unsafe template operations."""
 
 
+# One sandboxed environment renders every workflow; templates are compiled once
+# (when the workflow is loaded) and reused by later steps, retries, and runs
+MAX_COMPILED_TEMPLATES = 4096
+_environment = SandboxedNativeEnvironment(undefined=StrictUndefined, autoescape=False)
+_templates: dict[str, Template] = {}
+_templates_lock = threading.Lock()
+
+MAX_CACHED_WORKFLOWS = 64
+_workflows: dict[str, tuple[tuple[int, int], Workflow]] = {}
+_workflows_lock = threading.Lock()
+
+
 @dataclass
 class WorkflowStep:
     """One tool invocation in a workflow."""
@@ -57,6 +81,8 @@ class WorkflowStep:
     condition: Any = True
     retry: int = 0
     continue_on_error: bool = False
+    # Seconds a cached result stays valid; None disables result caching
+    cache_ttl: float | None = None
 
     @property
     def target(self) -> tuple[str, str]:
@@ -72,6 +98,8 @@ class Workflow:
     steps: list[WorkflowStep]
     variables: dict[str, Any] = field(default_factory=dict)
     version: int = 1
+    max_parallel: int = DEFAULT_MAX_PARALLEL
+    max_parallel_per_skill: dict[str, int] = field(default_factory=dict)
 
 
 @dataclass
@@ -85,6 +113,7 @@ class StepResult:
     error: str | None = None
     attempts: int = 0
     duration_ms: float = 0.0
+    cached: bool = False
 
 
 @dataclass
@@ -106,8 +135,33 @@ class WorkflowResult:
 
 
 def load_workflow(path: str | Path) -> Workflow:
-    """Load and validate a workflow YAML file."""
+    """Load and validate a workflow YAML file.
+
+    Compiled workflows are cached by path, size, and modification time, so a
+    worker that runs the same file repeatedly parses it once. The returned
+    Workflow is shared between callers and must be treated as read-only.
+    """
     workflow_path = Path(path).expanduser()
+    try:
+        stat = workflow_path.stat()
+    except FileNotFoundError as exc:
+        raise WorkflowError(f"Workflow not found: {workflow_path}") from exc
+    key = str(workflow_path.resolve())
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _workflows.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    workflow = _parse_workflow(workflow_path)
+    with _workflows_lock:
+        _workflows.pop(key, None)
+        while len(_workflows) >= MAX_CACHED_WORKFLOWS:
+            del _workflows[next(iter(_workflows))]
+        _workflows[key] = (signature, workflow)
+    return workflow
+
+
+def _parse_workflow(workflow_path: Path) -> Workflow:
     try:
         raw = yaml.safe_load(workflow_path.read_text(encoding="utf-8"))
     except FileNotFoundError as exc:
@@ -135,16 +189,29 @@ def load_workflow(path: str | Path) -> Workflow:
     if len(raw_steps) > MAX_WORKFLOW_STEPS:
         raise WorkflowError(f"Workflow exceeds the {MAX_WORKFLOW_STEPS}-step limit")
 
+    max_parallel = _parse_parallel_limit(
+        raw.get("max_parallel", DEFAULT_MAX_PARALLEL), "Workflow max_parallel"
+    )
+    raw_skill_limits = raw.get("max_parallel_per_skill", {})
+    if not isinstance(raw_skill_limits, dict):
+        raise WorkflowError("Workflow max_parallel_per_skill must map skill names to limits")
+    skill_limits = {
+        str(skill): _parse_parallel_limit(limit, f"max_parallel_per_skill.{skill}")
+        for skill, limit in raw_skill_limits.items()
+    }
+
     steps = [_parse_step(item, index) for index, item in enumerate(raw_steps, 1)]
     _validate_graph(steps)
     for step in steps:
-        _validate_templates(step.with_)
-        _validate_templates(step.condition)
+        _compile_templates(step.with_)
+        _compile_templates(step.condition)
     return Workflow(
         name=name.strip(),
         version=1,
         variables=raw_variables,
         steps=steps,
+        max_parallel=max_parallel,
+        max_parallel_per_skill=skill_limits,
     )
 
 
@@ -155,81 +222,145 @@ def run_workflow(
     approval_callback: ApprovalCallback | None = None,
     auto_approve: bool = False,
     dry_run: bool = False,
+    max_parallel: int | None = None,
+    cache_dir: str | Path | None = None,
 ) -> WorkflowResult:
-    """Execute workflow steps in dependency order."""
+    """Execute workflow steps in dependency order.
+
+    Each step starts as soon as its own dependencies have finished, with up
+    to ``max_parallel`` steps (and ``max_parallel_per_skill`` per skill)
+    running at once. Results are reported in dependency-level order, then
+    definition order, regardless of completion timing.
+
+    Steps that set ``cache`` reuse stored results from ``cache_dir``
+    (default: ``<home_dir>/workflow-cache``) when their tool, rendered
+    arguments, and referenced files are unchanged.
+    """
     from r_cli.core.config import Config
 
     active_config = config or Config.load()
+    limit = _parse_parallel_limit(
+        max_parallel if max_parallel is not None else workflow.max_parallel, "max_parallel"
+    )
     context: dict[str, Any] = {
         "vars": {**workflow.variables, **(variables or {})},
         "steps": {},
     }
-    pending = {step.id: step for step in workflow.steps}
-    results: list[StepResult] = []
+    permissions = PermissionManager(
+        active_config,
+        approval_callback=approval_callback,
+        auto_approve=auto_approve,
+        source=f"workflow:{workflow.name}",
+    )
+    cache = None
+    if not dry_run and any(step.cache_ttl is not None for step in workflow.steps):
+        cache = StepCache(cache_dir or Path(active_config.home_dir).expanduser() / "workflow-cache")
+    waiting = list(workflow.steps)
+    results: dict[str, StepResult] = {}
+    running: dict[Future, WorkflowStep] = {}
+    skills_running: dict[str, int] = {}
+    stopped_after: str | None = None
     started_at = time.perf_counter()
     failed = False
 
-    while pending:
-        ready = [
-            step
-            for step in workflow.steps
-            if step.id in pending
-            and all(dependency in context["steps"] for dependency in step.depends_on)
-        ]
-        if not ready:
-            raise WorkflowError("Workflow dependencies could not be resolved")
-
-        for step in ready:
-            del pending[step.id]
-            dependency_failed = any(
-                context["steps"][dependency]["status"] in {"error", "skipped"}
-                for dependency in step.depends_on
-            )
-            if dependency_failed:
-                result = StepResult(step.id, step.uses, "skipped", error="dependency failed")
-            elif not _is_truthy(_render(step.condition, context)):
-                result = StepResult(step.id, step.uses, "skipped")
-            elif dry_run:
-                result = StepResult(
-                    step.id,
-                    step.uses,
-                    "planned",
-                    result={"arguments": _render(step.with_, context)},
-                )
-            else:
-                result = _run_step(
-                    workflow,
-                    step,
-                    context,
-                    active_config,
-                    approval_callback,
-                    auto_approve,
-                )
-
-            results.append(result)
-            context["steps"][step.id] = {
-                "status": result.status,
-                "result": f"<result:{step.id}>" if result.status == "planned" else result.result,
-                "error": result.error,
-            }
-            if result.status == "error":
-                failed = True
-                if not step.continue_on_error:
-                    for blocked in pending.values():
-                        results.append(
-                            StepResult(
+    def record(step: WorkflowStep, result: StepResult) -> None:
+        nonlocal failed, stopped_after
+        results[step.id] = result
+        context["steps"][step.id] = {
+            "status": result.status,
+            "result": f"<result:{step.id}>" if result.status == "planned" else result.result,
+            "error": result.error,
+        }
+        if result.status == "error":
+            failed = True
+            if not step.continue_on_error and stopped_after is None:
+                stopped_after = step.id
+
+    def has_capacity(step: WorkflowStep) -> bool:
+        skill = step.target[0]
+        skill_limit = workflow.max_parallel_per_skill.get(skill)
+        return len(running) < limit and (
+            skill_limit is None or skills_running.get(skill, 0) < skill_limit
+        )
+
+    try:
+        with ThreadPoolExecutor(max_workers=limit, thread_name_prefix="r-workflow") as pool:
+            while waiting or running:
+                # Skips and plans resolve immediately and may unblock later steps
+                progressed = True
+                while progressed and stopped_after is None:
+                    progressed = False
+                    for step in list(waiting):
+                        if not all(dependency in results for dependency in step.depends_on):
+                            continue
+                        dependency_failed = any(
+                            results[dependency].status in {"error", "skipped"}
+                            for dependency in step.depends_on
+                        )
+                        if dependency_failed:
+                            result = StepResult(
+                                step.id, step.uses, "skipped", error="dependency failed"
+                            )
+                        elif not _is_truthy(_render(step.condition, context)):
+                            result = StepResult(step.id, step.uses, "skipped")
+                        elif dry_run:
+                            result = StepResult(
+                                step.id,
+                                step.uses,
+                                "planned",
+                                result={"arguments": _render(step.with_, context)},
+                            )
+                        elif has_capacity(step):
+                            # Render on the scheduler thread; context is only mutated here
+                            arguments = _render(step.with_, context)
+                            future = pool.submit(
+                                _run_step,
+                                workflow,
+                                step,
+                                arguments,
+                                active_config,
+                                permissions,
+                                cache,
+                            )
+                            running[future] = step
+                            skill = step.target[0]
+                            skills_running[skill] = skills_running.get(skill, 0) + 1
+                            waiting.remove(step)
+                            continue
+                        else:
+                            continue
+                        waiting.remove(step)
+                        record(step, result)
+                        progressed = True
+
+                if not running:
+                    if stopped_after is not None:
+                        for blocked in waiting:
+                            results[blocked.id] = StepResult(
                                 blocked.id,
                                 blocked.uses,
                                 "skipped",
-                                error=f"workflow stopped after {step.id}",
+                                error=f"workflow stopped after {stopped_after}",
                             )
-                        )
-                    pending.clear()
+                        break
+                    if waiting:
+                        raise WorkflowError("Workflow dependencies could not be resolved")
                     break
 
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                # Record simultaneous completions in definition order
+                for future in sorted(done, key=lambda item: workflow.steps.index(running[item])):
+                    step = running.pop(future)
+                    skills_running[step.target[0]] -= 1
+                    record(step, future.result())
+
+    finally:
+        if cache is not None:
+            cache.close()
     duration_ms = round((time.perf_counter() - started_at) * 1000, 3)
     status = "planned" if dry_run else ("error" if failed else "completed")
-    return WorkflowResult(workflow.name, status, results, duration_ms)
+    ordered = [results[step.id] for step in _execution_order(workflow.steps)]
+    return WorkflowResult(workflow.name, status, ordered, duration_ms)
 
 
 def validate_workflow_tools(workflow: Workflow, config: Config | None = None) -> None:
@@ -278,9 +409,51 @@ def _parse_step(raw: Any, index: int) -> WorkflowStep:
         condition=raw.get("if", True),
         retry=retry,
         continue_on_error=bool(raw.get("continue_on_error", False)),
+        cache_ttl=_parse_cache(raw.get("cache", False), step_id),
     )
 
 
+def _parse_cache(value: Any, step_id: str) -> float | None:
+    if value is False or value is None:
+        return None
+    if value is True:
+        return DEFAULT_TTL_SECONDS
+    if not isinstance(value, dict):
+        raise WorkflowError(f"Step '{step_id}' cache must be true, false, or an object")
+    unknown_keys = set(value) - CACHE_KEYS
+    if unknown_keys:
+        raise WorkflowError(
+            f"Step '{step_id}' cache has unknown fields: {', '.join(sorted(unknown_keys))}"
+        )
+    ttl = value.get("ttl", DEFAULT_TTL_SECONDS)
+    if isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl <= 0:
+        raise WorkflowError(f"Step '{step_id}' cache ttl must be a positive number of seconds")
+    return float(ttl)
+
+
+def _parse_parallel_limit(value: Any, label: str) -> int:
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise WorkflowError(f"{label} must be an integer")
+    if not 1 <= value <= MAX_PARALLEL_LIMIT:
+        raise WorkflowError(f"{label} must be between 1 and {MAX_PARALLEL_LIMIT}")
+    return value
+
+
+def _execution_order(steps: list[WorkflowStep]) -> list[WorkflowStep]:
+    """Steps sorted by dependency depth, then by definition order."""
+    by_id = {step.id: step for step in steps}
+    depths: dict[str, int] = {}
+
+    def depth(step_id: str) -> int:
+        if step_id not in depths:
+            dependencies = by_id[step_id].depends_on
+            depths[step_id] = 1 + max((depth(item) for item in dependencies), default=-1)
+        return depths[step_id]
+
+    positions = {step.id: index for index, step in enumerate(steps)}
+    return sorted(steps, key=lambda step: (depth(step.id), positions[step.id]))
+
+
 def _validate_graph(steps: list[WorkflowStep]) -> None:
     ids = [step.id for step in steps]
     if len(ids) != len(set(ids)):
@@ -317,17 +490,35 @@ def _validate_graph(steps: list[WorkflowStep]) -> None:
 def _run_step(
     workflow: Workflow,
     step: WorkflowStep,
-    context: dict[str, Any],
+    arguments: dict[str, Any],
     config: Config,
-    approval_callback: ApprovalCallback | None,
-    auto_approve: bool,
+    permissions: PermissionManager,
+    cache: StepCache | None = None,
 ) -> StepResult:
     started_at = time.perf_counter()
-    arguments = _render(step.with_, context)
     skill, tool = step.target
     last_error: Exception | None = None
     attempts = 0
 
+    cache_key = None
+    if cache is not None and step.cache_ttl is not None:
+        cache_key = cache.key(step.uses, arguments)
+        hit, cached_result = cache.get(cache_key)
+        if hit:
+            try:
+                # Cached results are still subject to the active permission policy
+                permissions.authorize(skill, tool, arguments)
+            except PermissionDeniedError as exc:
+                return StepResult(step.id, step.uses, "error", error=str(exc))
+            return StepResult(
+                step.id,
+                step.uses,
+                "completed",
+                result=cached_result,
+                duration_ms=round((time.perf_counter() - started_at) * 1000, 3),
+                cached=True,
+            )
+
     for attempt in range(1, step.retry + 2):
         attempts = attempt
         try:
@@ -336,23 +527,32 @@ def _run_step(
                 tool,
                 arguments,
                 config=config,
-                approval_callback=approval_callback,
-                auto_approve=auto_approve,
-                source=f"workflow:{workflow.name}",
+                approval_callback=permissions.approval_callback,
+                auto_approve=permissions.auto_approve,
+                source=permissions.source,
+                permissions=permissions,
             )
+            result = normalize_result(value)
+        except (PermissionDeniedError, ToolRunnerError, WorkflowError) as exc:
+            last_error = exc
+            break
+        except Exception as exc:
+            last_error = exc
+        else:
+            if cache_key is not None:
+                # The tool already ran; a cache failure must not trigger a retry
+                try:
+                    cache.put(cache_key, step.uses, result, step.cache_ttl)
+                except Exception as exc:
+                    logger.warning(f"Could not cache result of step '{step.id}': {exc}")
             return StepResult(
                 step.id,
                 step.uses,
                 "completed",
-                result=normalize_result(value),
+                result=result,
                 attempts=attempt,
                 duration_ms=round((time.perf_counter() - started_at) * 1000, 3),
             )
-        except (PermissionDeniedError, ToolRunnerError, WorkflowError) as exc:
-            last_error = exc
-            break
-        except Exception as exc:
-            last_error = exc
 
     return StepResult(
         step.id,
@@ -365,10 +565,9 @@ def _run_step(
 
 
 def _render(value: Any, context: dict[str, Any]) -> Any:
-    environment = SandboxedNativeEnvironment(undefined=StrictUndefined, autoescape=False)
     try:
         if isinstance(value, str):
-            return environment.from_string(value).render(context)
+            return _compile(value).render(context)
         if isinstance(value, dict):
             return {key: _render(item, context) for key, item in value.items()}
         if isinstance(value, list):
@@ -378,17 +577,27 @@ def _render(value: Any, context: dict[str, Any]) -> Any:
         raise WorkflowError(f"Template rendering failed: {exc}") from exc
 
 
-def _validate_templates(value: Any) -> None:
-    environment = SandboxedNativeEnvironment(undefined=StrictUndefined, autoescape=False)
+def _compile(source: str) -> Template:
+    template = _templates.get(source)
+    if template is None:
+        template = _environment.from_string(source)
+        with _templates_lock:
+            if len(_templates) >= MAX_COMPILED_TEMPLATES:
+                _templates.clear()
+            _templates[source] = template
+    return template
+
+
+def _compile_templates(value: Any) -> None:
     try:
         if isinstance(value, str):
-            environment.parse(value)
+            _compile(value)
         elif isinstance(value, dict):
             for item in value.values():
-                _validate_templates(item)
+                _compile_templates(item)
         elif isinstance(value, list):
             for item in value:
-                _validate_templates(item)
+                _compile_templates(item)
     except Exception as exc:
         raise WorkflowError(f"Invalid workflow template: {exc}") from exc
 
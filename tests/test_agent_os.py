@@ -1,5 +1,9 @@
 """Tests for the persistent Agent OS runtime."""
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
 from unittest.mock import patch
 
@@ -9,11 +13,14 @@ from r_cli.agent_os import (
     AgentManifest,
     AgentOS,
     AgentOSError,
+    _task_priority_case_sql,
     load_agent_manifest,
     validate_agent_capabilities,
 )
+from r_cli.agent_os_worker import AgentOSWorkerPool
 from r_cli.core.config import Config
 from r_cli.core.memory import Memory
+from r_cli.skills.registry import find_skill_spec
 
 
 def os_config(tmp_path: Path) -> Config:
@@ -376,6 +383,14 @@ def test_unknown_agent_capability_is_rejected():
         )
 
 
+def test_agent_skill_with_missing_dependency_is_rejected(monkeypatch):
+    specs = [replace(find_skill_spec("math"), requires=["r_cli_missing_dependency"])]
+    monkeypatch.setattr("r_cli.skills.registry.get_skill_specs", lambda: specs)
+
+    with pytest.raises(AgentOSError, match="missing dependencies: math"):
+        validate_agent_capabilities(AgentManifest("agent", "Agent", skills=["math"]))
+
+
 def test_broad_host_capability_requires_explicit_unsafe_flag():
     with pytest.raises(AgentOSError, match="unsafe_capabilities"):
         validate_agent_capabilities(AgentManifest("coder", "Coder", skills=["code"]))
@@ -511,3 +526,196 @@ allowed_hosts:
 
     with pytest.raises(AgentOSError, match="Invalid agent allowed host"):
         load_agent_manifest(manifest)
+
+
+def test_claim_next_task_is_atomic_across_threads(tmp_path):
+    runtime = AgentOS(os_config(tmp_path))
+    runtime.install(AgentManifest("writer", "Writes things"))
+    for index in range(20):
+        runtime.create_task("writer", f"task {index}")
+
+    def claim_all() -> list[str]:
+        claimed = []
+        while (task := AgentOS(os_config(tmp_path)).claim_next_task()) is not None:
+            claimed.append(task["id"])
+        return claimed
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        batches = list(pool.map(lambda _: claim_all(), range(4)))
+
+    claimed = [task_id for batch in batches for task_id in batch]
+    assert len(claimed) == 20
+    assert len(set(claimed)) == 20
+    assert runtime.status()["tasks"]["running"] == 20
+
+
+def test_runtime_reuses_one_connection_per_thread(tmp_path):
+    runtime = AgentOS(os_config(tmp_path))
+    main_connection = runtime._connect()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        worker_connection = pool.submit(runtime._connect).result()
+
+    assert runtime._connect() is main_connection
+    assert worker_connection is not main_connection
+    runtime.close()
+    assert runtime._connect() is not main_connection
+
+
+def test_queued_listing_is_served_by_schedule_index(tmp_path):
+    runtime = AgentOS(os_config(tmp_path))
+    with runtime._connect() as connection:
+        plan = connection.execute(
+            f"""
+            EXPLAIN QUERY PLAN
+            SELECT * FROM tasks WHERE status = 'queued'
+            ORDER BY {_task_priority_case_sql()} DESC, created_at DESC
+            LIMIT 20
+            """
+        ).fetchall()
+
+    details = " ".join(row["detail"] for row in plan)
+    assert "idx_tasks_schedule" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_state_transition_returns_task_and_emits_event_together(tmp_path):
+    runtime = AgentOS(os_config(tmp_path))
+    runtime.install(AgentManifest("writer", "Writes things"))
+    task = runtime.create_task("writer", "Draft")
+
+    running = runtime._transition(task["id"], "running")
+    completed = runtime._transition(task["id"], "completed", result="done")
+
+    assert running["status"] == "running"
+    assert completed["status"] == "completed"
+    assert completed["result"] == "done"
+    assert runtime._transition(task["id"], "failed", error="late") is None
+    assert [event["event_type"] for event in runtime.list_events(limit=2)] == [
+        "task.completed",
+        "task.running",
+    ]
+
+
+def test_latest_event_id_advances_with_every_change(tmp_path):
+    runtime = AgentOS(os_config(tmp_path))
+    assert runtime.latest_event_id() == 0
+
+    runtime.install(AgentManifest("writer", "Writes things"))
+    installed = runtime.latest_event_id()
+    task = runtime.create_task("writer", "Draft")
+    created = runtime.latest_event_id()
+    runtime.set_task_priority(task["id"], "high")
+
+    assert 0 < installed < created < runtime.latest_event_id()
+    assert runtime.latest_event_id() == runtime.list_events(limit=1)[0]["id"]
+
+
+def test_create_task_rejects_unknown_agent(tmp_path):
+    runtime = AgentOS(os_config(tmp_path))
+
+    with pytest.raises(AgentOSError, match="Unknown agent: ghost"):
+        runtime.create_task("ghost", "Task")
+    assert runtime.status()["tasks"]["queued"] == 0
+
+
+def test_claim_next_task_skips_excluded_agents(tmp_path):
+    runtime = AgentOS(os_config(tmp_path))
+    runtime.install(AgentManifest("slow", "Slow agent"))
+    runtime.install(AgentManifest("fast", "Fast agent"))
+    runtime.create_task("slow", "Urgent", priority="critical")
+    fast = runtime.create_task("fast", "Cheap")
+
+    claimed = runtime.claim_next_task(exclude_agents={"slow"})
+
+    assert claimed["id"] == fast["id"]
+    assert claimed["status"] == "running"
+    assert runtime.list_events(limit=1)[0]["event_type"] == "task.running"
+
+
+def test_worker_pool_runs_tasks_concurrently(tmp_path):
+    runtime = AgentOS(os_config(tmp_path))
+    runtime.install(AgentManifest("writer", "Writes things"))
+    runtime.create_task("writer", "first", priority="high")
+    runtime.create_task("writer", "second")
+    both_running = threading.Barrier(2, timeout=5)
+
+    def run(_manifest, task_input, *_args):
+        both_running.wait()
+        return f"done:{task_input}"
+
+    with patch.object(runtime, "_run_assistant", side_effect=run):
+        tasks = AgentOSWorkerPool(runtime, concurrency=2, stop_when_idle=True).run()
+
+    assert [task["input"] for task in tasks] == ["first", "second"]
+    assert [task["status"] for task in tasks] == ["completed", "completed"]
+
+
+def test_worker_pool_respects_agent_max_concurrency(tmp_path):
+    runtime = AgentOS(os_config(tmp_path))
+    runtime.install(AgentManifest("slow", "Slow agent", max_concurrency=1))
+    runtime.install(AgentManifest("fast", "Fast agent"))
+    runtime.create_task("slow", "slow-1", priority="critical")
+    runtime.create_task("slow", "slow-2", priority="critical")
+    runtime.create_task("fast", "fast-1")
+    fast_done = threading.Event()
+    order: list[str] = []
+
+    def run(manifest, task_input, *_args):
+        if manifest.name == "slow" and not order:
+            # The first slow task only finishes once the fast agent got the second slot
+            assert fast_done.wait(5)
+        order.append(task_input)
+        if manifest.name == "fast":
+            fast_done.set()
+        return task_input
+
+    with patch.object(runtime, "_run_assistant", side_effect=run):
+        tasks = AgentOSWorkerPool(runtime, concurrency=2, stop_when_idle=True).run()
+
+    assert order[0] == "fast-1"
+    assert sorted(order[1:]) == ["slow-1", "slow-2"]
+    assert all(task["status"] == "completed" for task in tasks)
+
+
+def test_worker_pool_fails_tasks_whose_run_crashed(tmp_path):
+    runtime = AgentOS(os_config(tmp_path))
+    runtime.install(AgentManifest("writer", "Writes things"))
+    runtime.create_task("writer", "crash")
+
+    with patch.object(runtime, "run_claimed_task", side_effect=RuntimeError("worker died")):
+        tasks = AgentOSWorkerPool(runtime, concurrency=2, stop_when_idle=True).run()
+
+    assert tasks[0]["status"] == "failed"
+    assert tasks[0]["error"] == "worker died"
+    assert runtime.get_task(tasks[0]["id"])["status"] == "failed"
+
+
+def test_worker_pool_wakes_on_submission(tmp_path):
+    runtime = AgentOS(os_config(tmp_path))
+    runtime.install(AgentManifest("writer", "Writes things"))
+    pool = AgentOSWorkerPool(runtime, poll_interval=30, max_tasks=1)
+    results: list[dict] = []
+
+    with patch.object(runtime, "_run_assistant", return_value="done"):
+        worker = threading.Thread(target=lambda: results.extend(pool.run()))
+        worker.start()
+        time.sleep(0.2)
+        started = time.monotonic()
+        AgentOS(os_config(tmp_path)).create_task("writer", "wake up")
+        worker.join(10)
+
+    assert not worker.is_alive()
+    assert time.monotonic() - started < 5
+    assert results[0]["input"] == "wake up"
+
+
+def test_manifest_rejects_invalid_max_concurrency(tmp_path):
+    manifest = tmp_path / "agent.yaml"
+    manifest.write_text(
+        "name: writer\ndescription: Writes\nmax_concurrency: 0\n",
+        encoding="utf-8",
+    )
+
+    with pytest.raises(AgentOSError, match="max_concurrency"):
+        load_agent_manifest(manifest)
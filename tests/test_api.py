@@ -51,10 +51,14 @@ from r_cli.api.permissions import (
 )
 from r_cli.api.rate_limit import (
     RATE_LIMIT_TIERS,
+    MemoryRateLimitBackend,
     RateLimitConfig,
     RateLimiter,
+    SQLiteRateLimitBackend,
     TokenBucket,
+    create_backend,
 )
+from r_cli.api.sessions import AgentSessionPool, session_namespace
 
 
 # Mock password hashing for tests (bcrypt can be slow/problematic)
@@ -78,10 +82,9 @@ class TestAuthStorage:
     def test_init_creates_storage_dir(self, temp_dir):
         """Test storage initialization creates directory."""
         storage_path = temp_dir / "auth"
-        storage = AuthStorage(str(storage_path))
+        AuthStorage(str(storage_path))
         assert storage_path.exists()
-        assert (storage_path / "users.json").exists()
-        assert (storage_path / "api_keys.json").exists()
+        assert (storage_path / "auth.sqlite3").exists()
 
     def test_create_user(self, temp_dir):
         """Test user creation."""
@@ -183,6 +186,79 @@ class TestAuthStorage:
         assert "key1" in names
         assert "key2" in names
 
+    def test_api_key_lookup_is_cached_until_revoked(self, temp_dir):
+        """Test active keys are served from memory and revocation is seen by other workers."""
+        worker_a = AuthStorage(str(temp_dir / "auth"))
+        worker_b = AuthStorage(str(temp_dir / "auth"))
+        raw_key, api_key = worker_a.create_api_key("test-key", ["read"])
+        key_hash = hashlib.sha256(raw_key.encode()).hexdigest()
+
+        first = worker_b.get_api_key_by_hash(key_hash)
+        assert worker_b.get_api_key_by_hash(key_hash) is first
+
+        worker_a.revoke_api_key(api_key.key_id)
+
+        assert worker_b.get_api_key_by_hash(key_hash).is_active is False
+
+    def test_last_used_updates_are_batched(self, temp_dir):
+        """Test last_used is buffered in memory and written on flush."""
+        storage = AuthStorage(str(temp_dir / "auth"), last_used_flush_interval=60)
+        other = AuthStorage(str(temp_dir / "auth"))
+        _, api_key = storage.create_api_key("test-key", ["read"])
+
+        storage.update_api_key_last_used(api_key.key_id)
+        storage.update_api_key_last_used(api_key.key_id)
+
+        assert storage.get_api_key(api_key.key_id).last_used is not None
+        assert other.get_api_key(api_key.key_id).last_used is None
+
+        storage.flush()
+
+        assert other.get_api_key(api_key.key_id).last_used is not None
+        storage.close()
+
+    def test_legacy_json_files_are_migrated(self, temp_dir):
+        """Test users.json and api_keys.json from earlier versions are imported."""
+        storage_dir = temp_dir / "auth"
+        storage_dir.mkdir()
+        (storage_dir / "users.json").write_text(
+            json.dumps(
+                {
+                    "alice": {
+                        "user_id": "u1",
+                        "username": "alice",
+                        "password_hash": "hashed_pw",
+                        "scopes": ["admin"],
+                        "is_active": True,
+                        "created_at": "2025-01-01T00:00:00",
+                    }
+                }
+            )
+        )
+        (storage_dir / "api_keys.json").write_text(
+            json.dumps(
+                {
+                    "k1": {
+                        "key_id": "k1",
+                        "key_hash": "abc",
+                        "name": "legacy",
+                        "scopes": ["read"],
+                        "created_at": "2025-01-01T00:00:00",
+                        "last_used": None,
+                        "expires_at": None,
+                        "is_active": True,
+                    }
+                }
+            )
+        )
+
+        storage = AuthStorage(str(storage_dir))
+
+        assert storage.get_user("alice").scopes == ["admin"]
+        assert storage.get_api_key_by_hash("abc").name == "legacy"
+        assert (storage_dir / "users.json.migrated").exists()
+        assert not (storage_dir / "api_keys.json").exists()
+
 
 class TestJWT:
     """Tests for JWT token functions."""
@@ -583,6 +659,172 @@ class TestRateLimiter:
         limiter.cleanup_old_buckets(max_age_seconds=3600)
         assert "old_client" not in limiter.buckets
 
+    def test_cleanup_covers_heavy_and_hourly_buckets(self):
+        """Test cleanup prunes every bucket kind, not only per-minute buckets."""
+        limiter = RateLimiter()
+        limiter.check_rate_limit("old_client", heavy=True)
+        limiter.heavy_buckets["old_client"].last_refill = time.time() - 7200
+        limiter.hourly_buckets["old_client"].last_refill = time.time() - 7200
+
+        assert limiter.cleanup_old_buckets(max_age_seconds=3600) == 2
+        assert "old_client" not in limiter.heavy_buckets
+        assert "old_client" not in limiter.hourly_buckets
+
+    def test_hourly_limit_enforced(self):
+        """Test requests_per_hour applies on top of the per-minute limit."""
+        config = RateLimitConfig(requests_per_minute=100, requests_per_hour=2)
+        limiter = RateLimiter(default_config=config)
+
+        assert limiter.check_rate_limit("client1")[0] is True
+        assert limiter.check_rate_limit("client1", heavy=True)[0] is True
+        allowed, retry_after = limiter.check_rate_limit("client1")
+
+        assert allowed is False
+        assert retry_after == pytest.approx(1800, rel=0.01)
+        assert limiter.get_remaining("client1")["hourly_remaining"] == 0
+
+    def test_acquire_reports_remaining_of_the_buckets_drawn_from(self):
+        """Test acquire returns the header values without a second lookup."""
+        config = RateLimitConfig(
+            requests_per_minute=10, requests_per_hour=100, heavy_requests_per_minute=4
+        )
+        limiter = RateLimiter(default_config=config)
+
+        allowed, retry_after, remaining = limiter.acquire("client1", cost=2)
+        assert (allowed, retry_after) == (True, None)
+        assert remaining["remaining"] == config.bucket_capacity - 2
+        assert remaining["limit"] == 10
+        assert remaining["hourly_remaining"] == 98
+
+        _, _, heavy = limiter.acquire("client1", cost=1, heavy=True)
+        assert heavy["limit"] == 4
+        assert heavy["remaining"] == 5
+        assert heavy["hourly_remaining"] == 97
+
+    def test_denied_request_consumes_nothing(self):
+        """Test a request rejected by one bucket leaves the others untouched."""
+        config = RateLimitConfig(requests_per_minute=100, requests_per_hour=3)
+        limiter = RateLimiter(default_config=config)
+
+        assert limiter.check_rate_limit("client1", cost=5)[0] is False
+        assert limiter.get_remaining("client1")["remaining"] == config.bucket_capacity
+
+
+class TestRateLimitBackends:
+    """Tests for rate limit storage backends."""
+
+    def test_memory_backend_is_bounded(self):
+        """Test the least recently used client is evicted past max_clients."""
+        limiter = RateLimiter(backend=MemoryRateLimitBackend(max_clients=2))
+        for client_id in ["a", "b", "a", "c"]:
+            limiter.check_rate_limit(client_id)
+
+        assert list(limiter.buckets) == ["a", "c"]
+        assert list(limiter.hourly_buckets) == ["a", "c"]
+
+    def test_memory_backend_sweeps_periodically(self):
+        """Test idle buckets are swept as requests arrive."""
+        backend = MemoryRateLimitBackend(max_idle_seconds=60, sweep_interval_seconds=0)
+        limiter = RateLimiter(backend=backend)
+        limiter.check_rate_limit("idle", heavy=True)
+        limiter.heavy_buckets["idle"].last_refill = time.time() - 120
+        limiter.hourly_buckets["idle"].last_refill = time.time() - 120
+
+        limiter.check_rate_limit("active")
+
+        assert "idle" not in limiter.heavy_buckets
+        assert "idle" not in limiter.hourly_buckets
+        assert "active" in limiter.buckets
+
+    def test_sqlite_backend_shares_limits_across_instances(self, temp_dir):
+        """Test two workers on one database enforce a single limit."""
+        path = str(temp_dir / "rate_limits.sqlite3")
+        config = RateLimitConfig(requests_per_minute=2, burst_multiplier=1.0)
+        first = RateLimiter(config, backend=SQLiteRateLimitBackend(path))
+        second = RateLimiter(config, backend=SQLiteRateLimitBackend(path))
+
+        assert first.check_rate_limit("client1")[0] is True
+        assert second.check_rate_limit("client1")[0] is True
+        allowed, retry_after = first.check_rate_limit("client1")
+
+        assert allowed is False
+        assert retry_after > 0
+        assert second.get_remaining("client1")["remaining"] == 0
+        first.close()
+        second.close()
+
+    def test_sqlite_backend_reset_and_sweep(self, temp_dir):
+        """Test a new client config resets shared buckets and idle rows are swept."""
+        backend = SQLiteRateLimitBackend(str(temp_dir / "rate_limits.sqlite3"))
+        config = RateLimitConfig(requests_per_minute=1, burst_multiplier=1.0)
+        limiter = RateLimiter(config, backend=backend)
+
+        limiter.check_rate_limit("client1")
+        assert limiter.check_rate_limit("client1")[0] is False
+        limiter.set_client_config("client1", config)
+        assert limiter.check_rate_limit("client1")[0] is True
+
+        assert limiter.cleanup_old_buckets(max_age_seconds=3600) == 0
+        assert limiter.cleanup_old_buckets(max_age_seconds=-1) == 2
+        backend.close()
+
+    def test_sqlite_backend_reopens_after_close(self, temp_dir):
+        """Test the backend reconnects when used after close()."""
+        backend = SQLiteRateLimitBackend(str(temp_dir / "rate_limits.sqlite3"))
+        backend.close()
+
+        assert RateLimiter(backend=backend).check_rate_limit("client1")[0] is True
+        backend.close()
+
+    def test_sqlite_backend_runs_off_the_event_loop(self, temp_dir):
+        """Test async callers run blocking backends in a worker thread."""
+        import asyncio
+        import threading
+
+        backend = SQLiteRateLimitBackend(str(temp_dir / "rate_limits.sqlite3"))
+        limiter = RateLimiter(backend=backend)
+        loop_thread = threading.get_ident()
+        threads = []
+        acquire = limiter.acquire
+
+        def record(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return acquire(*args, **kwargs)
+
+        with patch.object(limiter, "acquire", side_effect=record):
+            allowed, _, remaining = asyncio.run(limiter.acquire_async("client1"))
+
+        assert allowed is True
+        assert remaining["remaining"] == limiter.default_config.bucket_capacity - 1
+        assert threads and threads[0] != loop_thread
+        backend.close()
+
+    def test_bucket_maps_require_the_memory_backend(self, temp_dir):
+        """Test in-process bucket maps fail clearly on a shared backend."""
+        backend = SQLiteRateLimitBackend(str(temp_dir / "rate_limits.sqlite3"))
+        limiter = RateLimiter(backend=backend)
+
+        for name in ["buckets", "hourly_buckets", "heavy_buckets"]:
+            with pytest.raises(AttributeError, match="SQLiteRateLimitBackend"):
+                getattr(limiter, name)
+        backend.close()
+
+    def test_create_backend(self, temp_dir):
+        """Test backends are selected by name or environment."""
+        assert isinstance(create_backend("memory"), MemoryRateLimitBackend)
+        with patch.dict(
+            os.environ,
+            {
+                "R_API_RATE_LIMIT_BACKEND": "sqlite",
+                "R_API_RATE_LIMIT_DB": str(temp_dir / "shared.sqlite3"),
+            },
+        ):
+            backend = create_backend()
+        assert isinstance(backend, SQLiteRateLimitBackend)
+        backend.close()
+        with pytest.raises(ValueError):
+            create_backend("redis")
+
 
 class TestRateLimitTiers:
     """Tests for rate limit tier configurations."""
@@ -751,6 +993,353 @@ class TestAuditSeverity:
         assert AuditSeverity.CRITICAL.value == "critical"
 
 
+# ============================================================================
+# Session Pool Tests
+# ============================================================================
+
+
+class TestAgentSessionPool:
+    """Tests for the per-session agent pool."""
+
+    @pytest.fixture
+    def base_agent(self):
+        base = Mock()
+        base.spawn_session.side_effect = lambda memory_namespace=None: Mock(
+            namespace=memory_namespace
+        )
+        return base
+
+    def test_sessions_get_separate_agents(self, base_agent):
+        """Test each session id gets its own agent and namespace."""
+        pool = AgentSessionPool(base_agent)
+
+        first = pool.acquire("a")
+        second = pool.acquire("b")
+
+        assert first.agent is not second.agent
+        assert pool.acquire("a").agent is first.agent
+        assert first.agent.namespace == session_namespace("a")
+        assert len(pool) == 2
+
+    def test_namespace_is_path_safe(self):
+        """Test client ids never reach the filesystem verbatim."""
+        namespace = session_namespace("../../etc/passwd")
+        assert "/" not in namespace
+        assert namespace.startswith("api-")
+
+    def test_lru_eviction(self, base_agent):
+        """Test least recently used sessions are evicted first."""
+        pool = AgentSessionPool(base_agent, max_sessions=2)
+        pool.acquire("a")
+        pool.acquire("b")
+        pool.acquire("a")
+        pool.acquire("c")
+
+        assert "a" in pool
+        assert "b" not in pool
+        assert "c" in pool
+
+    def test_idle_ttl_eviction(self, base_agent):
+        """Test idle sessions expire."""
+        pool = AgentSessionPool(base_agent, idle_ttl_seconds=60)
+        stale = pool.acquire("a")
+        pool.acquire("b")
+        stale.last_used -= 120
+
+        assert pool.evict_idle() == 1
+        assert "a" not in pool
+        assert "b" in pool
+
+    def test_busy_session_is_not_evicted(self, base_agent):
+        """Test a session in use survives eviction."""
+        pool = AgentSessionPool(base_agent, max_sessions=1)
+
+        with pool.session("a"):
+            pool.acquire("b")
+            assert "a" in pool
+
+        assert pool.stats()["busy"] == 0
+
+    def test_pinned_session_survives_eviction_before_locking(self, base_agent):
+        """Test a session handed to a request cannot be evicted before it is locked."""
+        pool = AgentSessionPool(base_agent, max_sessions=1)
+
+        pinned = pool.acquire("a", pin=True)
+        pool.acquire("b")
+        assert "a" in pool
+        assert pool.acquire("a") is pinned
+
+        pool.release(pinned)
+        pool.acquire("c")
+        assert "a" not in pool
+
+
+class TestLLMHealthMonitor:
+    """Tests for the background LLM health monitor."""
+
+    def test_snapshot_records_success_and_failure(self):
+        """Test probes update the cached state without blocking callers."""
+        import asyncio
+
+        from r_cli.api.health import LLMHealthMonitor
+
+        calls = []
+
+        def probe(timeout):
+            calls.append(timeout)
+            if len(calls) > 1:
+                raise ConnectionError("connection refused")
+
+        monitor = LLMHealthMonitor(probe, timeout_seconds=3.0, fresh_timeout_seconds=0.5)
+        assert monitor.snapshot().connected is None
+
+        healthy = asyncio.run(monitor._probe(monitor.timeout_seconds))
+        failed = asyncio.run(monitor.refresh())
+
+        assert healthy.connected is True
+        assert healthy.latency_ms is not None
+        assert failed.connected is False
+        assert failed.error == "connection refused"
+        assert failed.consecutive_failures == 1
+        assert monitor.snapshot() is failed
+        assert calls == [3.0, 0.5]
+
+    def test_concurrent_refreshes_share_one_probe(self):
+        """Test a burst of ?fresh=true requests triggers a single probe."""
+        import asyncio
+        import threading
+
+        from r_cli.api.health import LLMHealthMonitor
+
+        calls = []
+        release = threading.Event()
+
+        def probe(timeout):
+            calls.append(timeout)
+            release.wait(1)
+
+        monitor = LLMHealthMonitor(probe)
+
+        async def scenario():
+            waiters = [asyncio.ensure_future(monitor.refresh()) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*waiters)
+
+        results = asyncio.run(scenario())
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+
+    def test_backoff_grows_with_failures_and_is_capped(self):
+        """Test failing probes back off exponentially with jitter."""
+        from r_cli.api.health import JITTER, HealthSnapshot, LLMHealthMonitor
+
+        monitor = LLMHealthMonitor(
+            lambda timeout: None, interval_seconds=10, max_backoff_seconds=60
+        )
+
+        assert 10 * (1 - JITTER) <= monitor.next_delay() <= 10 * (1 + JITTER)
+        monitor._snapshot = HealthSnapshot(connected=False, consecutive_failures=1)
+        assert 20 * (1 - JITTER) <= monitor.next_delay() <= 20 * (1 + JITTER)
+        monitor._snapshot = HealthSnapshot(connected=False, consecutive_failures=10)
+        assert monitor.next_delay() <= 60 * (1 + JITTER)
+
+
+class TestSnapshotCache:
+    """Tests for the versioned snapshot cache behind the Control Center."""
+
+    def test_rebuilds_only_when_version_changes(self):
+        """Test snapshots are reused until the version token moves."""
+        from r_cli.api.snapshots import SnapshotCache
+
+        version = [1]
+        builds = []
+        cache = SnapshotCache(ttl_seconds=0)
+
+        def build():
+            builds.append(version[0])
+            return {"version": version[0]}
+
+        first = cache.get("overview", lambda: version[0], build)
+        second = cache.get("overview", lambda: version[0], build)
+        version[0] = 2
+        third = cache.get("overview", lambda: version[0], build)
+
+        assert second is first
+        assert third.payload == {"version": 2}
+        assert third.etag != first.etag
+        assert builds == [1, 2]
+
+    def test_ttl_skips_version_reads(self):
+        """Test a fresh snapshot is served without reading the version."""
+        from r_cli.api.snapshots import SnapshotCache
+
+        now = [100.0]
+        reads = []
+        cache = SnapshotCache(ttl_seconds=2, clock=lambda: now[0])
+
+        def version():
+            reads.append(now[0])
+            return 7
+
+        cache.get("overview", version, dict)
+        now[0] += 1
+        cache.get("overview", version, dict)
+        now[0] += 2
+        cache.get("overview", version, dict)
+
+        assert reads == [100.0, 103.0]
+        assert cache.rebuilds == 1
+        assert cache.hits == 2
+
+    def test_keys_are_bounded(self):
+        """Test least recently used keys are dropped."""
+        from r_cli.api.snapshots import SnapshotCache
+
+        cache = SnapshotCache(ttl_seconds=0, max_entries=2)
+        for key in ["a", "b", "a", "c"]:
+            cache.get(key, lambda: 1, dict)
+
+        assert list(cache._entries) == ["a", "c"]
+
+    def test_etag_matching(self):
+        """Test If-None-Match uses weak comparison and accepts lists."""
+        from r_cli.api.snapshots import etag_matches, make_etag
+
+        etag = make_etag("overview", 3)
+
+        assert etag.startswith('W/"')
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", {etag.removeprefix("W/")}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches(None, etag)
+        assert not etag_matches(make_etag("overview", 4), etag)
+
+
+class TestChatStreaming:
+    """Tests for SSE frame rendering and the token stream bridge."""
+
+    @staticmethod
+    def collect(stream):
+        import asyncio
+        from contextlib import aclosing
+
+        async def run():
+            async with aclosing(stream.chunks()) as chunks:
+                return [chunk async for chunk in chunks]
+
+        return asyncio.run(run())
+
+    def test_frames_match_pydantic_chunks(self):
+        """Test templated frames serialize exactly like ChatStreamResponse."""
+        from r_cli.api.models import ChatStreamChoice, ChatStreamDelta, ChatStreamResponse
+        from r_cli.api.streaming import ChatStreamFrames
+
+        frames = ChatStreamFrames("chatcmpl-abc", 1700000000, 'qwen "local"')
+
+        def expected(delta, finish_reason=None):
+            chunk = ChatStreamResponse(
+                id="chatcmpl-abc",
+                created=1700000000,
+                model='qwen "local"',
+                choices=[ChatStreamChoice(delta=delta, finish_reason=finish_reason)],
+            )
+            return f"data: {chunk.model_dump_json()}\n\n"
+
+        assert frames.role() == expected(ChatStreamDelta(role="assistant"))
+        for text in ["Hola", 'línea\n\t"quoted"', "\\ 🚀 </script>"]:
+            assert frames.content(text) == expected(ChatStreamDelta(content=text))
+        assert frames.finish() == expected(ChatStreamDelta(), "stop")
+
+    def test_streams_all_tokens_in_order(self):
+        """Test every token arrives once and in order."""
+        from r_cli.api.streaming import TokenStream
+
+        tokens = [f"t{i} " for i in range(200)]
+        stream = TokenStream(lambda: iter(tokens), max_buffered=4)
+
+        chunks = self.collect(stream)
+
+        assert "".join(chunks) == "".join(tokens)
+        assert stream.tokens_received == 200
+        assert stream.frames_sent == len(chunks)
+
+    def test_coalesces_tokens_into_frames(self):
+        """Test a coalescing window merges tokens into fewer frames."""
+        from r_cli.api.streaming import TokenStream
+
+        tokens = ["x"] * 100
+        stream = TokenStream(lambda: iter(tokens), coalesce_seconds=0.01, max_frame_chars=40)
+
+        chunks = self.collect(stream)
+
+        assert "".join(chunks) == "x" * 100
+        assert len(chunks) < 100
+        assert all(len(chunk) <= 40 for chunk in chunks)
+
+    def test_slow_consumer_pauses_producer(self):
+        """Test a bounded queue keeps the producer just ahead of the client."""
+        import asyncio
+        from contextlib import aclosing
+
+        from r_cli.api.streaming import TokenStream
+
+        produced = []
+
+        def generate():
+            for i in range(1000):
+                produced.append(i)
+                yield "x"
+
+        async def read_one():
+            stream = TokenStream(generate, max_buffered=4)
+            async with aclosing(stream.chunks()) as chunks:
+                await anext(chunks)
+                await asyncio.sleep(0.1)
+                return len(produced)
+
+        assert asyncio.run(read_one()) <= 8
+        time.sleep(0.5)
+        assert len(produced) <= 8
+
+    def test_disconnect_stops_generation(self):
+        """Test a disconnected client ends the stream and closes the generator."""
+        import threading
+
+        from r_cli.api.streaming import TokenStream
+
+        closed = threading.Event()
+
+        def generate():
+            try:
+                yield "first"
+                time.sleep(0.5)
+                yield "never sent"
+            finally:
+                closed.set()
+
+        async def is_disconnected():
+            return True
+
+        stream = TokenStream(generate, is_disconnected=is_disconnected, poll_seconds=0.05)
+
+        assert self.collect(stream) == ["first"]
+        assert stream.disconnected is True
+        assert closed.wait(2)
+
+    def test_producer_errors_propagate(self):
+        """Test generation errors surface in the stream after earlier tokens."""
+        from r_cli.api.streaming import TokenStream
+
+        def generate():
+            yield "partial"
+            raise RuntimeError("LLM went away")
+
+        with pytest.raises(RuntimeError, match="LLM went away"):
+            self.collect(TokenStream(generate))
+
+
 # ============================================================================
 # API Endpoint Tests
 # ============================================================================
@@ -778,6 +1367,17 @@ class TestAPIEndpoints:
         data = response.json()
         assert data["status"] == "ok"
 
+    def test_health_endpoint_ignores_fresh(self, client):
+        """Test the unauthenticated health check never triggers an LLM probe."""
+        with (
+            patch("r_cli.api.health.LLMHealthMonitor.refresh") as refresh,
+            client,
+        ):
+            response = client.get("/health?fresh=true")
+
+        assert response.status_code == 200
+        refresh.assert_not_called()
+
     def test_root_endpoint(self, client):
         """Test root endpoint."""
         response = client.get("/")
@@ -819,6 +1419,56 @@ class TestAPIEndpoints:
             assert "memory" in data
             assert "security" in data
 
+    def test_control_center_revalidates_with_etag(self, client):
+        """Test unchanged control center overviews return 304."""
+        with (
+            patch("r_cli.core.llm.LLMClient.ping", side_effect=ConnectionError("offline")),
+            client,
+        ):
+            # Wait for the first health probe so the snapshot key is stable
+            deadline = time.time() + 5
+            while client.get("/health").json()["llm"]["checked_at"] is None:
+                assert time.time() < deadline
+                time.sleep(0.01)
+
+            response = client.get("/v1/control-center")
+            assert response.status_code == 200
+            etag = response.headers["ETag"]
+
+            cached = client.get("/v1/control-center", headers={"If-None-Match": etag})
+
+        assert cached.status_code == 304
+        assert cached.headers["ETag"] == etag
+        assert cached.content == b""
+
+    def test_control_center_etag_ignores_probe_time(self, client):
+        """Test a new probe with the same LLM state keeps the overview's ETag."""
+        from dataclasses import replace
+
+        from r_cli.api.server import get_health_monitor
+
+        with (
+            patch("r_cli.core.llm.LLMClient.ping", side_effect=ConnectionError("offline")),
+            client,
+        ):
+            deadline = time.time() + 5
+            while client.get("/health").json()["llm"]["checked_at"] is None:
+                assert time.time() < deadline
+                time.sleep(0.01)
+
+            first = client.get("/v1/control-center")
+            monitor = get_health_monitor()
+            monitor._snapshot = replace(
+                monitor._snapshot,
+                latency_ms=12.5,
+                checked_at=monitor._snapshot.checked_at + timedelta(seconds=30),
+            )
+            second = client.get("/v1/control-center")
+
+        assert first.status_code == second.status_code == 200
+        assert second.headers["ETag"] == first.headers["ETag"]
+        assert second.json()["status"]["llm"]["checked_at"] is None
+
     def test_rate_limit_headers(self, client):
         """Test rate limit headers are present."""
         response = client.get("/v1/status")
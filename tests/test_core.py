@@ -40,6 +40,7 @@ from r_cli.core.logging import (
     setup_logging,
     timed,
 )
+from r_cli.core.tool_index import ToolIndex, tokenize
 
 
 class TestLogging:
@@ -374,6 +375,180 @@ class TestLLMClient:
         assert len(mock_llm_client.messages) == 1
         assert mock_llm_client.messages[0].role == "system"
 
+    def test_context_tokens_cached_per_message(self, mock_llm_client: LLMClient) -> None:
+        """Verifica que cada mensaje se tokeniza una sola vez."""
+        mock_llm_client.set_system_prompt("System")
+        mock_llm_client.add_message("user", "Hello there")
+
+        with patch.object(
+            mock_llm_client, "_estimate_tokens", wraps=mock_llm_client._estimate_tokens
+        ) as estimate:
+            first = mock_llm_client._get_context_tokens()
+            second = mock_llm_client._get_context_tokens()
+            assert first == second
+            assert estimate.call_count == 2
+
+            mock_llm_client.add_message("assistant", "Hi")
+            mock_llm_client._get_context_tokens()
+            assert estimate.call_count == 3
+
+    def test_tool_payloads_are_cached_and_stably_ordered(self, mock_llm_client: LLMClient) -> None:
+        """Verifica que las tools se serializan una vez y se envían ordenadas."""
+        tools = [
+            Tool(name=name, description=name, parameters={}, handler=lambda: "")
+            for name in ("zeta", "alpha", "mid")
+        ]
+
+        first = mock_llm_client._tool_payloads(tools)
+        second = mock_llm_client._tool_payloads(list(reversed(tools)))
+
+        assert [p["function"]["name"] for p in first] == ["alpha", "mid", "zeta"]
+        assert all(a is b for a, b in zip(first, second))
+
+        mock_llm_client.llm_config.stable_tool_order = False
+        unsorted = mock_llm_client._tool_payloads(tools)
+        assert [p["function"]["name"] for p in unsorted] == ["zeta", "alpha", "mid"]
+
+    def test_truncate_context_single_pass(self, mock_llm_client: LLMClient) -> None:
+        """Verifica que el truncado elimina los mensajes más antiguos y conserva el system."""
+        mock_llm_client.llm_config.max_context_tokens = 50
+        mock_llm_client._estimate_tokens = lambda text: 10  # type: ignore[method-assign]
+        mock_llm_client.set_system_prompt("System")
+        for i in range(10):
+            mock_llm_client.add_message("user", f"message {i}")
+
+        mock_llm_client._truncate_context_if_needed()
+
+        assert mock_llm_client.messages[0].role == "system"
+        assert mock_llm_client._get_context_tokens() <= 50
+        assert [m.content for m in mock_llm_client.messages[1:]] == [
+            f"message {i}" for i in range(6, 10)
+        ]
+
+    def test_execute_tools_runs_calls_concurrently_in_order(
+        self, mock_llm_client: LLMClient
+    ) -> None:
+        """Verifica que las tools de un turno se ejecutan en paralelo y en orden."""
+        import threading
+
+        barrier = threading.Barrier(3, timeout=5)
+
+        def slow(value: str) -> str:
+            barrier.wait()
+            return value
+
+        tools = [Tool(name="slow", description="", parameters={}, handler=slow)]
+        calls = [ToolCall(id=str(i), name="slow", arguments={"value": f"r{i}"}) for i in range(3)]
+
+        results = mock_llm_client.execute_tools(calls, tools)
+
+        assert [m.content for m in results] == ["r0", "r1", "r2"]
+        assert [m.tool_call_id for m in mock_llm_client.messages] == ["0", "1", "2"]
+
+    def test_execute_tools_keeps_approval_calls_on_caller_thread(
+        self, mock_llm_client: LLMClient
+    ) -> None:
+        """Verifica que las tools que piden aprobación no salen del hilo llamante."""
+        import threading
+
+        caller = threading.get_ident()
+        seen: dict[str, int] = {}
+
+        def record(name: str) -> str:
+            seen[name] = threading.get_ident()
+            return name
+
+        def prompting(**kwargs: str) -> str:
+            return record(**kwargs)
+
+        prompting.needs_approval = lambda arguments: True  # type: ignore[attr-defined]
+        tools = [
+            Tool(name="free", description="", parameters={}, handler=record),
+            Tool(name="prompt", description="", parameters={}, handler=prompting),
+        ]
+        calls = [
+            ToolCall(id="1", name="free", arguments={"name": "a"}),
+            ToolCall(id="2", name="prompt", arguments={"name": "b"}),
+            ToolCall(id="3", name="free", arguments={"name": "c"}),
+        ]
+
+        results = mock_llm_client.execute_tools(calls, tools)
+
+        assert [m.content for m in results] == ["a", "b", "c"]
+        assert seen["b"] == caller
+
+    def test_execute_tools_unknown_tool(self, mock_llm_client: LLMClient) -> None:
+        """Verifica el resultado para una tool inexistente."""
+        results = mock_llm_client.execute_tools([ToolCall(id="1", name="x", arguments={})], [])
+        assert results[0].content == "Tool no encontrada: x"
+
+    def test_async_tool_calls_do_not_block_event_loop(self, mock_llm_client: LLMClient) -> None:
+        """Verifica que las tools síncronas se ejecutan fuera del event loop."""
+        import asyncio
+
+        def slow() -> str:
+            time.sleep(0.2)
+            return "slow"
+
+        async def fast() -> str:
+            return "fast"
+
+        tools = [
+            Tool(name="slow", description="", parameters={}, handler=slow),
+            Tool(
+                name="fast",
+                description="",
+                parameters={},
+                handler=lambda: "sync",
+                async_handler=fast,
+            ),
+        ]
+        calls = [ToolCall(id="1", name="slow", arguments={}), ToolCall("2", "fast", {})]
+
+        async def scenario() -> tuple[list[str], int]:
+            ticks = 0
+
+            async def ticker() -> None:
+                nonlocal ticks
+                for _ in range(5):
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            results, _ = await asyncio.gather(
+                mock_llm_client._run_tool_calls_async(calls, tools), ticker()
+            )
+            return results, ticks
+
+        results, ticks = asyncio.run(scenario())
+
+        assert results == ["slow", "fast"]
+        assert ticks == 5
+
+    def test_async_tool_calls_respect_timeout(self, mock_llm_client: LLMClient) -> None:
+        """Verifica que una tool lenta se corta con su timeout."""
+        import asyncio
+
+        async def hang() -> str:
+            await asyncio.sleep(5)
+            return "never"
+
+        tools = [
+            Tool(
+                name="hang",
+                description="",
+                parameters={},
+                handler=lambda: "sync",
+                async_handler=hang,
+                timeout=0.05,
+            )
+        ]
+
+        results = asyncio.run(
+            mock_llm_client._run_tool_calls_async([ToolCall("1", "hang", {})], tools)
+        )
+
+        assert results == ["Error ejecutando hang: tiempo de espera agotado (0.05s)"]
+
 
 class TestMessage:
     """Tests para Message."""
@@ -402,6 +577,33 @@ class TestMessage:
         assert d["tool_call_id"] == "1"
         assert d["name"] == "test_tool"
 
+    def test_message_to_dict_is_memoized_until_changed(self) -> None:
+        """Verifica que el payload se reutiliza mientras el mensaje no cambia."""
+        msg = Message(role="assistant", content="Hi")
+        first = msg.to_dict()
+        assert msg.to_dict() is first
+
+        msg.tool_calls.append(ToolCall(id="1", name="test", arguments={}))
+        second = msg.to_dict()
+        assert second is not first
+        assert "tool_calls" in second
+
+        msg.content = "Changed"
+        assert msg.to_dict()["content"] == "Changed"
+
+    def test_tool_call_arguments_are_sent_back_verbatim(self) -> None:
+        """Verifica que los argumentos del modelo se reenvían sin reserializar."""
+        raw = '{"b":2,  "a":1}'
+        call = ToolCall.from_raw("1", "test", raw)
+        assert call.arguments == {"b": 2, "a": 1}
+
+        msg = Message(role="assistant", tool_calls=[call])
+        assert msg.to_dict()["tool_calls"][0]["function"]["arguments"] == raw
+
+        broken = ToolCall.from_raw("2", "test", "{not json")
+        assert broken.arguments == {}
+        assert broken.raw_arguments is None
+
 
 class TestTool:
     """Tests para Tool."""
@@ -429,3 +631,116 @@ class TestTool:
         )
         result = tool.handler(2, 3)
         assert result == "5"
+
+
+def _tool(name: str, description: str) -> Tool:
+    return Tool(
+        name=name,
+        description=description,
+        parameters={"type": "object", "properties": {"text": {"type": "string"}}},
+        handler=lambda **kwargs: name,
+    )
+
+
+class TestToolIndex:
+    """Tests para la selección de herramientas por consulta."""
+
+    TOOLS = [
+        _tool("get_current_time", "Get the current date and time"),
+        _tool("calculate", "Evaluate a mathematical expression"),
+        _tool("hash_text", "Hash text with md5 or sha256"),
+        _tool("create_pdf", "Create a PDF document"),
+        _tool("list_directory", "List files in a directory"),
+    ]
+    SKILLS = {
+        "get_current_time": "datetime",
+        "calculate": "math",
+        "hash_text": "crypto",
+        "create_pdf": "pdf",
+        "list_directory": "fs",
+    }
+
+    def _index(self, **kwargs) -> ToolIndex:
+        index = ToolIndex(mode="lexical", **kwargs)
+        index.ensure(self.TOOLS, self.SKILLS, {}, 1)
+        return index
+
+    def test_tokenize_drops_stopwords_and_plurals(self) -> None:
+        assert tokenize("What is the hash of these files?") == ["hash", "these", "file"]
+
+    def test_ranks_matching_tool_first(self) -> None:
+        index = self._index()
+
+        assert index.search("Hash this text with MD5", k=2)[0][0].name == "hash_text"
+        assert index.search("make a pdf report", k=1)[0][0].name == "create_pdf"
+        assert index.backend == "lexical"
+
+    def test_skill_keywords_reach_tools(self) -> None:
+        index = self._index()
+
+        assert index.search("what's the hour", k=1)[0][0].name == "get_current_time"
+
+    def test_unmatched_query_falls_back_to_core_skills(self) -> None:
+        index = self._index()
+
+        selected = index.select("zzz qqq", max_tools=10)
+
+        assert [tool.name for tool in selected] == [
+            "get_current_time",
+            "calculate",
+            "list_directory",
+        ]
+
+    def test_rebuilds_when_tools_change(self) -> None:
+        tools = list(self.TOOLS)
+        index = ToolIndex(mode="lexical")
+        index.ensure(tools, self.SKILLS, {}, 1)
+        assert not index.search("translate to spanish", k=5)
+
+        tools.append(_tool("translate_text", "Translate text between languages"))
+        index.ensure(tools, {**self.SKILLS, "translate_text": "translate"}, {}, 2)
+
+        assert index.search("translate to spanish", k=1)[0][0].name == "translate_text"
+
+    def test_rebuilds_in_place_replacement_on_new_generation(self) -> None:
+        tools = list(self.TOOLS)
+        skills = {**self.SKILLS, "translate_text": "translate"}
+        index = ToolIndex(mode="lexical")
+        index.ensure(tools, skills, {}, 1)
+
+        tools[0] = _tool("translate_text", "Translate text between languages")
+        index.ensure(tools, skills, {}, 1)
+        assert not index.search("translate to spanish", k=5)
+
+        index.ensure(tools, skills, {}, 2)
+        assert index.search("translate to spanish", k=1)[0][0].name == "translate_text"
+
+    def test_hybrid_blends_embeddings_with_lexical_scores(self) -> None:
+        import numpy as np
+
+        embeddings = MagicMock()
+        documents_seen = []
+
+        def embed_batch(documents):
+            documents_seen.extend(documents)
+            return [np.eye(len(documents))[i].tolist() for i in range(len(documents))]
+
+        embeddings.embed_batch.side_effect = embed_batch
+        # The query is closest to create_pdf even without shared keywords
+        embeddings.embed.return_value = np.eye(len(self.TOOLS))[3].tolist()
+        index = self._index(embeddings=embeddings)
+
+        results = index.search("write up my findings", k=2)
+
+        assert index.backend == "hybrid"
+        assert results[0][0].name == "create_pdf"
+        assert "create pdf" in documents_seen[3]
+
+    def test_embedding_failure_falls_back_to_lexical(self) -> None:
+        embeddings = MagicMock()
+        embeddings.embed_batch.side_effect = RuntimeError("model not downloaded")
+
+        index = self._index(embeddings=embeddings)
+
+        assert index.backend == "lexical"
+        assert index.search("calculate 2+2", k=1)[0][0].name == "calculate"
@@ -0,0 +1,354 @@
+"""Tests for local embeddings: cache, shared service, vector store and semantic index."""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from r_cli.core import embedding_service
+from r_cli.core.ann import ANNSearcher, IVFBackend, create_backend, exact_search, top_k
+from r_cli.core.embedding_cache import EmbeddingCache
+from r_cli.core.embedding_service import (
+    EmbeddingService,
+    embedding_service_stats,
+    get_embedding_service,
+)
+from r_cli.core.embeddings import EMBEDDING_MODELS, LocalEmbeddings, SemanticIndex
+from r_cli.core.vector_store import VectorStore
+
+
+class FakeEmbeddings:
+    """Deterministic bag-of-letters embeddings (no model download)."""
+
+    model_config = EMBEDDING_MODELS["mini"]
+    dimension = 26
+
+    def embed(self, text: str) -> list[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for char in text.lower():
+            if "a" <= char <= "z":
+                vector[ord(char) - ord("a")] += 1
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_batch(self, texts: list[str], batch_size: int = 32) -> list[list[float]]:
+        return [self.embed(text) for text in texts]
+
+
+@pytest.fixture
+def index(tmp_path: Path) -> SemanticIndex:
+    return SemanticIndex(FakeEmbeddings(), index_path=tmp_path / "semantic_index.json")
+
+
+class TestVectorStore:
+    def record(self, doc_id: str) -> dict:
+        return {"id": doc_id, "content": doc_id, "metadata": {}, "created_at": "now"}
+
+    def test_append_is_persisted_and_memory_mapped(self, tmp_path: Path):
+        store = VectorStore(tmp_path / "store")
+        store.append([self.record("a"), self.record("b")], np.eye(2, 4))
+        store.close()
+
+        reopened = VectorStore(tmp_path / "store")
+        assert len(reopened) == 2
+        assert isinstance(reopened.matrix(), np.memmap)
+        np.testing.assert_array_equal(reopened.matrix(), np.eye(2, 4, dtype=np.float32))
+        assert [doc["id"] for doc in reopened.get([1, 0])] == ["b", "a"]
+
+    def test_float16_storage(self, tmp_path: Path):
+        store = VectorStore(tmp_path / "store", dtype="float16")
+        store.append([self.record("a")], [[0.5, 0.25]])
+
+        assert store.matrix().dtype == np.float16
+        assert (tmp_path / "store" / "vectors.0.bin").stat().st_size == 4
+
+    def test_dimension_mismatch_is_rejected(self, tmp_path: Path):
+        store = VectorStore(tmp_path / "store")
+        store.append([self.record("a")], [[1.0, 0.0]])
+
+        with pytest.raises(ValueError, match="dimension"):
+            store.append([self.record("b")], [[1.0, 0.0, 0.0]])
+
+    def test_uncommitted_vectors_are_discarded_on_open(self, tmp_path: Path):
+        store = VectorStore(tmp_path / "store")
+        store.append([self.record("a")], [[1.0, 0.0]])
+        with open(store.segment_path, "ab") as handle:
+            handle.write(np.ones(2, dtype=np.float32).tobytes())
+        store.close()
+
+        reopened = VectorStore(tmp_path / "store")
+        assert reopened.rows == 1
+        assert reopened.segment_path.stat().st_size == 8
+
+    def test_delete_tombstones_then_compacts(self, tmp_path: Path):
+        store = VectorStore(tmp_path / "store", compact_ratio=0.5)
+        store.append([self.record(name) for name in "abcd"], np.eye(4))
+
+        assert store.delete("a") is True
+        assert store.rows == 4
+        assert not store.alive[0]
+
+        assert store.delete("c") is True
+        assert store.rows == 2
+        assert [doc["id"] for doc in store.get([0, 1])] == ["b", "d"]
+        np.testing.assert_array_equal(store.matrix(), np.eye(4, dtype=np.float32)[[1, 3]])
+        assert list((tmp_path / "store").glob("vectors.*.bin")) == [store.segment_path]
+        assert store.delete("missing") is False
+
+
+class TestSemanticIndex:
+    def test_add_and_search(self, index: SemanticIndex):
+        index.add("apple banana", doc_id="fruit", metadata={"source": "a.txt"})
+        index.add_batch([{"content": "zebra xylophone", "id": "zoo"}])
+
+        results = index.search("banana apple", top_k=1)
+
+        assert results[0]["id"] == "fruit"
+        assert results[0]["metadata"] == {"source": "a.txt"}
+        assert results[0]["similarity"] == pytest.approx(1.0)
+        assert "embedding" not in results[0]
+
+    def test_deleted_documents_are_not_returned(self, index: SemanticIndex):
+        index.add("apple", doc_id="one")
+        index.add("apple pie", doc_id="two")
+        index.add("zebra", doc_id="three")
+        index.add("zebra zoo", doc_id="four")
+
+        assert index.delete("one") is True
+
+        results = index.search("apple", top_k=4)
+        assert results[0]["id"] == "two"
+        assert "one" not in [doc["id"] for doc in results]
+        assert index.get_stats()["total_documents"] == 3
+
+    def test_legacy_json_index_is_migrated(self, tmp_path: Path):
+        legacy = tmp_path / "semantic_index.json"
+        embeddings = FakeEmbeddings()
+        legacy.write_text(
+            json.dumps(
+                {
+                    "documents": [
+                        {
+                            "id": "old",
+                            "content": "apple",
+                            "embedding": embeddings.embed("apple"),
+                            "metadata": {},
+                            "created_at": "2024-01-01T00:00:00",
+                        }
+                    ]
+                }
+            )
+        )
+
+        index = SemanticIndex(embeddings, index_path=legacy)
+
+        assert len(index) == 1
+        assert index.search("apple")[0]["id"] == "old"
+        assert not legacy.exists()
+        assert (tmp_path / "semantic_index.json.migrated").exists()
+
+    def test_clear(self, index: SemanticIndex):
+        index.add("apple")
+        index.clear()
+
+        assert len(index) == 0
+        assert index.search("apple") == []
+
+
+def clustered_vectors(rows: int, dimension: int = 32, clusters: int = 20) -> np.ndarray:
+    rng = np.random.default_rng(7)
+    centers = rng.normal(size=(clusters, dimension))
+    vectors = centers[rng.integers(clusters, size=rows)] + 0.3 * rng.normal(size=(rows, dimension))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+class TestANN:
+    def test_top_k_matches_full_sort(self):
+        scores = np.random.default_rng(0).random(1000)
+
+        assert top_k(scores, 5).tolist() == np.argsort(scores)[::-1][:5].tolist()
+        assert top_k(scores[:3], 10).tolist() == np.argsort(scores[:3])[::-1].tolist()
+
+    def test_ivf_recall_against_exact(self):
+        vectors = clustered_vectors(5000)
+        backend = IVFBackend(nprobe=8)
+        backend.build(vectors)
+        mask = np.ones(len(vectors), dtype=bool)
+
+        hits = 0
+        for query in vectors[:50]:
+            expected, _ = exact_search(vectors, query, 10)
+            found, scores = backend.search(vectors, query, 10, mask)
+            hits += len(set(expected.tolist()) & set(found.tolist()))
+            np.testing.assert_allclose(scores, vectors[found] @ query, rtol=1e-5)
+
+        assert hits / 500 >= 0.9
+
+    def test_searcher_indexes_appends_and_rebuilds_after_compaction(self, tmp_path: Path):
+        store = VectorStore(tmp_path / "store")
+        vectors = clustered_vectors(300)
+        records = [{"id": str(i), "content": "", "created_at": "now"} for i in range(300)]
+        store.append(records[:200], vectors[:200])
+        searcher = ANNSearcher("ivf", min_rows=0, nprobe=100)
+
+        rows, _ = searcher.search(store, vectors[0], 1, store.alive.copy())
+        assert rows.tolist() == [0]
+        assert searcher.backend == "ivf"
+
+        store.append(records[200:], vectors[200:])
+        rows, _ = searcher.search(store, vectors[250], 1, store.alive.copy())
+        assert rows.tolist() == [250]
+
+        store.delete("0")
+        store.compact()
+        rows, _ = searcher.search(store, vectors[250], 1, store.alive.copy())
+        assert rows.tolist() == [249]
+
+    def test_optional_backend_reports_missing_package(self):
+        try:
+            import hnswlib
+        except ImportError:
+            with pytest.raises(ImportError, match="pip install hnswlib"):
+                create_backend("hnswlib")
+        assert isinstance(create_backend("ivf", nprobe=2, ef_search=10), IVFBackend)
+        with pytest.raises(ValueError):
+            create_backend("annoy")
+
+    def test_search_prefilters_on_metadata(self, index: SemanticIndex):
+        index.add("apple", doc_id="a", metadata={"source": "a.txt"})
+        index.add("apple pie", doc_id="b", metadata={"source": "b.txt"})
+        index.add("apple tart", doc_id="c", metadata={"source": "c.txt"})
+
+        assert [doc["id"] for doc in index.search("apple", where={"source": "b.txt"})] == ["b"]
+        found = index.search("apple", where={"source": ["b.txt", "c.txt"]})
+        assert {doc["id"] for doc in found} == {"b", "c"}
+        assert index.search("apple", where={"source": []}) == []
+        assert index.search("apple", where={"missing": 1}) == []
+
+
+class CountingModel:
+    """Stands in for SentenceTransformer.encode."""
+
+    def __init__(self):
+        self.encoded: list[str] = []
+
+    def encode(self, texts, **kwargs):
+        batch = [texts] if isinstance(texts, str) else list(texts)
+        self.encoded.extend(batch)
+        vectors = np.array([FakeEmbeddings().embed(text) for text in batch], dtype=np.float32)
+        return vectors[0] if isinstance(texts, str) else vectors
+
+
+class TestEmbeddingCache:
+    def test_entries_persist_per_namespace(self, tmp_path: Path):
+        cache = EmbeddingCache(tmp_path, "mini")
+        cache.put_many({"a": [1.0, 0.0], "b": [0.0, 1.0]})
+        cache.close()
+
+        assert EmbeddingCache(tmp_path, "mini").get_many(["a", "b", "c"]) == {
+            "a": [1.0, 0.0],
+            "b": [0.0, 1.0],
+        }
+        assert EmbeddingCache(tmp_path, "mpnet").get("a") is None
+        assert {path.name for path in tmp_path.glob("*.sqlite3")} == {
+            "mini.sqlite3",
+            "mpnet.sqlite3",
+        }
+
+    def test_memory_lru_is_bounded(self, tmp_path: Path):
+        cache = EmbeddingCache(tmp_path, "mini", memory_items=2)
+        cache.put_many({key: [1.0] for key in "abc"})
+
+        assert list(cache._memory) == ["b", "c"]
+        assert cache.get("a") == [1.0]
+        assert list(cache._memory) == ["c", "a"]
+
+    def test_size_eviction_drops_least_recently_used(self, tmp_path: Path):
+        # Each vector is 8 bytes; budget for three
+        cache = EmbeddingCache(tmp_path, "mini", max_bytes=24, memory_items=0)
+        cache.put("old", [1.0, 1.0])
+        cache.put("used", [2.0, 2.0])
+        cache.put("new", [3.0, 3.0])
+        cache.get("old")
+        cache.put("newest", [4.0, 4.0])
+
+        assert cache.size_bytes <= 24
+        assert cache.get("used") is None
+        assert cache.get("old") == [1.0, 1.0]
+        assert cache.get("newest") == [4.0, 4.0]
+
+    def test_legacy_json_cache_is_imported(self, tmp_path: Path):
+        (tmp_path / "cache_mini.json").write_text(json.dumps({"k": [0.5, 0.5]}))
+
+        cache = EmbeddingCache(tmp_path, "mini")
+
+        assert cache.get("k") == [0.5, 0.5]
+        assert (tmp_path / "cache_mini.json.migrated").exists()
+
+    def test_local_embeddings_reuse_cached_vectors(self, tmp_path: Path, monkeypatch):
+        model = CountingModel()
+        service = EmbeddingService(EMBEDDING_MODELS["mini"], model=model)
+        monkeypatch.setattr(embedding_service, "_services", {"mini": service})
+
+        embeddings = LocalEmbeddings(cache_dir=tmp_path)
+        first = embeddings.embed_batch(["apple", "pear", "apple"])
+        assert embeddings.embed("pear") == first[1]
+        assert model.encoded == ["apple", "pear"]
+
+        reopened = LocalEmbeddings(cache_dir=tmp_path)
+        assert reopened.embed_batch(["pear", "apple"]) == [first[1], first[0]]
+        assert model.encoded == ["apple", "pear"]
+        assert reopened.get_model_info()["cache_size"] == 2
+
+
+class TestEmbeddingService:
+    def test_concurrent_calls_share_batches_and_dedupe(self):
+        model = CountingModel()
+        service = EmbeddingService(EMBEDDING_MODELS["mini"], model=model, max_wait_ms=200)
+        texts = ["apple", "pear", "plum", "apple"] * 4
+        barrier = threading.Barrier(len(texts))
+
+        def call(text: str) -> list[float]:
+            barrier.wait()
+            return service.embed(text)
+
+        with ThreadPoolExecutor(max_workers=len(texts)) as pool:
+            results = list(pool.map(call, texts))
+
+        assert results == [FakeEmbeddings().embed(text) for text in texts]
+        stats = service.stats()
+        assert stats["requests"] == len(texts)
+        assert stats["batches"] < len(texts)
+        assert stats["deduplicated"] == len(texts) - stats["encoded"]
+        assert sorted(set(model.encoded)) == ["apple", "pear", "plum"]
+        assert stats["queue_depth"] == 0
+
+    def test_batches_are_capped(self):
+        model = CountingModel()
+        service = EmbeddingService(EMBEDDING_MODELS["mini"], model=model, max_batch_size=2)
+
+        service.embed_many(["a", "b", "c", "d", "e"])
+
+        assert service.stats()["batches"] == 3
+
+    def test_model_errors_reach_every_caller(self):
+        class BrokenModel:
+            def encode(self, texts, **kwargs):
+                raise RuntimeError("model exploded")
+
+        service = EmbeddingService(EMBEDDING_MODELS["mini"], model=BrokenModel())
+
+        with pytest.raises(RuntimeError, match="exploded"):
+            service.embed("apple")
+        assert service.embed_many([]) == []
+
+    def test_one_service_per_model(self, monkeypatch):
+        monkeypatch.setattr(embedding_service, "_services", {})
+
+        assert get_embedding_service("mini") is get_embedding_service("mini")
+        assert get_embedding_service("mpnet") is not get_embedding_service("mini")
+        assert get_embedding_service("unknown") is get_embedding_service("mini")
+        assert {stats["model"] for stats in embedding_service_stats()} == {"mini", "mpnet"}
@@ -87,6 +87,21 @@ class TestSkillLoading:
             tools = skill.get_tools()
             assert len(tools) >= 1, f"Skill {name} has no tools"
 
+    def test_spawned_session_shares_skills_but_not_history(self, config):
+        """Test session agents reuse the registry with their own history."""
+        from r_cli.core.agent import Agent
+
+        agent = Agent(config)
+        agent.load_skills()
+        session = agent.spawn_session(memory_namespace="api-test")
+
+        assert session.skills is agent.skills
+        assert session.tools is agent.tools
+        assert session.llm is not agent.llm
+        session.llm.add_message("user", "hello")
+        assert len(session.llm.messages) == len(agent.llm.messages) + 1
+        assert session.memory.namespace == "api-test"
+
 
 # =============================================================================
 # API Integration Tests
@@ -1,13 +1,15 @@
 """Tests for optional MCP server integration."""
 
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
 from r_cli.core.config import Config, MCPServerConfig
-from r_cli.mcp_client import MCPClient
+from r_cli.mcp_client import MCPClient, MCPError
 
 
 def mcp_config(tmp_path: Path, script: Path) -> Config:
@@ -72,3 +74,87 @@ if __name__ == "__main__":
 
     assert [tool.name for tool in tools] == ["add"]
     assert result == {"result": 5}
+
+
+SESSION_SERVER = """
+import asyncio
+import os
+
+from mcp.server.fastmcp import Context, FastMCP
+
+server = FastMCP("test")
+
+@server.tool()
+def pid() -> int:
+    return os.getpid()
+
+@server.tool()
+def crash() -> int:
+    os._exit(1)
+
+@server.tool()
+async def pause(seconds: float) -> float:
+    await asyncio.sleep(seconds)
+    return seconds
+
+@server.tool()
+async def extend(ctx: Context) -> str:
+    server.add_tool(lambda: "pong", name="ping")
+    await ctx.session.send_tool_list_changed()
+    return "ok"
+
+if __name__ == "__main__":
+    server.run(transport="stdio")
+"""
+
+
+def session_client(tmp_path: Path, max_sessions: int = 1) -> MCPClient:
+    pytest.importorskip("mcp")
+    script = tmp_path / "server.py"
+    script.write_text(SESSION_SERVER.strip())
+    config = mcp_config(tmp_path, script)
+    config.mcp.servers["test"].max_sessions = max_sessions
+    return MCPClient(config)
+
+
+def test_mcp_session_is_reused_and_restarted_after_exit(tmp_path: Path):
+    client = session_client(tmp_path)
+
+    first = client.call_tool("test", "pid", {}, auto_approve=True)
+    assert client.call_tool("test", "pid", {}, auto_approve=True) == first
+
+    with pytest.raises(MCPError):
+        client.call_tool("test", "crash", {}, auto_approve=True)
+
+    restarted = client.call_tool("test", "pid", {}, auto_approve=True)
+    assert restarted != first
+    assert client.call_tool("test", "pid", {}, auto_approve=True) == restarted
+
+
+def test_mcp_requests_run_concurrently(tmp_path: Path):
+    client = session_client(tmp_path)
+    client.call_tool("test", "pid", {}, auto_approve=True)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(
+            pool.map(
+                lambda _: client.call_tool("test", "pause", {"seconds": 0.5}, auto_approve=True),
+                range(4),
+            )
+        )
+
+    assert results == [{"result": 0.5}] * 4
+    assert time.perf_counter() - started < 1.5
+
+
+def test_mcp_tool_list_is_cached_until_changed(tmp_path: Path):
+    client = session_client(tmp_path)
+
+    tools = client.list_tools("test")
+    assert client.list_tools("test") is tools
+    assert "ping" not in [tool.name for tool in tools]
+
+    client.call_tool("test", "extend", {}, auto_approve=True)
+
+    assert "ping" in [tool.name for tool in client.list_tools("test")]
@@ -73,3 +73,63 @@ def test_export_csv_serializes_nested_values(tmp_path):
 
     assert count == 1
     assert '"{""value"": 1}"' in output.read_text(encoding="utf-8")
+
+
+def test_read_ingests_only_appended_records(tmp_path):
+    config = trace_config(tmp_path)
+    write_records(config, [{"decision": "completed", "skill": "math", "trace_id": "a"}])
+    store = TraceStore(config)
+    assert len(store.read()) == 1
+
+    path = Path(config.home_dir) / config.security.audit_path
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write("\n" + json.dumps({"decision": "error", "skill": "pdf", "trace_id": "b"}))
+        handle.write("\n" + '{"decision": "completed", "ski')
+
+    assert [record["trace_id"] for record in store.read()] == ["a", "b"]
+    assert store.read(trace_id="b") == [{"decision": "error", "skill": "pdf", "trace_id": "b"}]
+    assert TraceStore(config).summary()["total"] == 2
+
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write('ll": "math"}\n')
+
+    assert store.summary()["by_skill"] == {"math": 2, "pdf": 1}
+
+
+def test_index_follows_rotation_and_rewrites(tmp_path):
+    config = trace_config(tmp_path)
+    path = Path(config.home_dir) / config.security.audit_path
+    write_records(config, [{"decision": "completed", "skill": "math", "duration_ms": 1}])
+    store = TraceStore(config)
+    assert store.summary()["total"] == 1
+
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write("\n" + json.dumps({"decision": "completed", "skill": "pdf"}) + "\n")
+    path.replace(path.with_name(f"{path.name}.1"))
+    write_records(config, [{"decision": "error", "skill": "fs"}])
+
+    assert [record["skill"] for record in store.read()] == ["math", "pdf", "fs"]
+
+    write_records(config, [{"decision": "denied", "skill": "docker"}])
+
+    summary = store.summary()
+    assert summary["total"] == 1
+    assert summary["denied"] == 1
+    assert summary["average_duration_ms"] == 0.0
+
+
+def test_summary_quantiles_from_digest(tmp_path):
+    config = trace_config(tmp_path)
+    write_records(
+        config,
+        [
+            {"decision": "completed", "skill": "math", "duration_ms": value}
+            for value in range(1, 10_001)
+        ],
+    )
+
+    summary = TraceStore(config).summary()
+
+    assert summary["average_duration_ms"] == 5000.5
+    assert abs(summary["p50_duration_ms"] - 5000) < 100
+    assert abs(summary["p95_duration_ms"] - 9500) < 50
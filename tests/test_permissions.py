@@ -1,10 +1,13 @@
 """Tests for local tool permissions and audit logging."""
 
 import json
+import time
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
+from r_cli.core.audit import AuditWriter, flush_audit_logs
 from r_cli.core.config import Config
 from r_cli.core.permissions import (
     PermissionDeniedError,
@@ -93,6 +96,7 @@ def test_audit_log_records_decisions(tmp_path: Path):
 
     manager.execute("code", "write_code", lambda **_: "written", {"code": "x"})
 
+    flush_audit_logs()
     records = [
         json.loads(line)
         for line in (tmp_path / "audit.jsonl").read_text(encoding="utf-8").splitlines()
@@ -122,6 +126,7 @@ def test_audit_log_redacts_secrets(tmp_path: Path):
         },
     )
 
+    flush_audit_logs()
     records = [
         json.loads(line)
         for line in (tmp_path / "audit.jsonl").read_text(encoding="utf-8").splitlines()
@@ -288,3 +293,112 @@ def test_empty_enforced_filesystem_roots_deny_path_access(tmp_path: Path):
             lambda **_: "blocked",
             {"filename": str(tmp_path / "script.py"), "code": "print('no')"},
         )
+
+
+def test_wrapped_handler_reports_when_approval_is_needed(tmp_path: Path):
+    manager = PermissionManager(permission_config(tmp_path), approval_callback=lambda _: True)
+
+    write = manager.wrap("code", "write_code", lambda **_: "written")
+    calculate = manager.wrap("math", "calculate", lambda **_: 4)
+
+    assert write.needs_approval({"code": "x"}) is True
+    assert calculate.needs_approval({"expression": "2 + 2"}) is False
+    assert (
+        PermissionManager(permission_config(tmp_path), auto_approve=True).needs_approval(
+            "code", "write_code"
+        )
+        is False
+    )
+
+
+def test_async_wrapper_authorizes_and_audits(tmp_path: Path):
+    import asyncio
+
+    async def calculate(expression: str) -> int:
+        return 4
+
+    manager = PermissionManager(permission_config(tmp_path))
+    guarded = manager.wrap_async("math", "calculate", calculate)
+
+    assert asyncio.run(guarded(expression="2 + 2")) == 4
+    flush_audit_logs()
+    decisions = [
+        json.loads(line)["decision"] for line in (tmp_path / "audit.jsonl").read_text().splitlines()
+    ]
+    assert decisions == ["allowed", "completed"]
+
+
+def test_denied_decisions_reach_the_audit_log_without_a_flush(tmp_path: Path):
+    manager = PermissionManager(permission_config(tmp_path))
+
+    with pytest.raises(PermissionDeniedError):
+        manager.execute("docker", "run_container", lambda **_: "started", {})
+
+    records = [
+        json.loads(line)
+        for line in (tmp_path / "audit.jsonl").read_text(encoding="utf-8").splitlines()
+    ]
+    assert records[-1]["decision"] == "denied"
+
+
+def test_sync_durability_writes_every_decision_before_returning(tmp_path: Path):
+    config = permission_config(tmp_path)
+    config.security.audit_path = "sync-audit.jsonl"
+    config.security.audit_durability = "sync"
+    manager = PermissionManager(config)
+
+    manager.execute("math", "calculate", lambda **_: 4, {"expression": "2 + 2"})
+
+    decisions = [
+        json.loads(line)["decision"]
+        for line in (tmp_path / "sync-audit.jsonl").read_text(encoding="utf-8").splitlines()
+    ]
+    assert decisions == ["allowed", "completed"]
+
+
+def test_audit_writer_rotates_by_size(tmp_path: Path):
+    path = tmp_path / "audit.jsonl"
+    writer = AuditWriter(path, max_bytes=200, backups=2)
+
+    for index in range(20):
+        writer.write({"decision": "completed", "index": index})
+    writer.close()
+
+    rotated = sorted(item.name for item in tmp_path.iterdir())
+    assert rotated == ["audit.jsonl", "audit.jsonl.1", "audit.jsonl.2"]
+    assert all(item.stat().st_size <= 200 for item in tmp_path.iterdir())
+    last = json.loads(path.read_text(encoding="utf-8").splitlines()[-1])
+    assert last["index"] == 19
+
+
+def test_audit_writer_flush_restarts_a_retired_worker(tmp_path: Path):
+    path = tmp_path / "audit.jsonl"
+    writer = AuditWriter(path, fsync_interval=0.01)
+
+    with patch("r_cli.core.audit.IDLE_TIMEOUT", 0.0):
+        writer.write({"decision": "completed", "index": 0})
+        for _ in range(200):
+            if writer._worker is None:
+                break
+            time.sleep(0.01)
+        assert writer._worker is None
+
+        writer.write({"decision": "completed", "index": 1})
+        writer.flush()
+        writer.flush()
+
+    indexes = [json.loads(line)["index"] for line in path.read_text().splitlines()]
+    assert indexes == [0, 1]
+    writer.close()
+
+
+def test_audit_writer_releases_waiters_on_unexpected_errors(tmp_path: Path):
+    writer = AuditWriter(tmp_path / "audit.jsonl")
+
+    with patch.object(AuditWriter, "_append", side_effect=AttributeError("boom")):
+        writer.write({"decision": "denied"}, durable=True)
+    writer.write({"decision": "completed"}, durable=True)
+    writer.close()
+
+    lines = (tmp_path / "audit.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["decision"] for line in lines] == ["completed"]
@@ -0,0 +1,74 @@
+"""Tests for the manifest-driven skill registry."""
+
+import json
+from dataclasses import replace
+
+import pytest
+
+from r_cli.core.agent import Agent
+from r_cli.core.config import Config
+from r_cli.skills.registry import (
+    MANIFEST_PATH,
+    LazySkill,
+    build_manifest,
+    find_skill_spec,
+    get_skill_specs,
+)
+
+
+def test_manifest_matches_skill_sources():
+    # Regenerate with: python -m r_cli.skills.registry
+    try:
+        generated = json.loads(json.dumps(build_manifest()))
+    except ImportError as exc:
+        pytest.skip(f"Not every skill can be imported here: {exc}")
+
+    assert json.loads(MANIFEST_PATH.read_text(encoding="utf-8")) == generated
+
+
+def test_lazy_skill_imports_on_first_call(tmp_path):
+    skill = LazySkill(find_skill_spec("math"), Config(home_dir=str(tmp_path)))
+    tool = next(tool for tool in skill.get_tools() if tool.name == "calculate")
+
+    assert not skill.loaded
+    assert "expression" in tool.parameters["properties"]
+
+    result = tool.handler(expression="2+3*4")
+
+    assert skill.loaded
+    assert "14" in str(result)
+
+
+def test_agent_registers_skills_without_loading_them(tmp_path):
+    agent = Agent(Config(home_dir=str(tmp_path), output_dir=str(tmp_path / "output")))
+    agent.load_skills()
+
+    assert len(agent.skills) == len(get_skill_specs())
+    assert not any(skill.loaded for skill in agent.skills.values())
+
+
+def test_agent_skips_skills_with_missing_requirements(tmp_path, monkeypatch):
+    specs = [
+        replace(find_skill_spec("math"), requires=["r_cli_missing_dependency"]),
+        find_skill_spec("text"),
+    ]
+    monkeypatch.setattr("r_cli.skills.registry.get_skill_specs", lambda: specs)
+    agent = Agent(Config(home_dir=str(tmp_path), output_dir=str(tmp_path / "output")))
+
+    agent.load_skills()
+
+    assert list(agent.skills) == ["text"]
+
+
+def test_agent_bumps_tools_generation_when_tools_change(tmp_path):
+    agent = Agent(Config(home_dir=str(tmp_path), output_dir=str(tmp_path / "output")))
+    assert agent.tools_generation == 0
+
+    agent.load_skills()
+    loaded = agent.tools_generation
+    session = agent.spawn_session()
+    agent.register_skill(LazySkill(find_skill_spec("math"), agent.config))
+
+    assert loaded > 0
+    assert session.tools_generation == loaded
+    assert agent.tools_generation == loaded + 1
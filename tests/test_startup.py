@@ -0,0 +1,95 @@
+"""Tests for CLI startup profiling."""
+
+import json
+import subprocess
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from r_cli.main import cli
+from r_cli.startup import (
+    ImportTiming,
+    StartupReport,
+    check_budget,
+    measure_command,
+    parse_importtime,
+)
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2500 |       2500 |     rich.console
+import time:       800 |       3300 |   r_cli.ui.terminal
+import time:      1000 |       4300 | r_cli.main
+some unrelated stderr line
+"""
+
+
+def test_parse_importtime_reads_times_and_depth():
+    timings = parse_importtime(IMPORTTIME_OUTPUT)
+
+    assert [timing.module for timing in timings] == [
+        "_io",
+        "rich.console",
+        "r_cli.ui.terminal",
+        "r_cli.main",
+    ]
+    assert timings[1].self_ms == 2.5
+    assert timings[1].depth == 2
+    assert timings[3].cumulative_ms == 4.3
+    assert timings[3].depth == 0
+
+
+def test_report_exposes_budget_keys_and_slowest_imports():
+    report = StartupReport(
+        imports=parse_importtime(IMPORTTIME_OUTPUT),
+        phases={"config_load": 12.0},
+        commands={"r --help": 300.0},
+    )
+
+    assert report.timings() == {
+        "import r_cli.main": 4.3,
+        "phase:config_load": 12.0,
+        "r --help": 300.0,
+    }
+    assert report.slowest_imports(1)[0].module == "rich.console"
+
+
+def test_measure_command_raises_when_the_command_fails():
+    failed = subprocess.CompletedProcess([], 2, stdout=b"", stderr=b"Error: no such command")
+
+    with (
+        patch("r_cli.startup.subprocess.run", return_value=failed),
+        pytest.raises(RuntimeError, match="no such command"),
+    ):
+        measure_command(["bogus"], runs=1)
+
+
+def test_check_budget_reports_only_exceeded_measurements():
+    report = StartupReport(phases={"config_load": 300.0, "llm_client": 10.0})
+
+    violations = check_budget(
+        report,
+        {"phase:config_load": 250.0, "phase:llm_client": 750.0, "r --help": 100.0},
+    )
+
+    assert violations == ["phase:config_load: 300ms exceeds budget of 250ms"]
+
+
+def test_diagnostics_startup_json_and_check_exit_code():
+    report = StartupReport(
+        imports=[ImportTiming("r_cli.main", 5.0, 5000.0, 0)],
+        phases={"config_load": 1.0},
+    )
+    runner = CliRunner()
+
+    with patch("r_cli.startup.profile_startup", return_value=report):
+        result = runner.invoke(cli, ["diagnostics", "startup", "--json"])
+        checked = runner.invoke(cli, ["diagnostics", "startup", "--check", "--json"])
+
+    assert result.exit_code == 0
+    payload = json.loads(result.output)
+    assert payload["timings_ms"]["import r_cli.main"] == 5000.0
+    assert payload["violations"] == ["import r_cli.main: 5000ms exceeds budget of 1500ms"]
+    assert checked.exit_code == 1
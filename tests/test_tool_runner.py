@@ -1,13 +1,19 @@
 """Tests for direct tool execution."""
 
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
 import pytest
 
+from r_cli.core.config import Config
 from r_cli.core.llm import Tool
 from r_cli.tool_runner import (
     ToolRunnerError,
     build_arguments,
+    load_skill,
     normalize_result,
     parse_key_value,
+    resolve_tool,
     validate_arguments,
 )
 
@@ -59,3 +65,51 @@ def test_validate_arguments_reports_unknown_values():
 def test_normalize_result_decodes_json_text():
     assert normalize_result('{"pages": 2}') == {"pages": 2}
     assert normalize_result("ordinary text") == "ordinary text"
+
+
+def test_resolve_tool_reuses_skill_for_equal_configs(tmp_path):
+    config = Config()
+    config.home_dir = str(tmp_path)
+
+    with patch("r_cli.tool_runner.load_skill", wraps=load_skill) as loader:
+        first = resolve_tool("math", "calculate", config)
+        second = resolve_tool("math", "calculate", config.model_copy(deep=True))
+
+    loader.assert_called_once()
+    assert second is first
+    assert first.tool.name == "calculate"
+
+
+def test_resolve_tool_separates_different_configs(tmp_path):
+    config = Config()
+    config.home_dir = str(tmp_path / "one")
+    other = config.model_copy(deep=True)
+    other.home_dir = str(tmp_path / "two")
+
+    assert resolve_tool("math", "calculate", config) is not resolve_tool("math", "calculate", other)
+
+
+def test_resolve_tool_keeps_skill_instances_per_thread(tmp_path):
+    config = Config()
+    config.home_dir = str(tmp_path)
+    main = resolve_tool("math", "calculate", config)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        worker = pool.submit(resolve_tool, "math", "calculate", config).result()
+        again = pool.submit(resolve_tool, "math", "calculate", config).result()
+
+    assert again is worker
+    assert worker.skill is not main.skill
+    assert resolve_tool("math", "calculate", config) is main
+
+
+def test_resolve_tool_serializes_each_config_once(tmp_path):
+    config = Config()
+    config.home_dir = str(tmp_path)
+    resolve_tool("math", "calculate", config)
+
+    with patch.object(Config, "model_dump_json") as dump:
+        for _ in range(3):
+            resolve_tool("math", "calculate", config)
+
+    dump.assert_not_called()
@@ -1,11 +1,15 @@
 """Tests for declarative R workflows."""
 
+import threading
+import time
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
+from r_cli import workflows
 from r_cli.core.permissions import PermissionDeniedError
+from r_cli.workflow_cache import StepCache
 from r_cli.workflows import WorkflowError, load_workflow, run_workflow
 
 
@@ -171,3 +175,371 @@ steps:
     execute.assert_not_called()
     assert result.status == "planned"
     assert result.steps[0].result["arguments"]["expression"] == "10 + 2"
+
+
+def test_parallel_steps_overlap_and_report_in_dependency_order(tmp_path):
+    path = write_workflow(
+        tmp_path,
+        """
+max_parallel: 3
+steps:
+  - id: archive
+    uses: archive.create
+    depends_on: [hash_a, hash_b]
+  - id: fetch_a
+    uses: fs.read_file
+  - id: hash_a
+    uses: crypto.hash
+    depends_on: [fetch_a]
+  - id: fetch_b
+    uses: fs.read_file
+  - id: hash_b
+    uses: crypto.hash
+    depends_on: [fetch_b]
+""",
+    )
+    fetches_running = threading.Barrier(2, timeout=5)
+
+    def fake_execute(skill, tool, arguments, **kwargs):
+        if skill == "fs":
+            fetches_running.wait()
+        return skill
+
+    with patch("r_cli.workflows.execute_tool", side_effect=fake_execute):
+        result = run_workflow(load_workflow(path))
+
+    assert result.status == "completed"
+    assert [step.id for step in result.steps] == [
+        "fetch_a",
+        "fetch_b",
+        "hash_a",
+        "hash_b",
+        "archive",
+    ]
+
+
+def test_dependents_start_before_slow_siblings_finish(tmp_path):
+    path = write_workflow(
+        tmp_path,
+        """
+max_parallel: 2
+steps:
+  - id: slow
+    uses: math.calculate
+    with:
+      expression: slow
+  - id: fast
+    uses: math.calculate
+    with:
+      expression: fast
+  - id: after_fast
+    uses: math.calculate
+    depends_on: [fast]
+    with:
+      expression: after_fast
+""",
+    )
+    after_fast_done = threading.Event()
+
+    def fake_execute(skill, tool, arguments, **kwargs):
+        if arguments["expression"] == "slow":
+            assert after_fast_done.wait(5)
+        elif arguments["expression"] == "after_fast":
+            after_fast_done.set()
+        return arguments["expression"]
+
+    with patch("r_cli.workflows.execute_tool", side_effect=fake_execute):
+        result = run_workflow(load_workflow(path))
+
+    assert result.status == "completed"
+
+
+def test_per_skill_limit_serializes_that_skill(tmp_path):
+    path = write_workflow(
+        tmp_path,
+        """
+max_parallel: 4
+max_parallel_per_skill:
+  http: 1
+steps:
+  - id: one
+    uses: http.get
+  - id: two
+    uses: http.get
+  - id: three
+    uses: http.get
+""",
+    )
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def fake_execute(skill, tool, arguments, **kwargs):
+        with lock:
+            active.append(skill)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.remove(skill)
+
+    with patch("r_cli.workflows.execute_tool", side_effect=fake_execute):
+        result = run_workflow(load_workflow(path))
+
+    assert result.status == "completed"
+    assert max(peak) == 1
+
+
+def test_failure_lets_running_steps_finish_and_skips_the_rest(tmp_path):
+    path = write_workflow(
+        tmp_path,
+        """
+max_parallel: 2
+steps:
+  - id: broken
+    uses: math.calculate
+    with:
+      expression: broken
+  - id: sibling
+    uses: math.calculate
+    with:
+      expression: sibling
+  - id: later
+    uses: math.calculate
+    depends_on: [sibling]
+""",
+    )
+    both_started = threading.Barrier(2, timeout=5)
+
+    def fake_execute(skill, tool, arguments, **kwargs):
+        both_started.wait()
+        if arguments["expression"] == "broken":
+            raise RuntimeError("boom")
+        time.sleep(0.05)
+        return "ok"
+
+    with patch("r_cli.workflows.execute_tool", side_effect=fake_execute):
+        result = run_workflow(load_workflow(path))
+
+    assert result.status == "error"
+    assert [(step.id, step.status) for step in result.steps] == [
+        ("broken", "error"),
+        ("sibling", "completed"),
+        ("later", "skipped"),
+    ]
+    assert result.steps[-1].error == "workflow stopped after broken"
+
+
+def test_load_rejects_invalid_max_parallel(tmp_path):
+    path = write_workflow(
+        tmp_path,
+        """
+max_parallel: 0
+steps:
+  - id: one
+    uses: math.calculate
+""",
+    )
+
+    with pytest.raises(WorkflowError, match="max_parallel must be between"):
+        load_workflow(path)
+
+
+def test_templates_are_compiled_once_at_load(tmp_path):
+    path = write_workflow(
+        tmp_path,
+        """
+steps:
+  - id: calculate
+    uses: math.calculate
+    retry: 1
+    with:
+      expression: "{{ vars.value }} + 2"
+""",
+    )
+    definition = load_workflow(path)
+
+    with (
+        patch.object(workflows._environment, "from_string") as compile_template,
+        patch("r_cli.workflows.execute_tool", side_effect=[RuntimeError("temporary"), 12, 12]),
+    ):
+        first = run_workflow(definition, variables={"value": 10})
+        second = run_workflow(load_workflow(path), variables={"value": 10})
+
+    compile_template.assert_not_called()
+    assert first.status == second.status == "completed"
+
+
+def test_steps_share_one_permission_manager(tmp_path):
+    path = write_workflow(
+        tmp_path,
+        """
+steps:
+  - id: one
+    uses: math.calculate
+  - id: two
+    uses: math.calculate
+""",
+    )
+    managers = []
+
+    def fake_execute(skill, tool, arguments, **kwargs):
+        managers.append(kwargs["permissions"])
+
+    with patch("r_cli.workflows.execute_tool", side_effect=fake_execute):
+        run_workflow(load_workflow(path))
+
+    assert len(managers) == 2
+    assert managers[0] is managers[1]
+
+
+def test_load_reuses_compiled_workflow_until_file_changes(tmp_path):
+    path = write_workflow(
+        tmp_path,
+        """
+steps:
+  - id: one
+    uses: math.calculate
+""",
+    )
+
+    first = load_workflow(path)
+    assert load_workflow(path) is first
+
+    write_workflow(
+        tmp_path,
+        """
+name: renamed
+steps:
+  - id: one
+    uses: math.calculate
+""",
+    )
+    assert load_workflow(path).name == "renamed"
+
+
+def test_cached_step_reuses_result_until_input_file_changes(tmp_path):
+    source = tmp_path / "data.txt"
+    source.write_text("first", encoding="utf-8")
+    path = write_workflow(
+        tmp_path,
+        f"""
+steps:
+  - id: checksum
+    uses: crypto.hash_file
+    cache: true
+    with:
+      file_path: {source}
+""",
+    )
+    cache_dir = tmp_path / "cache"
+    calls = []
+
+    def fake_execute(skill, tool, arguments, **kwargs):
+        calls.append(arguments)
+        return {"digest": f"run-{len(calls)}"}
+
+    with patch("r_cli.workflows.execute_tool", side_effect=fake_execute):
+        first = run_workflow(load_workflow(path), cache_dir=cache_dir, auto_approve=True)
+        second = run_workflow(load_workflow(path), cache_dir=cache_dir, auto_approve=True)
+        source.write_text("second", encoding="utf-8")
+        third = run_workflow(load_workflow(path), cache_dir=cache_dir, auto_approve=True)
+
+    assert len(calls) == 2
+    assert [run.steps[0].cached for run in (first, second, third)] == [False, True, False]
+    assert second.steps[0].result == {"digest": "run-1"}
+    assert third.steps[0].result == {"digest": "run-2"}
+
+
+def test_cache_write_failure_does_not_rerun_step(tmp_path):
+    path = write_workflow(
+        tmp_path,
+        """
+steps:
+  - id: calculate
+    uses: math.calculate
+    retry: 2
+    cache: true
+""",
+    )
+
+    with (
+        patch("r_cli.workflows.execute_tool", return_value=4) as execute,
+        patch.object(StepCache, "put", side_effect=OSError("disk full")),
+    ):
+        result = run_workflow(load_workflow(path), cache_dir=tmp_path / "cache")
+
+    assert execute.call_count == 1
+    assert result.status == "completed"
+    assert result.steps[0].result == 4
+
+
+def test_step_cache_is_closed_when_run_fails(tmp_path):
+    path = write_workflow(
+        tmp_path,
+        """
+steps:
+  - id: calculate
+    uses: math.calculate
+    cache: true
+    with:
+      expression: "{{ missing.value }}"
+""",
+    )
+
+    with (
+        patch.object(StepCache, "close") as close,
+        pytest.raises(WorkflowError, match="Template rendering failed"),
+    ):
+        run_workflow(load_workflow(path), cache_dir=tmp_path / "cache")
+
+    close.assert_called_once()
+
+
+def test_uncached_steps_always_execute(tmp_path):
+    path = write_workflow(
+        tmp_path,
+        """
+steps:
+  - id: calculate
+    uses: math.calculate
+""",
+    )
+
+    with patch("r_cli.workflows.execute_tool", return_value=1) as execute:
+        run_workflow(load_workflow(path), cache_dir=tmp_path / "cache")
+        run_workflow(load_workflow(path), cache_dir=tmp_path / "cache")
+
+    assert execute.call_count == 2
+    assert not (tmp_path / "cache").exists()
+
+
+def test_load_rejects_invalid_cache_ttl(tmp_path):
+    path = write_workflow(
+        tmp_path,
+        """
+steps:
+  - id: calculate
+    uses: math.calculate
+    cache:
+      ttl: 0
+""",
+    )
+
+    with pytest.raises(WorkflowError, match="cache ttl"):
+        load_workflow(path)
+
+
+def test_step_cache_expires_and_evicts_least_recently_used(tmp_path):
+    cache = StepCache(tmp_path, max_bytes=40)
+    cache.put("old", "json.parse", "x" * 10, ttl=60)
+    cache.put("expired", "json.parse", "y", ttl=-1)
+    cache.put("recent", "json.parse", "z" * 10, ttl=60)
+    assert cache.get("old") == (True, "x" * 10)
+
+    cache.put("new", "json.parse", "w" * 20, ttl=60)
+
+    assert cache.get("expired") == (False, None)
+    assert cache.get("recent") == (False, None)
+    assert cache.get("old")[0] is True
+    assert cache.get("new")[0] is True
+    assert cache.size_bytes <= 40